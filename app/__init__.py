@@ -1,10 +1,20 @@
 from flask import Flask
 from flask_swagger_ui import get_swaggerui_blueprint
 from app.models import db
-from app.extenstions import ma
+from app.extenstions import ma, cache
 from app.blueprints.user import user_bp
 from app.blueprints.blog import blog_bp
+from app.blueprints.metrics import metrics_bp
+from app.commands import reconcile_counts, rebuild_search_index_command, trim_timelines, decay_trending, purge_deleted
 from flask_cors import CORS
+from utils.auth import init_auth
+from utils.pool import InstrumentedQueuePool
+from utils.replica import init_replicas
+from utils.like_buffer import init_like_buffer
+from utils.purge import init_purge_worker
+from utils.trending import init_trending_decay_worker
+from utils.metrics import init_metrics
+from utils.compression import init_compression
 
 SWAGGER_URL = "/api/docs"
 API_URL = "/static/swagger.yaml"
@@ -21,12 +31,32 @@ def create_app(config_name):
   app = Flask(__name__)
   CORS(app)
   app.config.from_object(f"config.{config_name}")
+  app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+    "poolclass": InstrumentedQueuePool,
+    **app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {})
+  }
   
   db.init_app(app)
+  init_replicas(app)
   ma.init_app(app)
+  cache.init_app(app)
+  init_auth(app)
+  init_like_buffer(app)
+  init_purge_worker(app)
+  init_trending_decay_worker(app)
+  init_metrics(app)
+  # Registered after metrics so its after_request runs first and metrics see the compressed size
+  init_compression(app)
   
   app.register_blueprint(user_bp, url_prefix="/users")
   app.register_blueprint(blog_bp, url_prefix="/blogs")
+  app.register_blueprint(metrics_bp, url_prefix="/metrics")
   app.register_blueprint(swagger_blueprint, url_prefix=SWAGGER_URL)
   
+  app.cli.add_command(reconcile_counts)
+  app.cli.add_command(rebuild_search_index_command)
+  app.cli.add_command(trim_timelines)
+  app.cli.add_command(decay_trending)
+  app.cli.add_command(purge_deleted)
+  
   return app
\ No newline at end of file
@@ -0,0 +1,94 @@
+import inspect
+from asgiref.wsgi import WsgiToAsgi
+from flask import request
+from werkzeug.test import EnvironBuilder
+from app import create_app
+from app.blueprints.blog.async_routes import async_views as blog_async_views
+from app.blueprints.user.async_routes import async_views as user_async_views
+from utils.async_db import async_engines, init_async_db, pin_async_replica
+
+
+def build_environ(scope, app):
+  server = scope.get("server") or ("localhost", 80)
+  headers = [(name.decode("latin-1"), value.decode("latin-1")) for name, value in scope.get("headers", [])]
+  environ = EnvironBuilder(
+    path=scope["path"],
+    base_url=f"{scope.get('scheme', 'http')}://{server[0]}:{server[1]}{scope.get('root_path', '')}",
+    query_string=scope.get("query_string", b"").decode("latin-1"),
+    method=scope["method"],
+    headers=headers,
+  ).get_environ()
+  if scope.get("client"):
+    environ["REMOTE_ADDR"] = scope["client"][0]
+  return environ
+
+
+class AsgiApp:
+  """ASGI front for the Flask app.
+
+  Routes with an async twin (async_views, keyed by Flask endpoint) run on this worker's event loop against the
+  async engine, inside a normal Flask request context so hooks, caching, metrics and compression all apply.
+  Every other route is handed to the unchanged WSGI app on asgiref's thread pool.
+  """
+
+  def __init__(self, flask_app, async_views):
+    self.flask_app = flask_app
+    self.async_views = async_views
+    self.engine = init_async_db(flask_app)
+    self.wsgi = WsgiToAsgi(flask_app)
+
+  async def __call__(self, scope, receive, send):
+    if scope["type"] == "lifespan":
+      return await self.lifespan(receive, send)
+    if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+      return await self.wsgi(scope, receive, send)
+
+    ctx = self.flask_app.request_context(build_environ(scope, self.flask_app))
+    ctx.push()
+    try:
+      rule = request.url_rule
+      view = self.async_views.get(rule.endpoint) if rule is not None else None
+      if view is None:
+        ctx.pop()
+        ctx = None
+        return await self.wsgi(scope, receive, send)
+
+      response = await self.dispatch(view)
+    finally:
+      if ctx is not None:
+        ctx.pop()
+    await self.send_response(response, scope["method"], send)
+
+  async def dispatch(self, view):
+    app = self.flask_app
+    rv = app.preprocess_request()
+    if rv is None:
+      await pin_async_replica()
+      rv = view(**request.view_args)
+      if inspect.isawaitable(rv):
+        rv = await rv
+    return app.process_response(app.make_response(rv))
+
+  async def send_response(self, response, method, send):
+    headers = [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in response.headers.items()]
+    await send({"type": "http.response.start", "status": response.status_code, "headers": headers})
+    if method != "HEAD":
+      for chunk in response.iter_encoded():
+        await send({"type": "http.response.body", "body": chunk, "more_body": True})
+    await send({"type": "http.response.body", "body": b"", "more_body": False})
+    response.close()
+
+  async def lifespan(self, receive, send):
+    while True:
+      message = await receive()
+      if message["type"] == "lifespan.startup":
+        await send({"type": "lifespan.startup.complete"})
+      elif message["type"] == "lifespan.shutdown":
+        for engine in async_engines(self.flask_app):
+          await engine.dispose()
+        await send({"type": "lifespan.shutdown.complete"})
+        return
+
+
+def create_asgi_app(config_name):
+  return AsgiApp(create_app(config_name), {**blog_async_views, **user_async_views})
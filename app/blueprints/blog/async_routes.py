@@ -0,0 +1,100 @@
+from flask import jsonify
+from sqlalchemy import select
+from app.models import Blog, Comment
+from app.extenstions import cache
+from app.blueprints.blog.routes import blog_list_namespaces, blog_namespaces, comment_page_args, archived_requested, visible_comments
+from app.blueprints.blog.serializers import blog_serializer, comment_serializer, blog_rows, comment_rows, serialize_blog_rows, serialize_comment_rows
+from utils.async_db import async_session
+from utils.auth import token_user_id, live_user_async
+from utils.fieldsets import FieldsError
+from utils.pagination import PaginationError, get_page_args, keyset_query, split_page
+
+# Async twins of the hot read routes in routes.py, served by app.asgi on the async engine.
+# Same arguments, responses and cache namespaces; everything else falls through to the WSGI app.
+# Reads are routed like the sync app's (utils/async_db.py), and like counts include the write-behind
+# buffer through serialize_blog_rows.
+
+
+@cache.cached_async(blog_list_namespaces)
+async def get_all_blogs():
+  try:
+    limit, cursor = get_page_args()
+    fields = blog_serializer.requested_fields()
+    async with async_session() as session:
+      result = await session.execute(keyset_query(blog_rows(fields).where(Blog.deleted_at.is_(None)), Blog, limit, cursor))
+      blogs, next_cursor = split_page(result.all(), limit)
+    
+    return jsonify({
+      "blogs": serialize_blog_rows(blogs, fields),
+      "next_cursor": next_cursor
+    }), 200
+  
+  except (PaginationError, FieldsError) as err:
+    return jsonify({"error": str(err)}), 400
+  
+  except Exception as e:
+    return jsonify({
+      "error": "Internal server error",
+      "details": str(e)
+    }), 500
+
+
+@cache.cached_async(blog_namespaces)
+async def get_blog(blog_id):
+  try:
+    fields = blog_serializer.requested_fields()
+    async with async_session() as session:
+      blog = (await session.execute(blog_rows(fields).where(Blog.id == blog_id, Blog.deleted_at.is_(None)))).first()
+    if not blog:
+      return jsonify({"error": "No blog found"}), 404
+    
+    return jsonify(serialize_blog_rows([blog], fields)[0]), 200
+  
+  except FieldsError as err:
+    return jsonify({"error": str(err)}), 400
+  
+  except Exception as e:
+    return jsonify({
+      "error": "Internal server error",
+      "details": str(e)
+    }), 500
+
+
+@cache.cached_async(blog_namespaces, unless=archived_requested)
+async def get_comments_for_blog(blog_id):
+  try:
+    limit, cursor, newest_first, include_archived = comment_page_args()
+    fields = comment_serializer.requested_fields()
+    viewer_id = token_user_id() if include_archived else None
+    if viewer_id is not None and not await live_user_async(viewer_id):
+      viewer_id = None
+    
+    async with async_session() as session:
+      result = await session.execute(keyset_query(
+        visible_comments(comment_rows(fields), blog_id, viewer_id), Comment, limit, cursor, newest_first
+      ))
+      comments, next_cursor = split_page(result.all(), limit)
+      if not comments and await session.scalar(select(Blog.id).where(Blog.id == blog_id, Blog.deleted_at.is_(None))) is None:
+        return jsonify({"message": "Blog not found"}), 404
+    
+    return jsonify({
+      "comments": serialize_comment_rows(comments, fields),
+      "next_cursor": next_cursor
+    }), 200
+  
+  except (PaginationError, FieldsError) as err:
+    return jsonify({"error": str(err)}), 400
+  
+  except Exception as e:
+    return jsonify({
+      "error": "Internal server error",
+      "details": str(e)
+    }), 500
+
+
+# Keyed by the endpoint of the sync view they replace
+async_views = {
+  "blog_bp.get_all_blogs": get_all_blogs,
+  "blog_bp.get_blog": get_blog,
+  "blog_bp.get_comments_for_blog": get_comments_for_blog,
+}
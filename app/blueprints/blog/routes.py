@@ -1,17 +1,125 @@
-from flask import jsonify, request, g
+from collections import Counter
+from datetime import datetime, timezone
+from flask import jsonify, request, g, current_app
 from marshmallow import ValidationError
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import select
+from sqlalchemy import select, update, false, or_
 from app.blueprints.blog import blog_bp
-from utils.auth import token_required
-from app.models import db, User, Blog, Comment, Like
-from app.blueprints.blog.schemas import create_blog_schema, blog_schema, return_blog_schema, return_blogs_schema, create_comment_schema, return_comment_schema, return_comments_schema, comment_schema
+from utils.auth import token_required, get_current_user, optional_user_id
+from utils.pagination import PaginationError, get_page_args, get_page_number, get_newest_first, keyset_page, keyset_query
+from utils.search import SearchError, search_blog_ids, index_blogs
+from utils.conditional import conditional
+from utils.bulk import RowRejected, insert_in_chunks
+from utils.likes import insert_like, delete_like
+from utils.feed import fan_out, pushes
+from utils.trending import current_epoch, epoch_for, event_score, like_weight, comment_weight, read_epoch, trending_query
+from utils.purge import soft_delete_blog, wake_purge_worker
+from utils.like_buffer import pending_like_delta
+from utils.streaming import ExportError, get_export_args, stream_export
+from utils.fieldsets import FieldsError
+from app.models import db, Blog, Comment, Like, User
+from app.extenstions import cache
+from app.blueprints.blog.serializers import blog_serializer, comment_serializer, blog_rows, comment_rows, serialize_blog_rows, serialize_comment_rows
+from app.blueprints.blog.schemas import create_blog_schema, blog_schema, return_blog_schema, create_comment_schema, return_comment_schema, comment_schema, create_blogs_schema, batch_comments_schema, batch_likes_schema
+
+
+def live_blog(blog_id):
+  # Soft-deleted blogs are gone as far as the API is concerned
+  blog = db.session.get(Blog, blog_id)
+  return blog if blog is not None and blog.deleted_at is None else None
+
+def blog_exists(blog_id):
+  return db.session.scalar(select(Blog.id).where(Blog.id == blog_id, Blog.deleted_at.is_(None))) is not None
+
+
+def blog_list_namespaces():
+  return ["blogs"]
+
+def blog_namespaces(blog_id):
+  return [f"blog:{blog_id}"]
+
+
+# Cheap validators for conditional GETs: a few narrow columns instead of a full dump.
+# ETag only: counters and the embedded author name change without moving any timestamp, so Last-Modified would go stale
+def blog_list_validator():
+  try:
+    limit, cursor = get_page_args()
+  except PaginationError:
+    return None
+  
+  rows = db.session.execute(keyset_query(
+    blog_validator_columns().where(Blog.deleted_at.is_(None)), Blog, limit, cursor
+  )).all()
+  return [(*row, pending_like_delta(row.id)) for row in rows]
+
+def blog_validator(blog_id):
+  row = db.session.execute(
+    blog_validator_columns().where(Blog.id == blog_id, Blog.deleted_at.is_(None))
+  ).first()
+  if row is None:
+    return None
+  return (*row, pending_like_delta(blog_id))
+
+def blog_validator_columns():
+  return select(
+    Blog.id, Blog.updated_at, Blog.like_count, Blog.comment_count, User.username, User.name
+  ).outerjoin(User, Blog.author_id == User.id)
+
+def comments_validator(blog_id):
+  try:
+    limit, cursor, newest_first, include_archived = comment_page_args()
+  except PaginationError:
+    return None
+  
+  rows = db.session.execute(keyset_query(
+    visible_comments(
+      select(Comment.id, Comment.updated_at, User.username, User.name).outerjoin(User, Comment.user_id == User.id),
+      blog_id, optional_user_id() if include_archived else None
+    ),
+    Comment, limit, cursor, newest_first
+  )).all()
+  # An empty page may mean the blog is gone; the view answers 404 for it
+  if not rows and not blog_exists(blog_id):
+    return None
+  return [tuple(row) for row in rows]
+
+
+def comment_page_args():
+  limit, cursor = get_page_args()
+  return limit, cursor, get_newest_first(), archived_requested()
+
+def archived_requested():
+  return request.args.get("include_archived", "false").lower() == "true"
+
+def live_blog_comments():
+  return Comment.post_id.in_(select(Blog.id).where(Blog.deleted_at.is_(None)))
+
+def visible_comments(stmt, blog_id, viewer_id=None):
+  """Restrict stmt to the comments of blog_id, none if the blog is soft-deleted. Archived ones are shown
+  only to viewer_id: all of them if they wrote the blog, otherwise just their own."""
+  # The blog is joined by primary key rather than fetched first, so a page stays one statement.
+  # Matches ix_comments_post_archived_created so a page is one index range scan
+  stmt = stmt.join(Blog, Blog.id == Comment.post_id).where(Comment.post_id == blog_id, Blog.deleted_at.is_(None))
+  if viewer_id is not None:
+    # Per-viewer pages aren't cached and are rare; the shared default below keeps the index range
+    return stmt.where(or_(Comment.is_archived == false(), Comment.user_id == viewer_id, Blog.author_id == viewer_id))
+  # is_archived is NOT NULL; an equality keeps (post_id, is_archived) as the index prefix so created_at needs no sort
+  return stmt.where(Comment.is_archived == false())
+
+
+def bump_blog_counter(blog_id, counter, amount, score=0.0):
+  # Single UPDATE ... SET n = n + amount; leaves updated_at alone since the blog itself wasn't edited
+  return db.session.execute(
+    update(Blog)
+    .where(Blog.id == blog_id, Blog.deleted_at.is_(None))
+    .values({counter: counter + amount, Blog.trending_score: Blog.trending_score + score, Blog.updated_at: Blog.updated_at})
+  )
 
 
 @blog_bp.route("/", methods=["POST"])
 @token_required
 def create_blog():
-  user = db.session.get(User, g.user_id)
+  user = get_current_user()
   if not user:
     return jsonify({"message": "No user found"}), 404
   
@@ -21,9 +129,13 @@ def create_blog():
     
     blog = Blog(**blog_data)
     blog.author_id = user.id
+    blog.fanned_out = pushes(user)
     
     db.session.add(blog)
+    db.session.flush()
+    fan_out([blog.id])
     db.session.commit()
+    cache.invalidate("blogs")
     
     return jsonify(blog_schema.dump(blog)), 201
   except ValidationError as err:
@@ -41,10 +153,96 @@ def create_blog():
 
 
 @blog_bp.route("/", methods=["GET"])
+@cache.cached(blog_list_namespaces)
+@conditional(blog_list_validator)
 def get_all_blogs():
   try:
-    blogs = db.session.scalars(select(Blog)).all()
-    return jsonify(return_blogs_schema.dump(blogs)), 200
+    limit, cursor = get_page_args()
+    fields = blog_serializer.requested_fields()
+    blogs, next_cursor = keyset_page(blog_rows(fields).where(Blog.deleted_at.is_(None)), Blog, limit, cursor, scalars=False)
+    
+    return jsonify({
+      "blogs": serialize_blog_rows(blogs, fields),
+      "next_cursor": next_cursor
+    }), 200
+  
+  except (PaginationError, FieldsError) as err:
+    return jsonify({"error": str(err)}), 400
+  
+  except Exception as e:
+    return jsonify({
+      "error": "Internal server error",
+      "details": str(e)
+    }), 500
+
+
+@blog_bp.route("/trending", methods=["GET"])
+@cache.cached(blog_list_namespaces)
+def get_trending_blogs():
+  try:
+    limit, _ = get_page_args()
+    fields = blog_serializer.requested_fields()
+    blogs = db.session.execute(trending_query(blog_rows(fields), limit)).all()
+    
+    return jsonify({"blogs": serialize_blog_rows(blogs, fields)}), 200
+  
+  except (PaginationError, FieldsError) as err:
+    return jsonify({"error": str(err)}), 400
+  
+  except Exception as e:
+    return jsonify({
+      "error": "Internal server error",
+      "details": str(e)
+    }), 500
+
+
+@blog_bp.route("/search", methods=["GET"])
+@cache.cached(blog_list_namespaces)
+def search_blogs():
+  try:
+    limit, _ = get_page_args()
+    page = get_page_number()
+    
+    ids = search_blog_ids(request.args.get("q"), limit + 1, (page - 1) * limit)
+    has_more = len(ids) > limit
+    ids = ids[:limit]
+    
+    fields = blog_serializer.requested_fields()
+    blogs = db.session.execute(blog_rows(fields).where(Blog.id.in_(ids), Blog.deleted_at.is_(None))).all()
+    rank = {blog_id: position for position, blog_id in enumerate(ids)}
+    blogs.sort(key=lambda blog: rank[blog.id])
+    
+    return jsonify({
+      "blogs": serialize_blog_rows(blogs, fields),
+      "next_page": page + 1 if has_more else None
+    }), 200
+  
+  except (PaginationError, SearchError, FieldsError) as err:
+    return jsonify({"error": str(err)}), 400
+  
+  except Exception as e:
+    return jsonify({
+      "error": "Internal server error",
+      "details": str(e)
+    }), 500
+
+
+def export_rows(model, serializer, serialize, *visible):
+  try:
+    export_format, after = get_export_args()
+    fields = serializer.requested_fields()
+    # Primary-key order, so a dropped export resumes with ?after=<last id received>
+    stmt = serializer.select(fields).order_by(model.id).where(*visible)
+    if after is not None:
+      stmt = stmt.where(model.id > after)
+    
+    return stream_export(
+      stmt, lambda rows: serialize(rows, fields), export_format, current_app.config.get("EXPORT_BATCH_SIZE", 1000)
+    )
+  
+  except (ExportError, FieldsError) as err:
+    return jsonify({"error": str(err)}), 400
+  
   except Exception as e:
     return jsonify({
       "error": "Internal server error",
@@ -52,14 +250,44 @@ def get_all_blogs():
     }), 500
 
 
+def exported_archived(model, owner_column):
+  # Archived rows stay out unless ?include_archived=true, and even then only the caller's own
+  if archived_requested():
+    return or_(model.is_archived.is_not(True), owner_column == g.user_id)
+  return model.is_archived.is_not(True)
+
+
+@blog_bp.route("/export", methods=["GET"])
+@token_required
+def export_blogs():
+  return export_rows(
+    Blog, blog_serializer, serialize_blog_rows, Blog.deleted_at.is_(None), exported_archived(Blog, Blog.author_id)
+  )
+
+
+@blog_bp.route("/comments/export", methods=["GET"])
+@token_required
+def export_comments():
+  return export_rows(
+    Comment, comment_serializer, serialize_comment_rows, live_blog_comments(), exported_archived(Comment, Comment.user_id)
+  )
+
+
 @blog_bp.route("/<int:blog_id>", methods=["GET"])
+@cache.cached(blog_namespaces)
+@conditional(blog_validator)
 def get_blog(blog_id):
   try:
-    blog = db.session.get(Blog, blog_id)
+    fields = blog_serializer.requested_fields()
+    blog = db.session.execute(blog_rows(fields).where(Blog.id == blog_id, Blog.deleted_at.is_(None))).first()
     if not blog:
       return jsonify({"error": "No blog found"}), 404
     
-    return jsonify(return_blog_schema.dump(blog)), 200
+    return jsonify(serialize_blog_rows([blog], fields)[0]), 200
+  
+  except FieldsError as err:
+    return jsonify({"error": str(err)}), 400
+  
   except Exception as e:
     return jsonify({
       "error": "Internal server error",
@@ -72,7 +300,7 @@ def get_blog(blog_id):
 def update_blog(blog_id):
   user_id = g.user_id
   
-  blog = db.session.get(Blog, blog_id)
+  blog = live_blog(blog_id)
   if not blog:
     return jsonify({"message": "blog not found"}), 404
   
@@ -88,6 +316,7 @@ def update_blog(blog_id):
     blog = blog_schema.load(data, instance=blog, partial=True)
     
     db.session.commit()
+    cache.invalidate("blogs", f"blog:{blog_id}")
     
     return jsonify(return_blog_schema.dump(blog)), 200
   
@@ -102,12 +331,39 @@ def update_blog(blog_id):
     return jsonify({"error": "Internal server error", "details": str(e)}), 500
 
 
+@blog_bp.route("/<int:blog_id>", methods=["DELETE"])
+@token_required
+def delete_blog(blog_id):
+  blog = live_blog(blog_id)
+  if not blog:
+    return jsonify({"message": "Blog not found"}), 404
+  
+  if blog.author_id != g.user_id:
+    return jsonify({"error": "Forbidden: You cannot delete this blog"}), 403
+  
+  try:
+    # Hidden immediately; comments, likes and feed entries are purged in the background
+    job = soft_delete_blog(blog_id)
+    db.session.commit()
+    cache.invalidate("blogs", f"blog:{blog_id}")
+    wake_purge_worker()
+    
+    return jsonify({"message": "Blog deleted", "purge_job_id": job.id if job else None}), 202
+  
+  except Exception as e:
+    db.session.rollback()
+    return jsonify({
+      "error": "Internal server error",
+      "details": str(e)
+    }), 500
+
+
 @blog_bp.route("/<blog_id>/archive", methods=["PATCH"])
 @token_required
 def toggle_archive_blog(blog_id):
   user_id = g.user_id
   
-  blog = db.session.get(Blog, blog_id)
+  blog = live_blog(blog_id)
   if not blog:
     return jsonify({"error": "Blog not found"}), 404
   
@@ -117,6 +373,7 @@ def toggle_archive_blog(blog_id):
   try:
     blog.is_archived = not blog.is_archived
     db.session.commit()
+    cache.invalidate("blogs", f"blog:{blog.id}")
     
     return jsonify({
       "message": f"Blog has been {'archived' if blog.is_archived else 'unarchived'}", "blog": return_blog_schema.dump(blog)
@@ -133,7 +390,7 @@ def toggle_archive_blog(blog_id):
 @token_required
 def create_comment(blog_id):
   user_id = g.user_id
-  blog = db.session.get(Blog, blog_id)
+  blog = live_blog(blog_id)
   
   if not blog:
     return jsonify({"message": "Blog not found"}), 404
@@ -145,10 +402,16 @@ def create_comment(blog_id):
     
     comment_data = create_comment_schema.load(data)
     
-    comment = Comment(**comment_data)
+    # Scored at its own created_at so archiving it later takes back exactly the same amount
+    comment = Comment(**comment_data, created_at=datetime.now(timezone.utc))
     
     db.session.add(comment)
+    # The counter UPDATE doubles as the live check: the blog may have been deleted since it was loaded
+    if bump_blog_counter(blog_id, Blog.comment_count, 1, event_score(comment_weight(), comment.created_at, current_epoch(blog_id))).rowcount == 0:
+      db.session.rollback()
+      return jsonify({"message": "Blog not found"}), 404
     db.session.commit()
+    cache.invalidate("blogs", f"blog:{blog_id}")
     
     return jsonify(return_comment_schema.dump(comment)), 201
   
@@ -164,15 +427,28 @@ def create_comment(blog_id):
 
 
 @blog_bp.route('/<int:blog_id>/comments', methods=["GET"])
+# include_archived pages depend on who asks, so they aren't shared through the cache
+@cache.cached(blog_namespaces, unless=archived_requested)
+@conditional(comments_validator)
 def get_comments_for_blog(blog_id):
-  blog = db.session.get(Blog, blog_id)
-  
-  if not blog:
-    return jsonify({"message": "Blog not found"}), 404
-  
   try:
-    comments = blog.comments
-    return jsonify(return_comments_schema.dump(comments)), 200
+    limit, cursor, newest_first, include_archived = comment_page_args()
+    fields = comment_serializer.requested_fields()
+    comments, next_cursor = keyset_page(
+      visible_comments(comment_rows(fields), blog_id, optional_user_id() if include_archived else None),
+      Comment, limit, cursor, newest_first, scalars=False
+    )
+    # Only an empty page needs telling apart from a missing (or soft-deleted) blog
+    if not comments and not blog_exists(blog_id):
+      return jsonify({"message": "Blog not found"}), 404
+    
+    return jsonify({
+      "comments": serialize_comment_rows(comments, fields),
+      "next_cursor": next_cursor
+    }), 200
+  
+  except (PaginationError, FieldsError) as err:
+    return jsonify({"error": str(err)}), 400
   
   except Exception as e:
     return jsonify({
@@ -186,7 +462,7 @@ def get_comments_for_blog(blog_id):
 def update_comment(blog_id, comment_id):
   user_id = g.user_id
   
-  blog = db.session.get(Blog, blog_id)
+  blog = live_blog(blog_id)
   if not blog:
     return jsonify({"message": "Blog not found"}), 404
   
@@ -207,6 +483,7 @@ def update_comment(blog_id, comment_id):
     comment.is_updated = True
     
     db.session.commit()
+    cache.invalidate(f"blog:{comment.post_id}")
     
     return jsonify(return_comment_schema.dump(comment)), 200
   
@@ -230,7 +507,7 @@ def update_comment(blog_id, comment_id):
 def toggle_archive_comment(blog_id, comment_id):
   user_id = g.user_id
   
-  blog = db.session.get(Blog, blog_id)
+  blog = live_blog(blog_id)
   if not blog:
     return jsonify({"message": "Blog not found"}), 404
   
@@ -243,7 +520,11 @@ def toggle_archive_comment(blog_id, comment_id):
   
   try:
     comment.is_archived = not comment.is_archived
+    # Archiving takes the comment's trending score back out; unarchiving restores it
+    score = event_score(comment_weight(), comment.created_at, current_epoch(comment.post_id))
+    bump_blog_counter(comment.post_id, Blog.comment_count, -1 if comment.is_archived else 1, -score if comment.is_archived else score)
     db.session.commit()
+    cache.invalidate("blogs", f"blog:{comment.post_id}")
     
     return jsonify({
       "message": "Comment archived" if comment.is_archived else "Comment unarchived",
@@ -258,33 +539,308 @@ def toggle_archive_comment(blog_id, comment_id):
     }), 500
 
 
+def blog_exists(blog_id):
+  return db.session.scalar(select(Blog.id).where(Blog.id == blog_id, Blog.deleted_at.is_(None))) is not None
+
+def like_exists(user_id, blog_id):
+  return db.session.scalar(select(Like.id).where(Like.user_id == user_id, Like.post_id == blog_id)) is not None
+
+def buffer_like(like_buffer, user_id, blog_id, liked=None):
+  """Queue a like intent on the write-behind buffer. Returns (liked before, liked after), or None if the blog doesn't exist."""
+  if not blog_exists(blog_id):
+    return None
+  
+  before, after = like_buffer.apply(user_id, blog_id, lambda: like_exists(user_id, blog_id), liked)
+  if before != after:
+    cache.invalidate("blogs", f"blog:{blog_id}")
+  return before, after
+
+def add_like(user_id, blog_id):
+  """Like blog_id. Returns True if newly liked, False if it already was, None if the blog doesn't exist."""
+  now = datetime.now(timezone.utc)
+  try:
+    inserted = insert_like(user_id, blog_id, now)
+  except IntegrityError:
+    # Foreign key rejected the post_id
+    db.session.rollback()
+    return None
+  
+  if inserted:
+    # The counter UPDATE doubles as the existence check where foreign keys aren't enforced
+    if bump_blog_counter(blog_id, Blog.like_count, 1, event_score(like_weight(), now, current_epoch(blog_id))).rowcount == 0:
+      db.session.rollback()
+      return None
+  elif not blog_exists(blog_id):
+    return None
+  return inserted
+
+def remove_like(user_id, blog_id):
+  """Unlike blog_id. Returns True if a like was removed, False if there was none, None if the blog doesn't exist."""
+  created_at = delete_like(user_id, blog_id)
+  if created_at is not None:
+    bump_blog_counter(blog_id, Blog.like_count, -1, -event_score(like_weight(), created_at, current_epoch(blog_id)))
+    return True
+  return False if blog_exists(blog_id) else None
+
+
 @blog_bp.route("/<int:blog_id>/like", methods=["POST"])
 @token_required
 def toggle_like(blog_id):
   user_id = g.user_id
-  blog = db.session.get(Blog, blog_id)
-  
-  if not blog:
-    return jsonify({"message": "Blog not found"}), 404
   
   try:
-    existing_like = db.session.query(Like).filter_by(
-      user_id=user_id, post_id=blog_id
-      ).first()
+    like_buffer = current_app.extensions.get("like_buffer")
+    if like_buffer is not None:
+      state = buffer_like(like_buffer, user_id, blog_id)
+      if state is None:
+        return jsonify({"message": "Blog not found"}), 404
+      return (jsonify({"message": "Liked"}), 201) if state[1] else (jsonify({"message": "Unlike"}), 200)
     
-    if existing_like:
-      db.session.delete(existing_like)
+    # Delete first; only if nothing was deleted do we insert. Neither step can raise on a concurrent click.
+    removed = remove_like(user_id, blog_id)
+    if removed is None:
+      return jsonify({"message": "Blog not found"}), 404
+    
+    if removed:
       db.session.commit()
+      cache.invalidate("blogs", f"blog:{blog_id}")
+      return jsonify({"message": "Unlike"}), 200
+    
+    if add_like(user_id, blog_id) is None:
+      return jsonify({"message": "Blog not found"}), 404
+    
+    db.session.commit()
+    cache.invalidate("blogs", f"blog:{blog_id}")
+    return jsonify({"message": "Liked"}), 201
+  
+  except Exception as e:
+    db.session.rollback()
+    return jsonify({
+      "error": "Internal server error",
+      "details": str(e)
+    }), 500
+
+
+@blog_bp.route("/<int:blog_id>/like", methods=["PUT"])
+@token_required
+def like_blog(blog_id):
+  try:
+    like_buffer = current_app.extensions.get("like_buffer")
+    if like_buffer is not None:
+      state = buffer_like(like_buffer, g.user_id, blog_id, liked=True)
+      if state is None:
+        return jsonify({"message": "Blog not found"}), 404
+      return jsonify({"message": "Liked"}), 200 if state[0] else 201
+    
+    added = add_like(g.user_id, blog_id)
+    if added is None:
+      return jsonify({"message": "Blog not found"}), 404
+    
+    db.session.commit()
+    if added:
+      cache.invalidate("blogs", f"blog:{blog_id}")
+    return jsonify({"message": "Liked"}), 201 if added else 200
+  
+  except Exception as e:
+    db.session.rollback()
+    return jsonify({
+      "error": "Internal server error",
+      "details": str(e)
+    }), 500
+
+
+@blog_bp.route("/<int:blog_id>/like", methods=["DELETE"])
+@token_required
+def unlike_blog(blog_id):
+  try:
+    like_buffer = current_app.extensions.get("like_buffer")
+    if like_buffer is not None:
+      if buffer_like(like_buffer, g.user_id, blog_id, liked=False) is None:
+        return jsonify({"message": "Blog not found"}), 404
       return jsonify({"message": "Unlike"}), 200
+    
+    removed = remove_like(g.user_id, blog_id)
+    if removed is None:
+      return jsonify({"message": "Blog not found"}), 404
+    
+    db.session.commit()
+    if removed:
+      cache.invalidate("blogs", f"blog:{blog_id}")
+    return jsonify({"message": "Unlike"}), 200
+  
+  except Exception as e:
+    db.session.rollback()
+    return jsonify({
+      "error": "Internal server error",
+      "details": str(e)
+    }), 500
+
+
+class BatchError(ValueError):
+  pass
+
+
+def read_batch():
+  items = request.get_json()
+  if not isinstance(items, list):
+    raise BatchError("Expected a JSON array")
+  
+  max_items = current_app.config.get("BATCH_MAX_ITEMS", 1000)
+  if len(items) > max_items:
+    raise BatchError(f"A batch can hold at most {max_items} items")
+  return items
+
+def validate_batch(schema, items, results):
+  """Load the valid items with a many=True schema and record a 400 result for the rest."""
+  errors = schema.validate(items)
+  for index, messages in errors.items():
+    results[index] = {"index": index, "status": 400, "errors": messages}
+  
+  valid = [index for index in range(len(items)) if index not in errors]
+  return valid, schema.load([items[index] for index in valid])
+
+def record_inserts(results, indexes, inserted):
+  for index, (row_id, error) in zip(indexes, inserted):
+    if error is None:
+      results[index] = {"index": index, "status": 201, "id": row_id}
     else:
-      like = Like(user_id=user_id, post_id=blog_id)
-      db.session.add(like)
-      db.session.commit()
-      return jsonify({"message": "Liked"}), 201
+      results[index] = {"index": index, "status": getattr(error, "status", 400), "error": str(error)}
+
+def existing_blog_ids(post_ids):
+  return set(db.session.scalars(select(Blog.id).where(Blog.id.in_(set(post_ids)), Blog.deleted_at.is_(None))).all())
+
+def batch_response(results):
+  # 207 Multi-Status when only part of the batch went through
+  status = 201 if all(result["status"] in (200, 201) for result in results) else 207
+  return jsonify({"results": results}), status
+
+
+@blog_bp.route("/batch", methods=["POST"])
+@token_required
+def create_blogs_batch():
+  user = get_current_user()
+  if not user:
+    return jsonify({"message": "No user found"}), 404
+  
+  try:
+    items = read_batch()
+    results = [None] * len(items)
+    indexes, blogs_data = validate_batch(create_blogs_schema, items, results)
+    
+    fanned_out = pushes(user)
+    rows = [{**blog_data, "author_id": user.id, "fanned_out": fanned_out} for blog_data in blogs_data]
+    
+    def on_inserted(rows, ids):
+      index_blogs(db.session.connection(), [{**row, "id": blog_id} for row, blog_id in zip(rows, ids)])
+      fan_out(ids)
+    
+    inserted = insert_in_chunks(Blog, rows, current_app.config.get("BATCH_CHUNK_SIZE", 500), on_inserted)
+    record_inserts(results, indexes, inserted)
+    cache.invalidate("blogs")
+    
+    return batch_response(results)
+  
+  except BatchError as err:
+    return jsonify({"error": str(err)}), 400
+  
+  except Exception as e:
+    db.session.rollback()
+    return jsonify({
+      "error": "Internal server error",
+      "details": str(e)
+    }), 500
+
+
+@blog_bp.route("/comments/batch", methods=["POST"])
+@token_required
+def create_comments_batch():
+  user_id = g.user_id
+  
+  try:
+    items = read_batch()
+    results = [None] * len(items)
+    indexes, comments_data = validate_batch(batch_comments_schema, items, results)
+    
+    now = datetime.now(timezone.utc)
+    blog_ids = existing_blog_ids(comment["post_id"] for comment in comments_data)
+    rows, row_indexes = [], []
+    for index, comment_data in zip(indexes, comments_data):
+      if comment_data["post_id"] in blog_ids:
+        rows.append({**comment_data, "user_id": user_id, "created_at": now})
+        row_indexes.append(index)
+      else:
+        results[index] = {"index": index, "status": 404, "error": "Blog not found"}
+    
+    def on_inserted(rows, ids):
+      epoch = read_epoch()
+      for post_id, amount in Counter(row["post_id"] for row in rows).items():
+        # Deleted since existing_blog_ids(): reject the chunk, and then just its rows on the row-by-row retry
+        if bump_blog_counter(post_id, Blog.comment_count, amount, event_score(comment_weight(), now, epoch_for(epoch, post_id)) * amount).rowcount == 0:
+          raise RowRejected("Blog not found", 404)
+    
+    inserted = insert_in_chunks(Comment, rows, current_app.config.get("BATCH_CHUNK_SIZE", 500), on_inserted)
+    record_inserts(results, row_indexes, inserted)
+    cache.invalidate("blogs", *(f"blog:{post_id}" for post_id in {row["post_id"] for row in rows}))
+    
+    return batch_response(results)
+  
+  except BatchError as err:
+    return jsonify({"error": str(err)}), 400
   
   except Exception as e:
     db.session.rollback()
     return jsonify({
       "error": "Internal server error",
       "details": str(e)
-    }), 500
\ No newline at end of file
+    }), 500
+
+
+@blog_bp.route("/likes/batch", methods=["POST"])
+@token_required
+def create_likes_batch():
+  user_id = g.user_id
+  
+  try:
+    items = read_batch()
+    results = [None] * len(items)
+    indexes, likes_data = validate_batch(batch_likes_schema, items, results)
+    
+    post_ids = [like["post_id"] for like in likes_data]
+    now = datetime.now(timezone.utc)
+    blog_ids = existing_blog_ids(post_ids)
+    liked = set(db.session.scalars(
+      select(Like.post_id).where(Like.user_id == user_id, Like.post_id.in_(set(post_ids)))
+    ).all())
+    
+    rows, row_indexes = [], []
+    for index, post_id in zip(indexes, post_ids):
+      if post_id not in blog_ids:
+        results[index] = {"index": index, "status": 404, "error": "Blog not found"}
+      elif post_id in liked:
+        results[index] = {"index": index, "status": 200, "message": "Already liked"}
+      else:
+        liked.add(post_id)
+        rows.append({"user_id": user_id, "post_id": post_id, "created_at": now})
+        row_indexes.append(index)
+    
+    def on_inserted(rows, ids):
+      epoch = read_epoch()
+      for row in rows:
+        if bump_blog_counter(row["post_id"], Blog.like_count, 1, event_score(like_weight(), now, epoch_for(epoch, row["post_id"]))).rowcount == 0:
+          raise RowRejected("Blog not found", 404)
+    
+    inserted = insert_in_chunks(Like, rows, current_app.config.get("BATCH_CHUNK_SIZE", 500), on_inserted)
+    record_inserts(results, row_indexes, inserted)
+    cache.invalidate("blogs", *(f"blog:{row['post_id']}" for row in rows))
+    
+    return batch_response(results)
+  
+  except BatchError as err:
+    return jsonify({"error": str(err)}), 400
+  
+  except Exception as e:
+    db.session.rollback()
+    return jsonify({
+      "error": "Internal server error",
+      "details": str(e)
+    }), 500
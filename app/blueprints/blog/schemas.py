@@ -1,8 +1,10 @@
 from marshmallow import fields
 from marshmallow.validate import Length
 from app.extenstions import ma
+from utils.metrics import TimedDumpMixin
 from app.models import Blog, Comment, Like
 from app.blueprints.user.schemas import UserSchema
+from utils.like_buffer import pending_like_delta
 
 
 class CreateBlogSchema(ma.Schema):
@@ -10,22 +12,36 @@ class CreateBlogSchema(ma.Schema):
   body = fields.String(required=True, validate=Length(min=10, max=5000))
 
 
-class BlogSchema(ma.SQLAlchemyAutoSchema):
+class BlogSchema(TimedDumpMixin, ma.SQLAlchemyAutoSchema):
   class Meta:
     model = Blog
     load_instance = True
     include_fk = True
+    # Relative to the trending epoch, meaningless to clients
+    exclude = ("trending_score", "deleted_at", "fanned_out")
+  
+  like_count = fields.Method("get_like_count", dump_only=True)
+  comment_count = fields.Integer(dump_only=True)
+  
+  def get_like_count(self, obj):
+    return obj.like_count + pending_like_delta(obj.id)
 
 
-class ReturnBlogSchema(ma.SQLAlchemyAutoSchema):
+class ReturnBlogSchema(TimedDumpMixin, ma.SQLAlchemyAutoSchema):
   class Meta:
     model = Blog
     load_instance = True
     include_fk = True
-    exclude = ("author_id",)
+    exclude = ("author_id", "trending_score", "deleted_at", "fanned_out")
   
   is_archived = fields.Boolean(dump_only=True)
+  like_count = fields.Method("get_like_count", dump_only=True)
+  comment_count = fields.Integer(dump_only=True)
   author = fields.Nested(UserSchema(only=("id", "username", "name")), dump_only=True)
+  
+  def get_like_count(self, obj):
+    # Likes waiting in the write-behind buffer count too
+    return obj.like_count + pending_like_delta(obj.id)
 
 
 class CreateCommentSchema(ma.Schema):
@@ -33,7 +49,16 @@ class CreateCommentSchema(ma.Schema):
   user_id = fields.Integer(load_only=True)
   post_id = fields.Integer(load_only=True)
 
-class CommentSchema(ma.SQLAlchemyAutoSchema):
+class BatchCommentSchema(ma.Schema):
+  post_id = fields.Integer(required=True)
+  content = fields.String(required=True, validate=Length(min=1, max=250))
+
+
+class BatchLikeSchema(ma.Schema):
+  post_id = fields.Integer(required=True)
+
+
+class CommentSchema(TimedDumpMixin, ma.SQLAlchemyAutoSchema):
   class Meta:
     model = Comment
     load_instance = True
@@ -42,7 +67,7 @@ class CommentSchema(ma.SQLAlchemyAutoSchema):
   updated_at = fields.DateTime(dump_only=True)
 
 
-class ReturnCommentSchema(ma.SQLAlchemyAutoSchema):
+class ReturnCommentSchema(TimedDumpMixin, ma.SQLAlchemyAutoSchema):
   class Meta:
     model = Comment
     load_instance = True
@@ -52,29 +77,32 @@ class ReturnCommentSchema(ma.SQLAlchemyAutoSchema):
   user = fields.Nested(UserSchema(only=("id", "username", "name")), dump_only=True)
 
 
-class LikeSchema(ma.SQLAlchemyAutoSchema):
+class LikeSchema(TimedDumpMixin, ma.SQLAlchemyAutoSchema):
   class Meta:
     model = Like
     load_instance = True
     include_fk = True
-    
-    likes_count = fields.Method("get_likes_count", dump_only=True)
+  
+  likes_count = fields.Method("get_likes_count", dump_only=True)
   
   def get_likes_count(self, obj):
-    return len(obj.likes)
+    return obj.post.like_count + pending_like_delta(obj.post_id)
 
 
 create_blog_schema = CreateBlogSchema()
+create_blogs_schema = CreateBlogSchema(many=True)
 blog_schema = BlogSchema()
 blogs_schema = BlogSchema(many=True)
 return_blog_schema = ReturnBlogSchema()
 return_blogs_schema = ReturnBlogSchema(many=True)
 
 create_comment_schema = CreateCommentSchema()
+batch_comments_schema = BatchCommentSchema(many=True)
 comment_schema = CommentSchema()
 comments_schema = CommentSchema(many=True)
 return_comment_schema = ReturnCommentSchema()
 return_comments_schema = ReturnCommentSchema(many=True)
 
 like_schema = LikeSchema()
-likes_schema = LikeSchema(many=True)
\ No newline at end of file
+likes_schema = LikeSchema(many=True)
+batch_likes_schema = BatchLikeSchema(many=True)
\ No newline at end of file
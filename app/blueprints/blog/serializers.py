@@ -0,0 +1,73 @@
+from flask import current_app
+from sqlalchemy import func
+from app.models import User, Blog, Comment
+from utils.fieldsets import EXCERPT_LENGTH, RowSerializer, isoformat, make_excerpt
+from utils.metrics import timed_serialization
+
+# Column-row equivalents of return_blogs_schema / return_comments_schema for read endpoints: no ORM objects,
+# identity map or per-field marshmallow dispatch, and ?fields= narrows the SELECT itself.
+# With the default fields the output is exactly the schema's; tests/test_serializers.py keeps them in lockstep.
+
+
+def nested_user(user_id, username, name):
+  return {"id": user_id, "username": username, "name": name} if user_id is not None else None
+
+
+blog_serializer = RowSerializer(
+  key_columns=(Blog.id, Blog.created_at),
+  fields={
+    "id": ((Blog.id,), None),
+    "title": ((Blog.title,), None),
+    "body": ((Blog.body,), None),
+    # One character past the limit tells make_excerpt whether the body was cut, without reading all of it
+    "excerpt": ((func.substr(Blog.body, 1, EXCERPT_LENGTH + 1).label("excerpt"),), make_excerpt),
+    "created_at": ((Blog.created_at,), isoformat),
+    "updated_at": ((Blog.updated_at,), isoformat),
+    "is_archived": ((Blog.is_archived,), None),
+    "like_count": ((Blog.like_count,), None),
+    "comment_count": ((Blog.comment_count,), None),
+    "author": ((User.id.label("author_id"), User.username.label("author_username"), User.name.label("author_name")), nested_user),
+  },
+  default_fields=("id", "title", "body", "created_at", "updated_at", "is_archived", "like_count", "comment_count", "author"),
+  join=lambda stmt: stmt.outerjoin(User, Blog.author_id == User.id),
+  joined=("author",)
+)
+
+comment_serializer = RowSerializer(
+  key_columns=(Comment.id, Comment.created_at),
+  fields={
+    "id": ((Comment.id,), None),
+    "content": ((Comment.content,), None),
+    "is_updated": ((Comment.is_updated,), None),
+    "created_at": ((Comment.created_at,), isoformat),
+    "updated_at": ((Comment.updated_at,), isoformat),
+    "is_archived": ((Comment.is_archived,), None),
+    "post_id": ((Comment.post_id,), None),
+    "user": ((User.id.label("user_id"), User.username.label("user_username"), User.name.label("user_name")), nested_user),
+  },
+  default_fields=("id", "content", "is_updated", "created_at", "updated_at", "is_archived", "post_id", "user"),
+  join=lambda stmt: stmt.outerjoin(User, Comment.user_id == User.id),
+  joined=("user",)
+)
+
+
+def blog_rows(fields=None):
+  return blog_serializer.select(fields)
+
+def comment_rows(fields=None):
+  return comment_serializer.select(fields)
+
+def serialize_blog_rows(rows, fields=None):
+  fields = fields or blog_serializer.default_fields
+  like_buffer = current_app.extensions.get("like_buffer")
+  with timed_serialization():
+    blogs = blog_serializer.serialize(rows, fields)
+    if like_buffer is not None and "like_count" in fields:
+      # Likes waiting in the write-behind buffer count too
+      for blog, row in zip(blogs, rows):
+        blog["like_count"] += like_buffer.delta(row.id)
+    return blogs
+
+def serialize_comment_rows(rows, fields=None):
+  with timed_serialization():
+    return comment_serializer.serialize(rows, fields)
@@ -0,0 +1,21 @@
+from flask import current_app, jsonify
+from app.blueprints.metrics import metrics_bp
+from app.models import db
+
+
+@metrics_bp.route("/pool", methods=["GET"])
+def get_pool_metrics():
+  pool = db.engine.pool
+  if not hasattr(pool, "snapshot"):
+    return jsonify({"error": f"Pool metrics are not available for {type(pool).__name__}"}), 404
+  
+  return jsonify(pool.snapshot()), 200
+
+
+@metrics_bp.route("", methods=["GET"])
+def get_metrics():
+  metrics = current_app.extensions.get("metrics")
+  if metrics is None:
+    return jsonify({"error": "Metrics are disabled"}), 404
+  
+  return current_app.response_class(metrics.expose(), mimetype="text/plain; version=0.0.4; charset=utf-8")
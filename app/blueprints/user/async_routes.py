@@ -0,0 +1,38 @@
+from flask import jsonify, g
+from sqlalchemy import select
+from sqlalchemy.orm import load_only
+from app.models import User
+from app.blueprints.user.schemas import user_schema_for, USER_FIELDS
+from utils.async_db import async_session
+from utils.auth import token_required
+from utils.fieldsets import FieldsError, get_fields
+
+# Async twins of read routes in routes.py, served by app.asgi on the async engine
+
+
+@token_required
+async def get_me():
+  try:
+    fields = get_fields(USER_FIELDS, USER_FIELDS)
+    async with async_session() as session:
+      user = await session.scalar(
+        select(User).options(load_only(*(getattr(User, field) for field in fields))).where(User.id == g.user_id, User.deleted_at.is_(None))
+      )
+    if not user:
+      return jsonify({"message": "User not found"}), 404
+    
+    return jsonify(user_schema_for(fields).dump(user)), 200
+  
+  except FieldsError as err:
+    return jsonify({"error": str(err)}), 400
+  
+  except Exception as e:
+    return jsonify({
+      "error": "Internal server error",
+      "details": str(e)
+    }), 500
+
+
+async_views = {
+  "user_bp.get_me": get_me,
+}
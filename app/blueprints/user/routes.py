@@ -1,10 +1,18 @@
 from flask import request, jsonify, current_app, g
 from marshmallow import ValidationError
+from sqlalchemy import select, false
 from sqlalchemy.exc import IntegrityError
-from app.models import db, User
-from app.blueprints.user.schemas import user_schema, create_user_schema
+from sqlalchemy.orm import load_only
+from app.models import db, User, Blog, Comment, Like
+from app.extenstions import cache
+from app.blueprints.user.schemas import user_schema, create_user_schema, user_schema_for, USER_FIELDS
 from app.blueprints.user import user_bp
-from utils.auth import hash_password, check_password, generate_token, token_required
+from app.blueprints.blog.serializers import blog_serializer, comment_serializer, blog_rows, comment_rows, serialize_blog_rows, serialize_comment_rows
+from utils.auth import hash_password, check_password, needs_rehash, generate_token, token_required, forget_principal, optional_user_id, HashingBusy
+from utils.fieldsets import FieldsError, get_fields, isoformat
+from utils.pagination import PaginationError, get_page_args, get_newest_first, keyset_page, keyset_query, split_page
+from utils.feed import follow, unfollow, feed_page
+from utils.purge import soft_delete_user, wake_purge_worker
 
 
 @user_bp.route("/login", methods=["POST"])
@@ -18,11 +26,19 @@ def login():
     if not email or not password:
       return jsonify({"error": "Email and password are required"}), 400
     
-    user = db.session.query(User).filter_by(email=email).first()
+    user = db.session.query(User).filter_by(email=email, deleted_at=None).first()
     
     if not user or not check_password(password, user.password):
       return jsonify({"error": "Invalid email or password"}), 401
     
+    if needs_rehash(user.password):
+      try:
+        user.password = hash_password(password)
+        db.session.commit()
+      except HashingBusy:
+        # Upgrading the hash can wait for the next login
+        pass
+    
     token = generate_token(user.id)
     
     return jsonify({
@@ -36,6 +52,9 @@ def login():
         "email": user.email,
       }
     }), 200
+  
+  except HashingBusy:
+    return jsonify({"error": "Server busy, please try again"}), 503, {"Retry-After": "1"}
     
   except Exception as e:
     return jsonify({
@@ -60,6 +79,9 @@ def create_user():
   except ValidationError as err:
     return jsonify({"errors": err.messages}), 400
   
+  except HashingBusy:
+    return jsonify({"error": "Server busy, please try again"}), 503, {"Retry-After": "1"}
+  
   except IntegrityError as e:
     db.session.rollback()
     
@@ -72,11 +94,266 @@ def create_user():
     return jsonify({"error": "Internal server error"}), 500
 
 
+@user_bp.route("/me", methods=["GET"])
+@token_required
+def get_me():
+  try:
+    fields = get_fields(USER_FIELDS, USER_FIELDS)
+    user = db.session.scalars(
+      select(User).options(load_only(*(getattr(User, field) for field in fields))).where(User.id == g.user_id, User.deleted_at.is_(None))
+    ).first()
+    if not user:
+      return jsonify({"message": "User not found"}), 404
+    
+    return jsonify(user_schema_for(fields).dump(user)), 200
+  
+  except FieldsError as err:
+    return jsonify({"error": str(err)}), 400
+  
+  except Exception as e:
+    return jsonify({
+      "error": "Internal server error",
+      "details": str(e)
+    }), 500
+
+
+@user_bp.route("/me/feed", methods=["GET"])
+@token_required
+def get_feed():
+  try:
+    limit, cursor = get_page_args()
+    fields = blog_serializer.requested_fields()
+    blogs, next_cursor = feed_page(g.user_id, limit, cursor, blog_rows(fields))
+    
+    return jsonify({
+      "blogs": serialize_blog_rows(blogs, fields),
+      "next_cursor": next_cursor
+    }), 200
+  
+  except (PaginationError, FieldsError) as err:
+    return jsonify({"error": str(err)}), 400
+  
+  except Exception as e:
+    return jsonify({
+      "error": "Internal server error",
+      "details": str(e)
+    }), 500
+
+
+def user_exists(user_id):
+  return db.session.scalar(select(User.id).where(User.id == user_id, User.deleted_at.is_(None))) is not None
+
+
+@user_bp.route("/<int:user_id>/blogs", methods=["GET"])
+def get_user_blogs(user_id):
+  try:
+    limit, cursor = get_page_args()
+    newest_first = get_newest_first()
+    fields = blog_serializer.requested_fields()
+    # One range of ix_blogs_author_created
+    blogs, next_cursor = keyset_page(
+      blog_rows(fields).where(Blog.author_id == user_id, Blog.deleted_at.is_(None)), Blog, limit, cursor, newest_first, scalars=False
+    )
+    if not blogs and not user_exists(user_id):
+      return jsonify({"message": "User not found"}), 404
+    
+    return jsonify({
+      "blogs": serialize_blog_rows(blogs, fields),
+      "next_cursor": next_cursor
+    }), 200
+  
+  except (PaginationError, FieldsError) as err:
+    return jsonify({"error": str(err)}), 400
+  
+  except Exception as e:
+    return jsonify({
+      "error": "Internal server error",
+      "details": str(e)
+    }), 500
+
+
+def user_comments(user_id, fields=None, include_archived=False):
+  # Matches ix_comments_user_archived_created; is_archived is NOT NULL, so equality keeps the range
+  stmt = comment_rows(fields).where(Comment.user_id == user_id)
+  return stmt if include_archived else stmt.where(Comment.is_archived == false())
+
+
+@user_bp.route("/<int:user_id>/comments", methods=["GET"])
+def get_user_comments(user_id):
+  try:
+    limit, cursor = get_page_args()
+    newest_first = get_newest_first()
+    # Only the user themselves sees their archived comments
+    include_archived = request.args.get("include_archived", "false").lower() == "true" and optional_user_id() == user_id
+    fields = comment_serializer.requested_fields()
+    # Checked up front: a deleted user's comments linger until the purge job reaches them
+    if not user_exists(user_id):
+      return jsonify({"message": "User not found"}), 404
+    
+    comments, next_cursor = keyset_page(user_comments(user_id, fields, include_archived), Comment, limit, cursor, newest_first, scalars=False)
+    
+    return jsonify({
+      "comments": serialize_comment_rows(comments, fields),
+      "next_cursor": next_cursor
+    }), 200
+  
+  except (PaginationError, FieldsError) as err:
+    return jsonify({"error": str(err)}), 400
+  
+  except Exception as e:
+    return jsonify({
+      "error": "Internal server error",
+      "details": str(e)
+    }), 500
+
+
+@user_bp.route("/me/likes", methods=["GET"])
+@token_required
+def get_my_likes():
+  try:
+    limit, cursor = get_page_args()
+    fields = blog_serializer.requested_fields()
+    
+    # A range of ix_likes_user_created, then one IN (...) for the liked blogs
+    likes, next_cursor = split_page(db.session.execute(keyset_query(
+      select(Like.id, Like.created_at, Like.post_id).where(Like.user_id == g.user_id), Like, limit, cursor
+    )).all(), limit)
+    rows = {row.id: row for row in db.session.execute(
+      blog_rows(fields).where(Blog.id.in_([like.post_id for like in likes]), Blog.deleted_at.is_(None))
+    )} if likes else {}
+    
+    liked = [(like, rows[like.post_id]) for like in likes if like.post_id in rows]
+    blogs = serialize_blog_rows([row for _, row in liked], fields)
+    
+    return jsonify({
+      "likes": [{"liked_at": isoformat(like.created_at), "blog": blog} for (like, _), blog in zip(liked, blogs)],
+      "next_cursor": next_cursor
+    }), 200
+  
+  except (PaginationError, FieldsError) as err:
+    return jsonify({"error": str(err)}), 400
+  
+  except Exception as e:
+    return jsonify({
+      "error": "Internal server error",
+      "details": str(e)
+    }), 500
+
+
+@user_bp.route("/me/likes/status", methods=["GET"])
+@token_required
+def get_my_like_status():
+  raw = request.args.get("ids", "")
+  try:
+    blog_ids = list(dict.fromkeys(int(blog_id) for blog_id in raw.split(",") if blog_id.strip()))
+  except ValueError:
+    return jsonify({"error": "ids must be a comma-separated list of integers"}), 400
+  
+  if not blog_ids:
+    return jsonify({"error": "ids is required"}), 400
+  
+  maximum = current_app.config.get("PAGE_SIZE_MAX", 100)
+  if len(blog_ids) > maximum:
+    return jsonify({"error": f"At most {maximum} ids per request"}), 400
+  
+  try:
+    # Answered from unique_user_post_like alone
+    liked = set(db.session.scalars(
+      select(Like.post_id).where(Like.user_id == g.user_id, Like.post_id.in_(blog_ids))
+    ).all())
+    
+    like_buffer = current_app.extensions.get("like_buffer")
+    if like_buffer is not None:
+      # Intents still waiting in the write-behind buffer win over the table
+      for blog_id, pending in like_buffer.pending(g.user_id, blog_ids).items():
+        if pending:
+          liked.add(blog_id)
+        else:
+          liked.discard(blog_id)
+    
+    return jsonify({"liked": {str(blog_id): blog_id in liked for blog_id in blog_ids}}), 200
+  
+  except Exception as e:
+    return jsonify({
+      "error": "Internal server error",
+      "details": str(e)
+    }), 500
+
+
+@user_bp.route("/<int:user_id>/follow", methods=["PUT"])
+@token_required
+def follow_user(user_id):
+  if user_id == g.user_id:
+    return jsonify({"message": "You cannot follow yourself"}), 400
+  
+  if not user_exists(user_id):
+    return jsonify({"message": "User not found"}), 404
+  
+  try:
+    created = follow(g.user_id, user_id)
+    db.session.commit()
+    
+    if created:
+      return jsonify({"message": "User followed"}), 201
+    return jsonify({"message": "Already following user"}), 200
+  
+  except Exception as e:
+    db.session.rollback()
+    return jsonify({
+      "error": "Internal server error",
+      "details": str(e)
+    }), 500
+
+
+@user_bp.route("/<int:user_id>/follow", methods=["DELETE"])
+@token_required
+def unfollow_user(user_id):
+  if not user_exists(user_id):
+    return jsonify({"message": "User not found"}), 404
+  
+  try:
+    unfollow(g.user_id, user_id)
+    db.session.commit()
+    
+    return jsonify({"message": "User unfollowed"}), 200
+  
+  except Exception as e:
+    db.session.rollback()
+    return jsonify({
+      "error": "Internal server error",
+      "details": str(e)
+    }), 500
+
+
+@user_bp.route("/me", methods=["DELETE"])
+@token_required
+def delete_me():
+  try:
+    job = soft_delete_user(g.user_id)
+    if job is None:
+      return jsonify({"message": "User not found"}), 404
+    
+    db.session.commit()
+    forget_principal(g.user_id)
+    # Their blogs vanish from every list, and their name from every cached payload
+    cache.clear()
+    wake_purge_worker()
+    
+    return jsonify({"message": "User deleted", "purge_job_id": job.id}), 202
+  
+  except Exception as e:
+    db.session.rollback()
+    return jsonify({
+      "error": "Internal server error",
+      "details": str(e)
+    }), 500
+
+
 @user_bp.route("/me", methods=["PATCH"])
 @token_required
 def update_user():
     user = db.session.get(User, g.user_id)
-    if not user:
+    if not user or user.deleted_at is not None:
       return jsonify({"message": "User not found"}), 404
     
     data = request.get_json()
@@ -87,12 +364,15 @@ def update_user():
       }), 400
 
     try:
-      for field in ("id", "created_at", "password"):
+      for field in ("id", "created_at", "password", "follower_count"):
         data.pop(field, None)
         
       updated_user = user_schema.load(data, instance=user, partial=True)
       
       db.session.commit()
+      forget_principal(user.id)
+      # Author name/username is nested in every cached blog and comment payload
+      cache.clear()
       
       return jsonify(user_schema.dump(updated_user)), 200
     
@@ -1,7 +1,9 @@
+from functools import lru_cache
 from marshmallow import fields
 from marshmallow.validate import Length
 from app.models import User
 from app.extenstions import ma
+from utils.metrics import TimedDumpMixin
 
 class CreateUserSchema(ma.Schema):
   name = fields.String(required=True)
@@ -10,16 +12,25 @@ class CreateUserSchema(ma.Schema):
   password = fields.String(required=True, load_only=True)
 
 
-class UserSchema(ma.SQLAlchemyAutoSchema):
+class UserSchema(TimedDumpMixin, ma.SQLAlchemyAutoSchema):
   class Meta:
     model = User
     load_instance = True
-    exclude = ("password",)
+    exclude = ("password", "deleted_at")
     
   email = fields.Email()
   username = fields.Str(validate=Length(min=3))
+  follower_count = fields.Integer(dump_only=True)
 
 
 create_user_schema = CreateUserSchema()
 user_schema = UserSchema()
-users_schema = UserSchema(many=True)
\ No newline at end of file
+users_schema = UserSchema(many=True)
+
+USER_FIELDS = ("id", "name", "username", "email", "created_at", "follower_count")
+
+
+@lru_cache(maxsize=64)
+def user_schema_for(only):
+  # Schema construction is expensive; one instance per distinct ?fields= selection
+  return UserSchema(only=only)
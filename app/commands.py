@@ -0,0 +1,100 @@
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import select, update, func
+from flask import current_app
+from app.models import db, User, Blog, Comment, Like, Follow, PurgeJob
+from app.extenstions import cache
+from utils.search import rebuild_search_index
+from utils.feed import overlong_timelines, trim_timeline
+from utils.trending import decay_scores, rebuild_scores
+from utils.purge import run_pending
+
+
+@click.command("reconcile-counts")
+@with_appcontext
+def reconcile_counts():
+  """Recompute Blog.like_count, Blog.comment_count and User.follower_count from the likes, comments and follows tables."""
+  like_count = (
+    select(func.count(Like.id))
+    .where(Like.post_id == Blog.id)
+    .scalar_subquery()
+  )
+  comment_count = (
+    select(func.count(Comment.id))
+    .where(Comment.post_id == Blog.id, Comment.is_archived.is_not(True))
+    .scalar_subquery()
+  )
+  
+  result = db.session.execute(
+    update(Blog)
+    .values({Blog.like_count: like_count, Blog.comment_count: comment_count, Blog.updated_at: Blog.updated_at})
+    .execution_options(synchronize_session=False)
+  )
+  follower_count = (
+    select(func.count(Follow.id))
+    .where(Follow.followee_id == User.id)
+    .scalar_subquery()
+  )
+  users = db.session.execute(
+    update(User)
+    .values({User.follower_count: follower_count})
+    .execution_options(synchronize_session=False)
+  )
+  db.session.commit()
+  cache.clear()
+  
+  click.echo(f"Reconciled counts for {result.rowcount} blogs and {users.rowcount} users")
+
+
+@click.command("rebuild-search-index")
+@with_appcontext
+def rebuild_search_index_command():
+  """Repopulate the SQLite full-text mirror of the blogs table (MySQL/Postgres indexes need no rebuild)."""
+  rebuild_search_index(db.session.connection())
+  db.session.commit()
+  click.echo("Search index rebuilt")
+
+
+@click.command("trim-timelines")
+@click.option("--length", type=int, default=None, help="Entries to keep per user (default FEED_TIMELINE_LENGTH).")
+@with_appcontext
+def trim_timelines(length):
+  """Cap every home-feed timeline at its newest entries; older pages fall off the feed."""
+  length = length or current_app.config.get("FEED_TIMELINE_LENGTH", 800)
+  removed = 0
+  for user_id in overlong_timelines(length):
+    removed += trim_timeline(user_id, length)
+    db.session.commit()
+  click.echo(f"Removed {removed} timeline entries")
+
+
+@click.command("decay-trending")
+@click.option("--rebuild", is_flag=True, help="Recompute every score from the likes and comments tables first.")
+@with_appcontext
+def decay_trending(rebuild):
+  """Rescale trending scores to the current time now. The decay worker does this every TRENDING_DECAY_INTERVAL_MS."""
+  if rebuild:
+    click.echo(f"Rebuilt trending scores for {rebuild_scores()} blogs")
+  rescaled = decay_scores()
+  db.session.commit()
+  cache.invalidate("blogs")
+  click.echo(f"Decayed trending scores for {rescaled} blogs")
+
+
+@click.command("purge-deleted")
+@click.option("--batch-size", type=int, default=None, help="Rows per transaction (default PURGE_BATCH_SIZE).")
+@click.option("--status", is_flag=True, help="List unfinished jobs and their progress instead of running them.")
+@with_appcontext
+def purge_deleted(batch_size, status):
+  """Purge soft-deleted users and blogs now. Safe to re-run; interrupted jobs continue from their last batch."""
+  if status:
+    jobs = db.session.scalars(select(PurgeJob).where(PurgeJob.status == "pending").order_by(PurgeJob.id)).all()
+    for job in jobs:
+      click.echo(f"job {job.id}: {job.kind} {job.target_id}, step {job.step}, {job.purged} rows purged")
+    click.echo(f"{len(jobs)} pending jobs")
+    return
+  
+  def report(job):
+    click.echo(f"job {job.id}: {job.kind} {job.target_id}, step {job.step}, {job.purged} rows purged")
+  
+  click.echo(f"Finished {run_pending(batch_size, report)} purge jobs")
@@ -1,3 +1,5 @@
 from flask_marshmallow import Marshmallow
+from utils.cache import ResponseCache
 
-ma = Marshmallow()
\ No newline at end of file
+ma = Marshmallow()
+cache = ResponseCache()
\ No newline at end of file
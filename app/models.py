@@ -1,13 +1,14 @@
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
-from sqlalchemy import ForeignKey, String, DateTime, Boolean
+from sqlalchemy import ForeignKey, String, DateTime, Boolean, Integer, Float
 from datetime import datetime, timezone
-from typing import List
+from typing import List, Optional
+from utils.replica import RoutingSession
 
 class Base(DeclarativeBase):
   pass
 
-db = SQLAlchemy(model_class=Base)
+db = SQLAlchemy(model_class=Base, session_options={"class_": RoutingSession})
 
 
 class User(Base):
@@ -22,6 +23,9 @@ class User(Base):
     DateTime(timezone=True),
     default=lambda: datetime.now(timezone.utc)
   )
+  follower_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+  # Set on DELETE /users/me; the row and everything hanging off it are purged later by utils/purge.py
+  deleted_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
   
   blogs: Mapped[List["Blog"]] = relationship(back_populates="author", cascade="all, delete-orphan")
   comments: Mapped[List["Comment"]] = relationship(back_populates="user", cascade="all, delete-orphan")
@@ -31,6 +35,14 @@ class User(Base):
 
 class Blog(Base):
   __tablename__ = "blogs"
+  __table_args__ = (
+    db.Index("ix_blogs_created_at_id", "created_at", "id"),
+    db.Index("ix_blogs_author_created", "author_id", "created_at", "id"),
+    # The pull half of home feeds: a followee's posts that were never pushed into timelines
+    db.Index("ix_blogs_author_pulled", "author_id", "fanned_out", "created_at", "id"),
+    # GET /blogs/trending reads the top of this index and stops
+    db.Index("ix_blogs_trending", "is_archived", "trending_score", "id"),
+  )
   
   id: Mapped[int] = mapped_column(primary_key=True)
   title: Mapped[str] = mapped_column(String(100), nullable=False)
@@ -45,6 +57,12 @@ class Blog(Base):
     onupdate=lambda: datetime.now(timezone.utc)
   )
   is_archived: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+  like_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+  comment_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+  trending_score: Mapped[float] = mapped_column(Float, default=0.0, server_default="0", nullable=False)
+  deleted_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+  # Whether utils/feed.py pushed this post into followers' timelines; if not, feeds pull it from the blogs table
+  fanned_out: Mapped[bool] = mapped_column(Boolean, default=False, server_default="0", nullable=False)
   author_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
   
   author: Mapped["User"] = relationship(back_populates="blogs")
@@ -55,6 +73,10 @@ class Blog(Base):
 
 class Comment(Base):
   __tablename__ = "comments"
+  __table_args__ = (
+    db.Index("ix_comments_post_archived_created", "post_id", "is_archived", "created_at", "id"),
+    db.Index("ix_comments_user_archived_created", "user_id", "is_archived", "created_at", "id"),
+  )
   
   id: Mapped[int] = mapped_column(primary_key=True)
   content: Mapped[str] = mapped_column(String(250), nullable=False)
@@ -81,6 +103,10 @@ class Like(Base):
   __tablename__ = "likes"
   __table_args__ = (
     db.UniqueConstraint("user_id", "post_id", name="unique_user_post_like"),
+    # unique_user_post_like already answers "did this user like these posts"
+    # post_id on the end makes /users/me/likes an index-only scan
+    db.Index("ix_likes_user_created", "user_id", "created_at", "id", "post_id"),
+    db.Index("ix_likes_post_id", "post_id"),
   )
   
   id: Mapped[int] = mapped_column(primary_key=True)
@@ -92,4 +118,73 @@ class Like(Base):
   )
   
   user: Mapped["User"] = relationship(back_populates="likes")
-  post: Mapped["Blog"] = relationship(back_populates="likes")
\ No newline at end of file
+  post: Mapped["Blog"] = relationship(back_populates="likes")
+
+
+
+class Follow(Base):
+  __tablename__ = "follows"
+  __table_args__ = (
+    db.UniqueConstraint("follower_id", "followee_id", name="unique_follower_followee"),
+    # Fan-out walks an author's followers
+    db.Index("ix_follows_followee_follower", "followee_id", "follower_id"),
+  )
+  
+  id: Mapped[int] = mapped_column(primary_key=True)
+  follower_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+  followee_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+  created_at: Mapped[datetime] = mapped_column(
+    DateTime(timezone=True),
+    default=lambda: datetime.now(timezone.utc)
+  )
+
+
+
+class TimelineEntry(Base):
+  """A blog pushed into a follower's home feed. created_at is copied from the blog so a feed page is one index range."""
+  __tablename__ = "timelines"
+  __table_args__ = (
+    db.Index("ix_timelines_user_created", "user_id", "created_at", "blog_id"),
+  )
+  
+  user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+  blog_id: Mapped[int] = mapped_column(ForeignKey("blogs.id", ondelete="CASCADE"), primary_key=True)
+  created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+
+class TrendingEpoch(Base):
+  """Single row holding the instant Blog.trending_score values are expressed relative to. See utils/trending.py."""
+  __tablename__ = "trending_epoch"
+  
+  id: Mapped[int] = mapped_column(primary_key=True)
+  started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+  # Set while decay_scores is rescaling: blogs with id > rescaled_through are still against previous_started_at
+  previous_started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+  rescaled_through: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+
+
+
+class PurgeJob(Base):
+  """Background removal of a soft-deleted user or blog. step and purged record progress so a crashed run resumes."""
+  __tablename__ = "purge_jobs"
+  __table_args__ = (
+    db.Index("ix_purge_jobs_status", "status", "id"),
+  )
+  
+  id: Mapped[int] = mapped_column(primary_key=True)
+  kind: Mapped[str] = mapped_column(String(20), nullable=False)
+  target_id: Mapped[int] = mapped_column(Integer, nullable=False)
+  status: Mapped[str] = mapped_column(String(20), default="pending", nullable=False)
+  step: Mapped[str] = mapped_column(String(30), nullable=False)
+  purged: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+  claimed_until: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+  created_at: Mapped[datetime] = mapped_column(
+    DateTime(timezone=True),
+    default=lambda: datetime.now(timezone.utc)
+  )
+  updated_at: Mapped[datetime] = mapped_column(
+    DateTime(timezone=True),
+    default=lambda: datetime.now(timezone.utc),
+    onupdate=lambda: datetime.now(timezone.utc)
+  )
\ No newline at end of file
@@ -0,0 +1,11 @@
+from dotenv import load_dotenv
+from app.asgi import create_asgi_app
+from app.models import db
+
+load_dotenv()
+
+# uvicorn asgi_app:app, or gunicorn -k uvicorn.workers.UvicornWorker asgi_app:app
+app = create_asgi_app("ProductionConfig")
+
+with app.flask_app.app_context():
+  db.create_all()
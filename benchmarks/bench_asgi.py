@@ -0,0 +1,79 @@
+"""Concurrent-connection throughput: gunicorn sync workers vs the ASGI entry point under uvicorn.
+
+Run from the repo root: python -m benchmarks.bench_asgi [--workers 2] [--concurrency 1,16,64] [--database-uri ...]
+Both servers run ProductionConfig on the same seeded database with the response cache off, so every request
+reaches the database. The gap grows with database latency; point --database-uri at MySQL/Postgres to see it.
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from benchmarks.load import HttpClient, make_app, run_scenario
+from benchmarks.seed import scale_counts, seed
+
+SERVERS = {
+  "gunicorn-sync": lambda workers, port: ["gunicorn", "-w", str(workers), "-b", f"127.0.0.1:{port}", "flask_app:app"],
+  "uvicorn-asgi": lambda workers, port: ["uvicorn", "--workers", str(workers), "--port", str(port), "--log-level", "warning", "asgi_app:app"],
+}
+
+
+def free_port():
+  with socket.socket() as sock:
+    sock.bind(("127.0.0.1", 0))
+    return sock.getsockname()[1]
+
+def wait_until_up(url, timeout=30):
+  deadline = time.monotonic() + timeout
+  while time.monotonic() < deadline:
+    try:
+      urllib.request.urlopen(url + "/blogs/1").close()
+      return
+    except OSError:
+      time.sleep(0.2)
+  raise RuntimeError(f"{url} did not come up")
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("--blogs", type=int, default=2000)
+  parser.add_argument("--workers", type=int, default=2)
+  parser.add_argument("--concurrency", default="1,16,64")
+  parser.add_argument("--requests", type=int, default=1000)
+  parser.add_argument("--scenarios", default="fetch,list")
+  parser.add_argument("--database-uri", default="sqlite:///benchmark.db")
+  args = parser.parse_args()
+
+  app = make_app("TestingConfig", args.database_uri)
+  counts = scale_counts(args.blogs)
+  with app.app_context():
+    seed(counts)
+    # Hand the servers the resolved URI so relative sqlite paths point at the same file
+    database_uri = app.extensions["sqlalchemy"].engines[None].url.render_as_string(hide_password=False)
+
+  env = {**os.environ, "SQLALCHEMY_DATABASE_URI": database_uri, "CACHE_TYPE": "NullCache", "SERVER_TIMING_ENABLED": "true"}
+  results = {}
+  for name, command in SERVERS.items():
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen([sys.executable, "-m", *command(args.workers, port)], env=env)
+    try:
+      wait_until_up(url)
+      client = HttpClient(url)
+      results[name] = {
+        f"{scenario}@{concurrency}": run_scenario(client, scenario, counts, [], args.requests, concurrency, 50, 0)
+        for scenario in args.scenarios.split(",")
+        for concurrency in (int(value) for value in args.concurrency.split(","))
+      }
+    finally:
+      server.terminate()
+      server.wait()
+
+  print(json.dumps({"workers": args.workers, "dataset": counts, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+  main()
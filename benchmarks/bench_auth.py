@@ -0,0 +1,53 @@
+"""Per-request overhead of token_required with and without the token/principal caches.
+
+Run from the repo root: python -m benchmarks.bench_auth
+"""
+import time
+from app import create_app
+from app.models import db, User
+from utils.auth import generate_token, get_current_user, init_auth, token_required
+
+ITERATIONS = 5000
+
+
+def run(app, token):
+  @token_required
+  def view():
+    return get_current_user()
+
+  headers = {"Authorization": f"Bearer {token}"}
+  with app.test_request_context(headers=headers):
+    view()
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+      view()
+      db.session.remove()
+    elapsed = time.perf_counter() - start
+  return elapsed / ITERATIONS * 1_000_000
+
+
+def main():
+  app = create_app("TestingConfig")
+  with app.app_context():
+    db.drop_all()
+    db.create_all()
+    db.session.add(User(name="bench", username="bench", email="bench@test.com", password="x"))
+    db.session.commit()
+    token = generate_token(1)
+
+  app.config.update(TOKEN_CACHE_SIZE=0, PRINCIPAL_CACHE_TTL=0)
+  init_auth(app)
+  uncached = run(app, token)
+
+  app.config.update(TOKEN_CACHE_SIZE=1024, PRINCIPAL_CACHE_TTL=60)
+  init_auth(app)
+  cached = run(app, token)
+
+  print(f"token_required + user lookup, {ITERATIONS} requests")
+  print(f"  no caches:  {uncached:8.1f} us/request")
+  print(f"  cached:     {cached:8.1f} us/request")
+  print(f"  speedup:    {uncached / cached:8.1f}x")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,48 @@
+"""Bytes saved and CPU cost of response compression, per endpoint and encoding.
+
+Run from the repo root: python -m benchmarks.bench_compression [--blogs 2000]
+br and zstd are measured only when the brotli / zstandard packages are installed.
+"""
+import argparse
+import time
+from benchmarks.load import make_app
+from benchmarks.seed import scale_counts, seed
+from utils.compression import available_codecs
+
+ENDPOINTS = {
+  "list": "/blogs/?limit=20",
+  "list_excerpt": "/blogs/?limit=20&fields=id,title,excerpt,author",
+  "fetch": "/blogs/1",
+  "comments": "/blogs/1/comments?limit=50",
+  "export": "/blogs/export?format=ndjson",
+}
+REPEAT = 20
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("--blogs", type=int, default=2000)
+  args = parser.parse_args()
+
+  app = make_app("TestingConfig", "sqlite:///benchmark.db", CACHE_TYPE="NullCache", COMPRESS_ENABLED=False)
+  with app.app_context():
+    seed(scale_counts(args.blogs))
+  client = app.test_client()
+  codecs = available_codecs()
+  levels = app.config["COMPRESS_LEVELS"]
+
+  print(f"{'endpoint':<14}{'encoding':<10}{'raw bytes':>12}{'sent bytes':>12}{'saved':>8}{'cpu ms':>10}")
+  for name, url in ENDPOINTS.items():
+    body = client.get(url).get_data()
+    for codec in codecs.values():
+      level = levels.get(codec.name)
+      start = time.perf_counter()
+      for _ in range(REPEAT):
+        compressed = codec.compress(body, level)
+      elapsed = (time.perf_counter() - start) / REPEAT * 1000
+      saved = 1 - len(compressed) / len(body)
+      print(f"{name:<14}{f'{codec.name}:{level}':<10}{len(body):>12}{len(compressed):>12}{saved:>8.1%}{elapsed:>10.3f}")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,56 @@
+"""List serialization: ORM objects + marshmallow vs column rows + the fast-path serializers.
+
+Run from the repo root: python -m benchmarks.bench_serializers
+Both paths include the query and the JSON encoding, as a list endpoint would.
+"""
+import time
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+from app.models import db, User, Blog
+from app.blueprints.blog.schemas import return_blogs_schema
+from app.blueprints.blog.serializers import blog_rows, serialize_blog_rows
+from benchmarks.load import make_app
+from benchmarks.seed import scale_counts, seed
+
+SIZES = (1000, 10000)
+REPEAT = 5
+
+
+def schema_path(app, limit):
+  blogs = db.session.scalars(
+    select(Blog).options(selectinload(Blog.author).load_only(User.id, User.username, User.name)).order_by(Blog.id).limit(limit)
+  ).all()
+  return app.json.dumps(return_blogs_schema.dump(blogs))
+
+def fast_path(app, limit):
+  rows = db.session.execute(blog_rows().order_by(Blog.id).limit(limit)).all()
+  return app.json.dumps(serialize_blog_rows(rows))
+
+def best_of(app, path, limit):
+  timings = []
+  for _ in range(REPEAT):
+    with app.test_request_context():
+      start = time.perf_counter()
+      path(app, limit)
+      timings.append(time.perf_counter() - start)
+      db.session.remove()
+  return min(timings) * 1000
+
+
+def main():
+  app = make_app("TestingConfig", "sqlite:///benchmark.db", CACHE_TYPE="NullCache")
+  with app.app_context():
+    seed(scale_counts(max(SIZES)))
+
+  with app.test_request_context():
+    assert schema_path(app, 100) == fast_path(app, 100)
+
+  print(f"GET /blogs/ style list, best of {REPEAT}")
+  for size in SIZES:
+    slow = best_of(app, schema_path, size)
+    fast = best_of(app, fast_path, size)
+    print(f"  {size:>6} rows: schema {slow:8.1f} ms   fast path {fast:8.1f} ms   speedup {slow / fast:5.1f}x")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,46 @@
+"""Compare two benchmarks.load reports and flag regressions.
+
+Run from the repo root: python -m benchmarks.compare before.json after.json [--metric p95_ms] [--threshold 0.1]
+Exits with status 1 if any scenario's metric got worse by more than the threshold.
+"""
+import argparse
+import json
+import sys
+
+
+def compare(before, after, metric="p95_ms", threshold=0.1):
+  rows = []
+  for name, result in after["results"].items():
+    old = before["results"].get(name, {}).get(metric)
+    new = result.get(metric)
+    if old is None or new is None:
+      continue
+    change = (new - old) / old if old else 0.0
+    rows.append((name, old, new, change, change > threshold))
+  return rows
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("before")
+  parser.add_argument("after")
+  parser.add_argument("--metric", default="p95_ms")
+  parser.add_argument("--threshold", type=float, default=0.1, help="allowed relative slowdown, e.g. 0.1 for 10%%")
+  args = parser.parse_args(argv)
+
+  with open(args.before) as f:
+    before = json.load(f)
+  with open(args.after) as f:
+    after = json.load(f)
+
+  rows = compare(before, after, args.metric, args.threshold)
+  print(f"{args.metric}: {before.get('commit') or 'before'} -> {after.get('commit') or 'after'}")
+  for name, old, new, change, regressed in rows:
+    print(f"  {name:<10} {old:>10.3f} {new:>10.3f} {change:>+8.1%}{'  REGRESSION' if regressed else ''}")
+
+  if any(regressed for *_, regressed in rows):
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+  main()
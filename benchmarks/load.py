@@ -0,0 +1,199 @@
+"""Latency, throughput and query counts for the API's hot paths.
+
+Run from the repo root:
+  python -m benchmarks.load --blogs 10000 --requests 500 --output before.json
+  python -m benchmarks.compare before.json after.json
+
+By default the app runs in-process behind the Flask test client, on a freshly seeded database. To measure a real
+server, seed first (python -m benchmarks.seed --database-uri ...), start gunicorn against the same database with
+SERVER_TIMING_ENABLED=true, and pass --url http://127.0.0.1:8000 --no-seed. Query counts come from the
+Server-Timing header in both modes.
+"""
+import argparse
+import json
+import platform
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import config
+from app import create_app
+from benchmarks.seed import PASSWORD, scale_counts, seed
+
+SCENARIOS = ("list", "fetch", "comment", "like", "login")
+QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+def make_app(config_name, database_uri, **overrides):
+  base = getattr(config, config_name)
+  config.BenchmarkConfig = type("BenchmarkConfig", (base,), {"SQLALCHEMY_DATABASE_URI": database_uri, **overrides})
+  return create_app("BenchmarkConfig")
+
+
+class InProcessClient:
+  def __init__(self, app):
+    self.app = app
+    self._local = threading.local()
+
+  def request(self, method, path, body=None, token=None):
+    client = getattr(self._local, "client", None)
+    if client is None:
+      client = self._local.client = self.app.test_client()
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    response = client.open(path, method=method, json=body, headers=headers)
+    return response.status_code, response.headers.get("Server-Timing"), response.get_json(silent=True)
+
+
+class HttpClient:
+  def __init__(self, base_url):
+    self.base_url = base_url.rstrip("/")
+
+  def request(self, method, path, body=None, token=None):
+    headers = {"Content-Type": "application/json"}
+    if token:
+      headers["Authorization"] = f"Bearer {token}"
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    req = urllib.request.Request(self.base_url + path, data=data, method=method, headers=headers)
+    try:
+      with urllib.request.urlopen(req) as response:
+        return response.status, response.headers.get("Server-Timing"), json.loads(response.read() or b"null")
+    except urllib.error.HTTPError as err:
+      return err.code, err.headers.get("Server-Timing"), None
+
+
+def scenario_request(name, rng, counts, tokens):
+  if name == "list":
+    return "GET", "/blogs/?limit=20", None, None
+  if name == "fetch":
+    return "GET", f"/blogs/{rng.randint(1, counts['blogs'])}", None, None
+  if name == "comment":
+    return "POST", f"/blogs/{rng.randint(1, counts['blogs'])}/comments", {"content": "benchmark comment"}, rng.choice(tokens)
+  if name == "like":
+    return "POST", f"/blogs/{rng.randint(1, counts['blogs'])}/like", None, rng.choice(tokens)
+  user = rng.randint(1, counts["users"])
+  return "POST", "/users/login", {"email": f"bench{user}@bench.test", "password": PASSWORD}, None
+
+
+def percentile(sorted_values, fraction):
+  if not sorted_values:
+    return None
+  index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values) + 0.5) - 1))
+  return sorted_values[index]
+
+
+def run_scenario(client, name, counts, tokens, requests, concurrency, warmup, random_seed):
+  rng = random.Random(f"{random_seed}:{name}")
+  plan = [scenario_request(name, rng, counts, tokens) for _ in range(warmup + requests)]
+  for method, path, body, token in plan[:warmup]:
+    client.request(method, path, body, token)
+
+  def timed(item):
+    method, path, body, token = item
+    start = time.perf_counter()
+    status, server_timing, _ = client.request(method, path, body, token)
+    elapsed = time.perf_counter() - start
+    match = QUERIES.search(server_timing or "")
+    return elapsed, status, int(match.group(1)) if match else None
+
+  start = time.perf_counter()
+  with ThreadPoolExecutor(max_workers=concurrency) as executor:
+    samples = list(executor.map(timed, plan[warmup:]))
+  wall = time.perf_counter() - start
+
+  latencies = sorted(elapsed * 1000 for elapsed, _, _ in samples)
+  queries = [count for _, _, count in samples if count is not None]
+  return {
+    "requests": requests,
+    "errors": sum(1 for _, status, _ in samples if status >= 400),
+    "throughput_rps": round(requests / wall, 2),
+    "mean_ms": round(sum(latencies) / len(latencies), 3),
+    "p50_ms": round(percentile(latencies, 0.50), 3),
+    "p95_ms": round(percentile(latencies, 0.95), 3),
+    "p99_ms": round(percentile(latencies, 0.99), 3),
+    "max_ms": round(latencies[-1], 3),
+    "queries_per_request": round(sum(queries) / len(queries), 2) if queries else None,
+  }
+
+
+def git_commit():
+  try:
+    return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+  except (OSError, subprocess.CalledProcessError):
+    return None
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("--blogs", type=int, default=1000, help="dataset scale; users, comments and likes follow")
+  parser.add_argument("--users", type=int)
+  parser.add_argument("--comments", type=int)
+  parser.add_argument("--likes", type=int)
+  parser.add_argument("--requests", type=int, default=200, help="timed requests per scenario")
+  parser.add_argument("--warmup", type=int, default=20)
+  parser.add_argument("--concurrency", type=int, default=1)
+  parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+  parser.add_argument("--config", default="TestingConfig")
+  parser.add_argument("--database-uri", default="sqlite:///benchmark.db")
+  parser.add_argument("--no-cache", action="store_true", help="disable the response cache (in-process only)")
+  parser.add_argument("--no-seed", action="store_true", help="reuse an already seeded database")
+  parser.add_argument("--url", help="benchmark a running server instead of the in-process app")
+  parser.add_argument("--seed", type=int, default=0, help="random seed for data and request mix")
+  parser.add_argument("--output", help="write results here instead of stdout")
+  args = parser.parse_args(argv)
+
+  scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+  unknown = set(scenarios) - set(SCENARIOS)
+  if unknown:
+    parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+  overrides = {"SERVER_TIMING_ENABLED": True}
+  if args.no_cache:
+    overrides["CACHE_TYPE"] = "NullCache"
+  app = make_app(args.config, args.database_uri, **overrides)
+  counts = scale_counts(args.blogs, args.users, args.comments, args.likes)
+  if not args.no_seed:
+    with app.app_context():
+      seed(counts, args.seed)
+
+  client = HttpClient(args.url) if args.url else InProcessClient(app)
+  tokens = []
+  for user in range(1, min(counts["users"], 20) + 1):
+    status, _, body = client.request("POST", "/users/login", {"email": f"bench{user}@bench.test", "password": PASSWORD})
+    if status != 200:
+      sys.exit(f"Could not log in as bench{user}@bench.test (HTTP {status}); is the database seeded?")
+    tokens.append(body["token"])
+
+  results = {
+    name: run_scenario(client, name, counts, tokens, args.requests, args.concurrency, args.warmup, args.seed)
+    for name in scenarios
+  }
+  report = {
+    "commit": git_commit(),
+    "timestamp": datetime.now(timezone.utc).isoformat(),
+    "python": platform.python_version(),
+    "target": args.url or "in-process",
+    "config": args.config,
+    "database": args.database_uri.split("://", 1)[0],
+    "dataset": counts,
+    "concurrency": args.concurrency,
+    "cache": not args.no_cache,
+    "results": results,
+  }
+
+  output = json.dumps(report, indent=2)
+  if args.output:
+    with open(args.output, "w") as f:
+      f.write(output + "\n")
+  else:
+    print(output)
+  return report
+
+
+if __name__ == "__main__":
+  main()
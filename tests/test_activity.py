@@ -0,0 +1,120 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, text
+from app import create_app
+from app.models import db, Blog, Comment, User, Like
+from utils.auth import generate_token, hash_password
+from utils.like_buffer import LikeBuffer
+from utils.pagination import keyset_query
+from app.blueprints.blog.serializers import blog_rows
+from app.blueprints.user.routes import user_comments
+
+class TestUserActivity(unittest.TestCase):
+  
+  def setUp(self):
+    self.app = create_app("TestingConfig")
+    now = datetime.now(timezone.utc)
+    with self.app.app_context():
+      db.drop_all()
+      db.create_all()
+      db.session.add(User(name="test_user", username="testing", email="test@test.com", password=hash_password("test")))
+      db.session.add(User(name="other_user", username="other", email="other@test.com", password=hash_password("test")))
+      for n in range(1, 6):
+        db.session.add(Blog(id=n, title=f"Blog {n}", body="test test test", author_id=1 if n <= 3 else 2, created_at=now + timedelta(minutes=n)))
+      for n in range(1, 4):
+        db.session.add(Comment(content=f"comment {n}", user_id=1, post_id=4, is_archived=n == 3, created_at=now + timedelta(minutes=n)))
+      db.session.add(Comment(content="someone else", user_id=2, post_id=1))
+      db.session.add(Like(user_id=1, post_id=4, created_at=now + timedelta(minutes=1)))
+      db.session.add(Like(user_id=1, post_id=2, created_at=now + timedelta(minutes=2)))
+      db.session.add(Like(user_id=2, post_id=1))
+      db.session.commit()
+      self.token = generate_token(1)
+      self.other_token = generate_token(2)
+    self.client = self.app.test_client()
+    self.headers = {"Authorization": "Bearer " + self.token}
+  
+  
+  def test_user_blogs_paginated(self):
+    response = self.client.get("/users/1/blogs?limit=2&fields=id,title")
+    self.assertEqual(response.status_code, 200)
+    self.assertEqual([blog["id"] for blog in response.json["blogs"]], [3, 2])
+    self.assertEqual(set(response.json["blogs"][0]), {"id", "title"})
+    
+    response = self.client.get("/users/1/blogs", query_string={"limit": 2, "cursor": response.json["next_cursor"]})
+    self.assertEqual([blog["id"] for blog in response.json["blogs"]], [1])
+    self.assertIsNone(response.json["next_cursor"])
+    
+    response = self.client.get("/users/2/blogs?order=oldest")
+    self.assertEqual([blog["id"] for blog in response.json["blogs"]], [4, 5])
+  
+  
+  def test_user_comments_hide_archived(self):
+    response = self.client.get("/users/1/comments")
+    self.assertEqual(response.status_code, 200)
+    self.assertEqual([comment["content"] for comment in response.json["comments"]], ["comment 2", "comment 1"])
+    
+    response = self.client.get("/users/1/comments?include_archived=true", headers=self.headers)
+    self.assertEqual(len(response.json["comments"]), 3)
+    
+    self.assertEqual(len(self.client.get("/users/1/comments?include_archived=true").json["comments"]), 2)
+    other = {"Authorization": "Bearer " + self.other_token}
+    self.assertEqual(len(self.client.get("/users/1/comments?include_archived=true", headers=other).json["comments"]), 2)
+  
+  
+  def test_unknown_user(self):
+    self.assertEqual(self.client.get("/users/99/blogs").status_code, 404)
+    self.assertEqual(self.client.get("/users/99/comments").status_code, 404)
+    self.assertEqual(self.client.get("/users/1/blogs?limit=x").status_code, 400)
+  
+  
+  def test_my_likes_newest_first(self):
+    response = self.client.get("/users/me/likes?fields=id,title", headers=self.headers)
+    self.assertEqual(response.status_code, 200)
+    likes = response.json["likes"]
+    self.assertEqual([like["blog"]["id"] for like in likes], [2, 4])
+    self.assertEqual(set(likes[0]), {"liked_at", "blog"})
+    
+    response = self.client.get("/users/me/likes?limit=1", headers=self.headers)
+    self.assertEqual([like["blog"]["id"] for like in response.json["likes"]], [2])
+    response = self.client.get("/users/me/likes", query_string={"limit": 1, "cursor": response.json["next_cursor"]}, headers=self.headers)
+    self.assertEqual([like["blog"]["id"] for like in response.json["likes"]], [4])
+    
+    self.assertEqual(self.client.get("/users/me/likes").status_code, 401)
+  
+  
+  def test_like_status(self):
+    response = self.client.get("/users/me/likes/status?ids=1,2,4,99", headers=self.headers)
+    self.assertEqual(response.status_code, 200)
+    self.assertEqual(response.json["liked"], {"1": False, "2": True, "4": True, "99": False})
+    
+    self.assertEqual(self.client.get("/users/me/likes/status", headers=self.headers).status_code, 400)
+    self.assertEqual(self.client.get("/users/me/likes/status?ids=1,x", headers=self.headers).status_code, 400)
+    too_many = ",".join(str(n) for n in range(1, 102))
+    self.assertEqual(self.client.get(f"/users/me/likes/status?ids={too_many}", headers=self.headers).status_code, 400)
+  
+  
+  def test_like_status_sees_buffered_likes(self):
+    self.app.extensions["like_buffer"] = LikeBuffer(self.app, interval=60, max_events=1000)
+    self.client.post("/blogs/1/like", headers=self.headers)
+    self.client.delete("/blogs/2/like", headers=self.headers)
+    
+    response = self.client.get("/users/me/likes/status?ids=1,2", headers=self.headers)
+    self.assertEqual(response.json["liked"], {"1": True, "2": False})
+  
+  
+  def test_activity_reads_use_indexes(self):
+    # The same statements the routes page through, compiled as SQLite sees them
+    statements = {
+      "ix_blogs_author_created": (blog_rows().where(Blog.author_id == 1, Blog.deleted_at.is_(None)), Blog),
+      "ix_comments_user_archived_created": (user_comments(1), Comment),
+      "ix_likes_user_created": (select(Like.id, Like.created_at, Like.post_id).where(Like.user_id == 1), Like),
+    }
+    with self.app.app_context():
+      plans = {}
+      for index, (stmt, model) in statements.items():
+        query = str(keyset_query(stmt, model, 20, None, True).compile(db.engine, compile_kwargs={"literal_binds": True}))
+        plans[index] = " ".join(row[-1] for row in db.session.execute(text("EXPLAIN QUERY PLAN " + query)))
+    for index, details in plans.items():
+      self.assertIn(index, details)
+      self.assertNotIn("TEMP B-TREE", details)
+    self.assertIn("COVERING INDEX ix_likes_user_created", plans["ix_likes_user_created"])
@@ -0,0 +1,144 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+import config
+from app.asgi import create_asgi_app
+from app.models import db, Base, Blog, User, Comment
+from utils.async_db import async_engines
+from utils.auth import generate_token, hash_password
+from utils.cache import RedisCache
+from tests.test_cache import FakeRedis
+
+class TestAsgi(unittest.TestCase):
+  
+  def setUp(self):
+    self.asgi = create_asgi_app("TestingConfig")
+    self.app = self.asgi.flask_app
+    with self.app.app_context():
+      db.drop_all()
+      db.create_all()
+      db.session.add(User(name="test_user", username="testing", email="test@test.com", password=hash_password("test")))
+      for i in range(3):
+        db.session.add(Blog(title=f"Title {i}", body="test test test", author_id=1))
+      db.session.flush()
+      db.session.add(Comment(content="blah blah blah", post_id=1, user_id=1))
+      db.session.commit()
+      self.token = generate_token(1)
+    self.client = self.app.test_client()
+  
+  
+  def request(self, method, path, query_string=b"", headers=None, body=b""):
+    return self.requests([(method, path, query_string, headers, body)])[0]
+  
+  def requests(self, calls):
+    async def call(method, path, query_string, headers, body):
+      headers = {**(headers or {}), "Content-Length": str(len(body))} if body else headers
+      scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "scheme": "http",
+        "method": method, "path": path, "root_path": "", "query_string": query_string,
+        "server": ("testserver", 80), "client": ("127.0.0.1", 50000),
+        "headers": [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()],
+      }
+      messages = []
+      async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+      async def send(message):
+        messages.append(message)
+      await self.asgi(scope, receive, send)
+      headers = {name.decode(): value.decode() for name, value in messages[0]["headers"]}
+      return messages[0]["status"], headers, b"".join(message.get("body", b"") for message in messages[1:])
+    
+    async def run():
+      try:
+        return await asyncio.gather(*(call(*args) for args in calls))
+      finally:
+        for engine in async_engines(self.app):
+          await engine.dispose()
+    return asyncio.run(run())
+  
+  
+  def test_async_routes_match_wsgi(self):
+    for path, query_string in (("/blogs/", "limit=2"), ("/blogs/1", "fields=id,excerpt"), ("/blogs/1/comments", "")):
+      status, headers, body = self.request("GET", path, query_string.encode())
+      self.assertEqual(status, 200)
+      self.assertEqual(json.loads(body), self.client.get(f"{path}?{query_string}").json)
+  
+  
+  def test_async_route_errors(self):
+    self.assertEqual(self.request("GET", "/blogs/99")[0], 404)
+    self.assertEqual(self.request("GET", "/blogs/99/comments")[0], 404)
+    self.assertEqual(self.request("GET", "/blogs/", b"limit=abc")[0], 400)
+    self.assertEqual(self.request("GET", "/users/me")[0], 401)
+    
+    status, _, body = self.request("GET", "/users/me", b"fields=username", {"Authorization": f"Bearer {self.token}"})
+    self.assertEqual((status, json.loads(body)), (200, {"username": "testing"}))
+  
+  
+  def test_cache_and_conditional(self):
+    first, second = self.request("GET", "/blogs/1"), self.request("GET", "/blogs/1")
+    self.assertEqual((first[1]["x-cache"], second[1]["x-cache"]), ("MISS", "HIT"))
+    
+    status, _, _ = self.request("GET", "/blogs/1", headers={"If-None-Match": first[1]["etag"]})
+    self.assertEqual(status, 304)
+  
+  
+  def test_archived_comments_only_for_owner(self):
+    with self.app.app_context():
+      db.session.get(Comment, 1).is_archived = True
+      db.session.commit()
+    
+    self.assertEqual(json.loads(self.request("GET", "/blogs/1/comments", b"include_archived=true")[2])["comments"], [])
+    status, headers, body = self.request("GET", "/blogs/1/comments", b"include_archived=true", {"Authorization": f"Bearer {self.token}"})
+    self.assertEqual((status, len(json.loads(body)["comments"])), (200, 1))
+    self.assertNotIn("x-cache", headers)
+  
+  
+  def test_networked_cache_called_off_the_event_loop(self):
+    threads = []
+    class RecordingRedis(FakeRedis):
+      def mget(self, keys):
+        threads.append(threading.get_ident())
+        return super().mget(keys)
+    self.app.extensions["cache"] = RedisCache(RecordingRedis())
+    
+    status, headers, _ = self.request("GET", "/blogs/1")
+    self.assertEqual((status, headers["x-cache"]), (200, "MISS"))
+    self.assertEqual(self.request("GET", "/blogs/1")[1]["x-cache"], "HIT")
+    self.assertTrue(threads)
+    self.assertNotIn(threading.get_ident(), threads)
+  
+  
+  def test_reads_routed_to_replica(self):
+    replica_uri = "sqlite:///" + os.path.join(tempfile.gettempdir(), "blog_api_testing_async_replica.db")
+    with patch.object(config.TestingConfig, "SQLALCHEMY_REPLICA_URIS", [replica_uri]):
+      self.asgi = create_asgi_app("TestingConfig")
+    self.app = self.asgi.flask_app
+    with self.app.app_context():
+      replica = self.app.extensions["replica_router"].engines["replica_0"]
+      Base.metadata.drop_all(replica)
+      Base.metadata.create_all(replica)
+      with replica.begin() as connection:
+        connection.execute(User.__table__.insert(), {"name": "test_user", "username": "testing", "email": "test@test.com", "password": "x"})
+        connection.execute(Blog.__table__.insert(), {"title": "Replica", "body": "test test test", "author_id": 1})
+    
+    self.assertEqual(json.loads(self.request("GET", "/blogs/1")[2])["title"], "Replica")
+    self.app.extensions["replica_router"].max_lag = 1
+    with patch.object(type(self.app.extensions["replica_router"]), "measure_lag", return_value=30):
+      self.assertEqual(json.loads(self.request("GET", "/blogs/2")[2])["title"], "Title 1")
+  
+  
+  def test_concurrent_reads(self):
+    results = self.requests([("GET", f"/blogs/{i % 3 + 1}", b"", None, b"") for i in range(30)])
+    self.assertTrue(all(status == 200 for status, _, _ in results))
+  
+  
+  def test_other_routes_fall_back_to_wsgi(self):
+    body = json.dumps({"email": "test@test.com", "password": "test"}).encode()
+    status, _, response = self.request("POST", "/users/login", headers={"Content-Type": "application/json"}, body=body)
+    self.assertEqual(status, 200)
+    self.assertIn("token", json.loads(response))
+    self.assertEqual(self.request("GET", "/metrics/pool")[0], 200)
@@ -0,0 +1,85 @@
+import time
+import unittest
+from unittest.mock import patch
+from sqlalchemy import event
+from app import create_app
+from app.models import db, User
+from utils.auth import generate_token, hash_password, init_auth, revocation_hooks, jwt
+
+class TestAuth(unittest.TestCase):
+  
+  def setUp(self):
+    self.app = create_app("TestingConfig")
+    self.user = User(name="test_user", username="testing", email="test@test.com", password=hash_password("test"))
+    with self.app.app_context():
+      db.drop_all()
+      db.create_all()
+      db.session.add(self.user)
+      db.session.commit()
+      self.token = generate_token(1)
+    self.client = self.app.test_client()
+    self.headers = {"Authorization": "Bearer " + self.token}
+  
+  
+  def tearDown(self):
+    revocation_hooks.clear()
+  
+  
+  def create_blog(self):
+    return self.client.post("/blogs/", json={"title": "Test", "body": "test test test"}, headers=self.headers)
+  
+  
+  def test_token_cache(self):
+    with patch("utils.auth.jwt.decode", wraps=jwt.decode) as decode:
+      self.assertEqual(self.create_blog().status_code, 201)
+      self.assertEqual(self.create_blog().status_code, 201)
+    self.assertEqual(decode.call_count, 1)
+  
+  
+  def test_token_cache_respects_expiry(self):
+    self.create_blog()
+    with patch("utils.auth.jwt.decode", wraps=jwt.decode) as decode:
+      with patch("utils.auth.time.time", return_value=time.time() + 2 * 24 * 60 * 60):
+        self.create_blog()
+    self.assertEqual(decode.call_count, 1)
+  
+  
+  def test_token_cache_disabled(self):
+    self.app.extensions["token_cache"] = None
+    with patch("utils.auth.jwt.decode", wraps=jwt.decode) as decode:
+      self.create_blog()
+      self.create_blog()
+    self.assertEqual(decode.call_count, 2)
+  
+  
+  def test_invalid_token_not_cached(self):
+    headers = {"Authorization": "Bearer not-a-token"}
+    for _ in range(2):
+      response = self.client.post("/blogs/", json={"title": "Test", "body": "test test test"}, headers=headers)
+      self.assertEqual(response.status_code, 401)
+  
+  
+  def test_revocation_hook(self):
+    self.assertEqual(self.create_blog().status_code, 201)
+    revocation_hooks.append(lambda claims: claims["sub"] == "1")
+    
+    response = self.create_blog()
+    self.assertEqual(response.status_code, 401)
+    self.assertEqual(response.json["message"], "Token has been revoked")
+  
+  
+  def test_principal_cache(self):
+    self.app.config["PRINCIPAL_CACHE_TTL"] = 60
+    init_auth(self.app)
+    self.create_blog()
+    
+    statements = []
+    with self.app.app_context():
+      listener = lambda conn, cursor, statement, *args: statements.append(statement)
+      event.listen(db.engine, "before_cursor_execute", listener)
+      try:
+        self.assertEqual(self.create_blog().status_code, 201)
+      finally:
+        event.remove(db.engine, "before_cursor_execute", listener)
+    
+    self.assertFalse(any("FROM users" in statement for statement in statements))
@@ -0,0 +1,106 @@
+import unittest
+from app import create_app
+from app.models import db, Blog, User, Like
+from utils.auth import generate_token, hash_password
+from utils.bulk import insert_in_chunks
+
+class TestBatch(unittest.TestCase):
+  
+  def setUp(self):
+    self.app = create_app("TestingConfig")
+    self.user = User(name="test_user", username="testing", email="test@test.com", password=hash_password("test"))
+    self.blog = Blog(title="Test Title", body="test test test", author_id=1)
+    with self.app.app_context():
+      db.drop_all()
+      db.create_all()
+      db.session.add(self.user)
+      db.session.add(self.blog)
+      db.session.commit()
+      self.token = generate_token(1)
+    self.client = self.app.test_client()
+    self.headers = {"Authorization": "Bearer " + self.token}
+  
+  
+  def test_create_blogs_batch(self):
+    self.app.config["BATCH_CHUNK_SIZE"] = 2
+    payload = [{"title": f"Blog {i}", "body": "test test test"} for i in range(5)]
+    
+    response = self.client.post("/blogs/batch", json=payload, headers=self.headers)
+    self.assertEqual(response.status_code, 201)
+    self.assertEqual([result["id"] for result in response.json["results"]], [2, 3, 4, 5, 6])
+    
+    with self.app.app_context():
+      self.assertEqual(db.session.get(Blog, 6).title, "Blog 4")
+      self.assertEqual(db.session.get(Blog, 6).author_id, 1)
+    self.assertEqual(len(self.client.get("/blogs/search?q=blog").json["blogs"]), 5)
+  
+  
+  def test_blogs_batch_partial_failure(self):
+    payload = [
+      {"title": "Good", "body": "test test test"},
+      {"title": "No body"},
+      "not an object",
+      {"title": "Also good", "body": "test test test"}
+    ]
+    
+    response = self.client.post("/blogs/batch", json=payload, headers=self.headers)
+    self.assertEqual(response.status_code, 207)
+    self.assertEqual([result["status"] for result in response.json["results"]], [201, 400, 400, 201])
+    self.assertIn("body", response.json["results"][1]["errors"])
+  
+  
+  def test_invalid_batch(self):
+    response = self.client.post("/blogs/batch", json={"title": "Test"}, headers=self.headers)
+    self.assertEqual(response.status_code, 400)
+    
+    self.app.config["BATCH_MAX_ITEMS"] = 1
+    response = self.client.post("/blogs/batch", json=[{}, {}], headers=self.headers)
+    self.assertEqual(response.status_code, 400)
+    
+    response = self.client.post("/blogs/batch", json=[])
+    self.assertEqual(response.status_code, 401)
+  
+  
+  def test_create_comments_batch(self):
+    payload = [
+      {"post_id": 1, "content": "first"},
+      {"post_id": 1, "content": "second"},
+      {"post_id": 99, "content": "missing blog"},
+      {"post_id": 1, "content": ""}
+    ]
+    
+    response = self.client.post("/blogs/comments/batch", json=payload, headers=self.headers)
+    self.assertEqual(response.status_code, 207)
+    self.assertEqual([result["status"] for result in response.json["results"]], [201, 201, 404, 400])
+    
+    self.assertEqual(self.client.get("/blogs/1").json["comment_count"], 2)
+    self.assertEqual(len(self.client.get("/blogs/1/comments").json["comments"]), 2)
+  
+  
+  def test_create_likes_batch(self):
+    with self.app.app_context():
+      db.session.add(Blog(title="Other", body="test test test", author_id=1))
+      db.session.add(Like(user_id=1, post_id=2))
+      db.session.commit()
+    
+    payload = [{"post_id": 1}, {"post_id": 1}, {"post_id": 2}, {"post_id": 99}]
+    response = self.client.post("/blogs/likes/batch", json=payload, headers=self.headers)
+    self.assertEqual(response.status_code, 207)
+    self.assertEqual([result["status"] for result in response.json["results"]], [201, 200, 200, 404])
+    
+    self.assertEqual(self.client.get("/blogs/1").json["like_count"], 1)
+    with self.app.app_context():
+      self.assertEqual(db.session.query(Like).count(), 2)
+  
+  
+  def test_bad_row_does_not_sink_chunk(self):
+    with self.app.app_context():
+      db.session.add(Like(user_id=1, post_id=1))
+      db.session.commit()
+    
+    with self.app.app_context():
+      results = insert_in_chunks(Like, [{"user_id": 2, "post_id": 1}, {"user_id": 1, "post_id": 1}], 10)
+      self.assertIsNotNone(results[0][0])
+      self.assertIsNone(results[1][0])
+      self.assertIn("UNIQUE", results[1][1])
+      self.assertEqual(db.session.query(Like).count(), 2)
@@ -1,5 +1,7 @@
 import unittest
+from sqlalchemy import event
 from app import create_app
+from app.extenstions import cache
 from app.models import db, Blog, User
 from utils.auth import generate_token, hash_password
 
@@ -28,6 +30,25 @@ class TestBlog(unittest.TestCase):
     return response.json["token"]
   
   
+  def count_queries(self, url):
+    statements = []
+    
+    def before_cursor_execute(conn, cursor, statement, *args):
+      statements.append(statement)
+    
+    with self.app.app_context():
+      cache.clear()
+      engine = db.engine
+      event.listen(engine, "before_cursor_execute", before_cursor_execute)
+      try:
+        response = self.client.get(url)
+      finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    
+    self.assertEqual(response.status_code, 200)
+    return len(statements)
+  
+  
   def test_create_blog(self):
     blog = {
       "title": "Test",
@@ -56,6 +77,68 @@ class TestBlog(unittest.TestCase):
   def test_get_all_blogs(self):
     response = self.client.get("/blogs/")
     self.assertEqual(response.status_code, 200)
+    self.assertEqual(len(response.json["blogs"]), 1)
+    self.assertIsNone(response.json["next_cursor"])
+  
+  
+  def test_get_all_blogs_query_count(self):
+    with self.app.app_context():
+      db.session.add(User(name="other", username="other", email="other@test.com", password="x"))
+      db.session.add(Blog(title="Other", body="test test test", author_id=2))
+      db.session.commit()
+    
+    baseline = self.count_queries("/blogs/")
+    
+    with self.app.app_context():
+      for i in range(30):
+        user = User(name=f"user{i}", username=f"user{i}", email=f"user{i}@test.com", password="x")
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(Blog(title=f"Blog {i}", body="test test test", author_id=user.id))
+      db.session.commit()
+    
+    self.assertEqual(self.count_queries("/blogs/?limit=50"), baseline)
+  
+  
+  def test_paginate_blogs(self):
+    with self.app.app_context():
+      for i in range(4):
+        db.session.add(Blog(title=f"Blog {i}", body="test test test", author_id=1))
+      db.session.commit()
+    
+    response = self.client.get("/blogs/?limit=2")
+    self.assertEqual(response.status_code, 200)
+    self.assertEqual([blog["id"] for blog in response.json["blogs"]], [5, 4])
+    
+    cursor = response.json["next_cursor"]
+    response = self.client.get(f"/blogs/?limit=2&cursor={cursor}")
+    self.assertEqual([blog["id"] for blog in response.json["blogs"]], [3, 2])
+    
+    cursor = response.json["next_cursor"]
+    response = self.client.get(f"/blogs/?limit=2&cursor={cursor}")
+    self.assertEqual([blog["id"] for blog in response.json["blogs"]], [1])
+    self.assertIsNone(response.json["next_cursor"])
+  
+  
+  def test_paginate_blogs_limit_capped(self):
+    self.app.config["PAGE_SIZE_MAX"] = 2
+    with self.app.app_context():
+      for i in range(3):
+        db.session.add(Blog(title=f"Blog {i}", body="test test test", author_id=1))
+      db.session.commit()
+    
+    response = self.client.get("/blogs/?limit=50")
+    self.assertEqual(len(response.json["blogs"]), 2)
+    self.assertIsNotNone(response.json["next_cursor"])
+  
+  
+  def test_invalid_pagination(self):
+    response = self.client.get("/blogs/?cursor=not-a-cursor")
+    self.assertEqual(response.status_code, 400)
+    self.assertEqual(response.json["error"], "Invalid cursor")
+    
+    response = self.client.get("/blogs/?limit=0")
+    self.assertEqual(response.status_code, 400)
   
   
   def test_get_single_blog(self):
@@ -0,0 +1,152 @@
+import unittest
+from unittest.mock import patch
+import config
+from app import create_app
+from app.models import db, Blog, User
+from utils.auth import generate_token, hash_password
+from utils.cache import SimpleCache, RedisCache
+
+
+class FakeRedis:
+  def __init__(self):
+    self.store = {}
+  
+  def get(self, key):
+    return self.store.get(key)
+  
+  def set(self, key, value, ex=None):
+    self.store[key] = value
+  
+  def mget(self, keys):
+    return [self.store.get(key) for key in keys]
+  
+  def incr(self, key):
+    self.store[key] = int(self.store.get(key, 0)) + 1
+    return self.store[key]
+
+
+class TestCacheBackends(unittest.TestCase):
+  
+  def test_simple_cache_lru_eviction(self):
+    backend = SimpleCache(threshold=2)
+    backend.set("a", b"1")
+    backend.set("b", b"2")
+    backend.get("a")
+    backend.set("c", b"3")
+    
+    self.assertEqual(backend.get("a"), b"1")
+    self.assertIsNone(backend.get("b"))
+    self.assertEqual(backend.get("c"), b"3")
+  
+  
+  def test_simple_cache_ttl(self):
+    backend = SimpleCache()
+    with patch("utils.cache.time.monotonic", return_value=100):
+      backend.set("a", b"1", timeout=10)
+    with patch("utils.cache.time.monotonic", return_value=105):
+      self.assertEqual(backend.get("a"), b"1")
+    with patch("utils.cache.time.monotonic", return_value=110):
+      self.assertIsNone(backend.get("a"))
+  
+  
+  def test_redis_cache_versions(self):
+    backend = RedisCache(FakeRedis())
+    self.assertEqual(backend.get_versions(["blogs", "blog:1"]), [0, 0])
+    
+    backend.incr_versions(["blogs"])
+    self.assertEqual(backend.get_versions(["blogs", "blog:1"]), [1, 0])
+    
+    backend.set("view", b"[]")
+    self.assertEqual(backend.get("view"), b"[]")
+  
+  
+  def test_simple_cache_refused_with_several_workers(self):
+    with patch.object(config.TestingConfig, "CACHE_WORKERS", 4, create=True):
+      with self.assertRaises(ValueError):
+        create_app("TestingConfig")
+
+
+class TestResponseCache(unittest.TestCase):
+  
+  def setUp(self):
+    self.app = create_app("TestingConfig")
+    self.user = User(name="test_user", username="testing", email="test@test.com", password=hash_password("test"))
+    self.blog = Blog(title="Test Title", body="test test test", author_id=1)
+    with self.app.app_context():
+      db.drop_all()
+      db.create_all()
+      db.session.add(self.user)
+      db.session.add(self.blog)
+      db.session.commit()
+      self.token = generate_token(1)
+    self.client = self.app.test_client()
+  
+  
+  def assert_cached(self, url):
+    self.assertEqual(self.client.get(url).headers["X-Cache"], "MISS")
+    self.assertEqual(self.client.get(url).headers["X-Cache"], "HIT")
+  
+  
+  def test_get_blog_cached(self):
+    self.assert_cached("/blogs/1")
+    self.assert_cached("/blogs/")
+    self.assert_cached("/blogs/1/comments")
+  
+  
+  def test_query_params_in_key(self):
+    self.assert_cached("/blogs/?limit=5")
+    self.assertEqual(self.client.get("/blogs/?limit=6").headers["X-Cache"], "MISS")
+  
+  
+  def test_not_found_not_cached(self):
+    self.client.get("/blogs/2")
+    self.assertNotIn("X-Cache", self.client.get("/blogs/2").headers)
+  
+  
+  def test_like_invalidates(self):
+    headers = {"Authorization": "Bearer " + self.token}
+    self.assert_cached("/blogs/1")
+    self.assert_cached("/blogs/")
+    
+    self.client.post("/blogs/1/like", headers=headers)
+    
+    response = self.client.get("/blogs/1")
+    self.assertEqual(response.headers["X-Cache"], "MISS")
+    self.assertEqual(response.json["like_count"], 1)
+    self.assertEqual(self.client.get("/blogs/").headers["X-Cache"], "MISS")
+  
+  
+  def test_update_blog_invalidates(self):
+    headers = {"Authorization": "Bearer " + self.token}
+    self.assert_cached("/blogs/1")
+    
+    self.client.patch("/blogs/1", json={"title": "Updated"}, headers=headers)
+    self.assertEqual(self.client.get("/blogs/1").json["title"], "Updated")
+  
+  
+  def test_comment_invalidates(self):
+    headers = {"Authorization": "Bearer " + self.token}
+    self.assert_cached("/blogs/1/comments")
+    
+    self.client.post("/blogs/1/comments", json={"content": "test test"}, headers=headers)
+    self.assertEqual(len(self.client.get("/blogs/1/comments").json["comments"]), 1)
+  
+  
+  def test_other_blog_stays_cached(self):
+    with self.app.app_context():
+      db.session.add(Blog(title="Other", body="test test test", author_id=1))
+      db.session.commit()
+    
+    headers = {"Authorization": "Bearer " + self.token}
+    self.assert_cached("/blogs/2")
+    self.client.post("/blogs/1/like", headers=headers)
+    self.assertEqual(self.client.get("/blogs/2").headers["X-Cache"], "HIT")
+  
+  
+  def test_redis_backend(self):
+    self.app.extensions["cache"] = RedisCache(FakeRedis())
+    
+    headers = {"Authorization": "Bearer " + self.token}
+    self.assert_cached("/blogs/1")
+    self.client.post("/blogs/1/like", headers=headers)
+    self.assertEqual(self.client.get("/blogs/1").json["like_count"], 1)
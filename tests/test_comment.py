@@ -1,7 +1,12 @@
 import unittest
+from sqlalchemy import event, text
 from app import create_app
+from app.extenstions import cache
 from app.models import db, Blog, User, Comment
 from utils.auth import generate_token, hash_password
+from utils.pagination import keyset_query
+from app.blueprints.blog.routes import visible_comments
+from app.blueprints.blog.serializers import comment_rows
 
 class TestComment(unittest.TestCase):
   
@@ -29,6 +34,25 @@ class TestComment(unittest.TestCase):
     response = self.client.post("/users/login", json=credentials)
     return response.json["token"]
     
+  def count_queries(self, url):
+    statements = []
+    
+    def before_cursor_execute(conn, cursor, statement, *args):
+      statements.append(statement)
+    
+    with self.app.app_context():
+      cache.clear()
+      engine = db.engine
+      event.listen(engine, "before_cursor_execute", before_cursor_execute)
+      try:
+        response = self.client.get(url)
+      finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    
+    self.assertEqual(response.status_code, 200)
+    return len(statements)
+  
+  
   def test_create_comment(self):
     comment_payload = {
       "content": "test test",
@@ -53,6 +77,80 @@ class TestComment(unittest.TestCase):
   def test_get_blog_comments(self):
     response = self.client.get("/blogs/1/comments")
     self.assertEqual(response.status_code, 200)
+    self.assertEqual(response.json["comments"][0]["content"], "blah blah blah")
+    self.assertIsNone(response.json["next_cursor"])
+  
+  
+  def test_paginate_blog_comments(self):
+    with self.app.app_context():
+      for i in range(4):
+        db.session.add(Comment(content=f"comment {i}", post_id=1, user_id=1))
+      db.session.commit()
+    
+    response = self.client.get("/blogs/1/comments?limit=3")
+    self.assertEqual([comment["id"] for comment in response.json["comments"]], [5, 4, 3])
+    
+    cursor = response.json["next_cursor"]
+    response = self.client.get(f"/blogs/1/comments?limit=3&cursor={cursor}")
+    self.assertEqual([comment["id"] for comment in response.json["comments"]], [2, 1])
+    self.assertIsNone(response.json["next_cursor"])
+    
+    response = self.client.get("/blogs/1/comments?limit=3&order=oldest")
+    self.assertEqual([comment["id"] for comment in response.json["comments"]], [1, 2, 3])
+  
+  
+  def test_archived_comments_hidden(self):
+    headers = {"Authorization": "Bearer " + self.get_token()}
+    self.client.patch("/blogs/1/comments/1/archive", headers=headers)
+    
+    response = self.client.get("/blogs/1/comments")
+    self.assertEqual(response.status_code, 200)
+    self.assertEqual(response.json["comments"], [])
+    
+    # Only the blog's author and the comment's author see it
+    self.assertEqual(self.client.get("/blogs/1/comments?include_archived=true").json["comments"], [])
+    response = self.client.get("/blogs/1/comments?include_archived=true", headers=headers)
+    self.assertEqual(len(response.json["comments"]), 1)
+    
+    with self.app.app_context():
+      db.session.add(User(name="other_user", username="other", email="other@test.com", password="x"))
+      db.session.add(Blog(title="Other Title", body="test test test", author_id=2))
+      db.session.add(Comment(content="hidden on their blog", post_id=2, user_id=1, is_archived=True))
+      db.session.commit()
+      other = {"Authorization": "Bearer " + generate_token(2)}
+    self.assertEqual(self.client.get("/blogs/1/comments?include_archived=true", headers=other).json["comments"], [])
+    self.assertEqual(len(self.client.get("/blogs/2/comments?include_archived=true", headers=other).json["comments"]), 1)
+    self.assertEqual(len(self.client.get("/blogs/2/comments?include_archived=true", headers=headers).json["comments"]), 1)
+  
+  
+  def test_comment_page_is_an_index_range(self):
+    with self.app.app_context():
+      stmt = keyset_query(visible_comments(comment_rows(), 1), Comment, 20, None, True)
+      query = str(stmt.compile(db.engine, compile_kwargs={"literal_binds": True}))
+      details = " ".join(row[-1] for row in db.session.execute(text("EXPLAIN QUERY PLAN " + query)))
+    self.assertIn("ix_comments_post_archived_created (post_id=? AND is_archived=?)", details)
+    self.assertNotIn("TEMP B-TREE", details)
+  
+  
+  def test_invalid_blog_comments(self):
+    self.assertEqual(self.client.get("/blogs/2/comments").status_code, 404)
+    self.assertEqual(self.client.get("/blogs/1/comments?order=sideways").status_code, 400)
+    
+    
+  def test_get_blog_comments_query_count(self):
+    baseline = self.count_queries("/blogs/1/comments")
+    # The validator's page and the view's page; the blog is joined in, not fetched
+    self.assertEqual(baseline, 2)
+    
+    with self.app.app_context():
+      for i in range(30):
+        user = User(name=f"user{i}", username=f"user{i}", email=f"user{i}@test.com", password="x")
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(Comment(content=f"comment {i}", post_id=1, user_id=user.id))
+      db.session.commit()
+    
+    self.assertEqual(self.count_queries("/blogs/1/comments"), baseline)
     
     
   def test_update_comment(self):
@@ -81,4 +179,25 @@ class TestComment(unittest.TestCase):
     
     response = self.client.patch("/blogs/1/comments/1/archive", headers=headers)
     self.assertEqual(response.status_code, 200)
-    self.assertEqual(response.json["message"], "Comment archived")
\ No newline at end of file
+    self.assertEqual(response.json["message"], "Comment archived")
+  
+  
+  def test_comment_count(self):
+    headers = {"Authorization": "Bearer " + self.get_token()}
+    
+    self.client.post("/blogs/1/comments", json={"content": "test test"}, headers=headers)
+    response = self.client.get("/blogs/1")
+    self.assertEqual(response.json["comment_count"], 1)
+    
+    self.client.patch("/blogs/1/comments/2/archive", headers=headers)
+    response = self.client.get("/blogs/1")
+    self.assertEqual(response.json["comment_count"], 0)
+  
+  
+  def test_reconcile_counts(self):
+    result = self.app.test_cli_runner().invoke(args=["reconcile-counts"])
+    self.assertIn("Reconciled counts for 1 blogs", result.output)
+    
+    response = self.client.get("/blogs/1")
+    self.assertEqual(response.json["comment_count"], 1)
+    self.assertEqual(response.json["like_count"], 0)
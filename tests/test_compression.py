@@ -0,0 +1,89 @@
+import gzip
+import json
+import unittest
+import brotli
+import zstandard
+from app import create_app
+from app.models import db, Blog, User
+from utils.auth import generate_token, hash_password
+from utils.compression import available_codecs
+
+class TestCompression(unittest.TestCase):
+  
+  def setUp(self):
+    self.app = create_app("TestingConfig")
+    with self.app.app_context():
+      db.drop_all()
+      db.create_all()
+      db.session.add(User(name="test_user", username="testing", email="test@test.com", password=hash_password("test")))
+      for i in range(20):
+        db.session.add(Blog(title=f"Title {i}", body="compressible text " * 50, author_id=1))
+      db.session.commit()
+      self.token = generate_token(1)
+    self.client = self.app.test_client()
+  
+  
+  def test_gzip_negotiated(self):
+    plain = self.client.get("/blogs/")
+    self.assertNotIn("Content-Encoding", plain.headers)
+    self.assertIn("Accept-Encoding", plain.headers["Vary"])
+    
+    response = self.client.get("/blogs/", headers={"Accept-Encoding": "gzip, deflate"})
+    self.assertEqual(response.headers["Content-Encoding"], "gzip")
+    self.assertEqual(int(response.headers["Content-Length"]), len(response.get_data()))
+    self.assertLess(len(response.get_data()), len(plain.get_data()) / 4)
+    self.assertEqual(gzip.decompress(response.get_data()), plain.get_data())
+  
+  
+  def test_threshold_and_refusal(self):
+    small = self.client.get("/blogs/?limit=1&fields=id", headers={"Accept-Encoding": "gzip"})
+    self.assertNotIn("Content-Encoding", small.headers)
+    
+    refused = self.client.get("/blogs/", headers={"Accept-Encoding": "gzip;q=0, identity"})
+    self.assertNotIn("Content-Encoding", refused.headers)
+  
+  
+  def test_weak_etag_on_compressed_variant(self):
+    plain = self.client.get("/blogs/1")
+    self.assertFalse(plain.headers["ETag"].startswith("W/"))
+    
+    headers = {"Accept-Encoding": "gzip"}
+    compressed = self.client.get("/blogs/1", headers=headers)
+    self.assertEqual(compressed.headers["ETag"], "W/" + plain.headers["ETag"])
+    
+    revalidated = self.client.get("/blogs/1", headers={**headers, "If-None-Match": compressed.headers["ETag"]})
+    self.assertEqual(revalidated.status_code, 304)
+  
+  
+  def test_streamed_export(self):
+    self.app.config["EXPORT_BATCH_SIZE"] = 5
+    response = self.client.get("/blogs/export?format=ndjson", headers={"Accept-Encoding": "gzip", "Authorization": "Bearer " + self.token})
+    self.assertEqual(response.headers["Content-Encoding"], "gzip")
+    self.assertNotIn("Content-Length", response.headers)
+    
+    lines = gzip.decompress(response.get_data()).decode("utf-8").splitlines()
+    self.assertEqual([json.loads(line)["id"] for line in lines], list(range(1, 21)))
+  
+  
+  def test_bytes_saved_metric(self):
+    self.client.get("/blogs/", headers={"Accept-Encoding": "gzip"})
+    text = self.client.get("/metrics").get_data(as_text=True)
+    self.assertIn('http_response_compression_saved_bytes_total{endpoint="blog_bp.get_all_blogs",encoding="gzip"}', text)
+    self.assertIn('compression_time_per_request_seconds_count{endpoint="blog_bp.get_all_blogs",encoding="gzip"} 1', text)
+  
+  
+  def test_preferred_codec(self):
+    response = self.client.get("/blogs/", headers={"Accept-Encoding": "gzip, br, zstd"})
+    self.assertEqual(response.headers["Content-Encoding"], "zstd")
+    plain = self.client.get("/blogs/")
+    self.assertEqual(zstandard.ZstdDecompressor().decompressobj().decompress(response.get_data()), plain.get_data())
+  
+  
+  def test_brotli_round_trip(self):
+    response = self.client.get("/blogs/", headers={"Accept-Encoding": "br, gzip;q=0.5"})
+    self.assertEqual(response.headers["Content-Encoding"], "br")
+    self.assertEqual(brotli.decompress(response.get_data()), self.client.get("/blogs/").get_data())
+  
+  
+  def test_all_codecs_available(self):
+    self.assertEqual(set(available_codecs()), {"gzip", "br", "zstd"})
@@ -0,0 +1,109 @@
+import unittest
+from unittest.mock import patch
+from app import create_app
+from app.models import db, Blog, User, Comment
+from utils.auth import generate_token, hash_password
+from utils.cache import NullCache, SimpleCache
+
+class TestConditional(unittest.TestCase):
+  
+  def setUp(self):
+    self.app = create_app("TestingConfig")
+    self.app.extensions["cache"] = NullCache()
+    self.user = User(name="test_user", username="testing", email="test@test.com", password=hash_password("test"))
+    self.blog = Blog(title="Test Title", body="test test test", author_id=1)
+    self.comment = Comment(content="blah blah blah", post_id=1, user_id=1)
+    with self.app.app_context():
+      db.drop_all()
+      db.create_all()
+      db.session.add(self.user)
+      db.session.add(self.blog)
+      db.session.add(self.comment)
+      db.session.commit()
+      self.token = generate_token(1)
+    self.client = self.app.test_client()
+  
+  
+  def test_blog_etag(self):
+    response = self.client.get("/blogs/1")
+    etag = response.headers["ETag"]
+    self.assertFalse(etag.startswith("W/"))
+    self.assertNotIn("Last-Modified", response.headers)
+    
+    with patch("app.blueprints.blog.routes.serialize_blog_rows") as serialize:
+      response = self.client.get("/blogs/1", headers={"If-None-Match": etag})
+      serialize.assert_not_called()
+    self.assertEqual(response.status_code, 304)
+    self.assertEqual(response.data, b"")
+  
+  
+  def test_blog_etag_changes_on_like(self):
+    etag = self.client.get("/blogs/1").headers["ETag"]
+    self.client.post("/blogs/1/like", headers={"Authorization": "Bearer " + self.token})
+    
+    response = self.client.get("/blogs/1", headers={"If-None-Match": etag})
+    self.assertEqual(response.status_code, 200)
+    self.assertNotEqual(response.headers["ETag"], etag)
+  
+  
+  def test_if_modified_since_ignored(self):
+    # A like leaves updated_at alone, so a date validator would answer 304 with a stale like_count
+    self.client.post("/blogs/1/like", headers={"Authorization": "Bearer " + self.token})
+    response = self.client.get("/blogs/1", headers={"If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"})
+    self.assertEqual(response.status_code, 200)
+    self.assertEqual(response.json["like_count"], 1)
+  
+  
+  def test_etag_changes_on_author_rename(self):
+    headers = {"Authorization": "Bearer " + self.token}
+    blog_etag = self.client.get("/blogs/1").headers["ETag"]
+    list_etag = self.client.get("/blogs/").headers["ETag"]
+    comments_etag = self.client.get("/blogs/1/comments").headers["ETag"]
+    self.client.patch("/users/me", json={"name": "Renamed"}, headers=headers)
+    
+    self.assertEqual(self.client.get("/blogs/1", headers={"If-None-Match": blog_etag}).status_code, 200)
+    self.assertEqual(self.client.get("/blogs/", headers={"If-None-Match": list_etag}).status_code, 200)
+    response = self.client.get("/blogs/1/comments", headers={"If-None-Match": comments_etag})
+    self.assertEqual(response.status_code, 200)
+    self.assertEqual(response.json["comments"][0]["user"]["name"], "Renamed")
+  
+  
+  def test_etag_depends_on_fields(self):
+    full = self.client.get("/blogs/1").headers["ETag"]
+    narrow = self.client.get("/blogs/1?fields=id,title")
+    self.assertNotEqual(narrow.headers["ETag"], full)
+    self.assertEqual(self.client.get("/blogs/1?fields=id,title", headers={"If-None-Match": full}).status_code, 200)
+    self.assertEqual(self.client.get("/blogs/1?fields=id,title", headers={"If-None-Match": narrow.headers["ETag"]}).status_code, 304)
+    self.assertNotEqual(self.client.get("/blogs/?fields=id").headers["ETag"], self.client.get("/blogs/").headers["ETag"])
+  
+  
+  def test_blog_list_etag(self):
+    etag = self.client.get("/blogs/").headers["ETag"]
+    self.assertEqual(self.client.get("/blogs/", headers={"If-None-Match": etag}).status_code, 304)
+    
+    headers = {"Authorization": "Bearer " + self.token}
+    self.client.patch("/blogs/1", json={"title": "Updated"}, headers=headers)
+    self.assertEqual(self.client.get("/blogs/", headers={"If-None-Match": etag}).status_code, 200)
+  
+  
+  def test_comments_etag(self):
+    etag = self.client.get("/blogs/1/comments").headers["ETag"]
+    self.assertEqual(self.client.get("/blogs/1/comments", headers={"If-None-Match": etag}).status_code, 304)
+    
+    headers = {"Authorization": "Bearer " + self.token}
+    self.client.post("/blogs/1/comments", json={"content": "test test"}, headers=headers)
+    self.assertEqual(self.client.get("/blogs/1/comments", headers={"If-None-Match": etag}).status_code, 200)
+  
+  
+  def test_missing_blog(self):
+    self.assertEqual(self.client.get("/blogs/5").status_code, 404)
+    self.assertEqual(self.client.get("/blogs/5/comments").status_code, 404)
+  
+  
+  def test_cached_response_conditional(self):
+    self.app.extensions["cache"] = SimpleCache()
+    etag = self.client.get("/blogs/1").headers["ETag"]
+    
+    response = self.client.get("/blogs/1", headers={"If-None-Match": etag})
+    self.assertEqual(response.headers["X-Cache"], "HIT")
+    self.assertEqual(response.status_code, 304)
@@ -0,0 +1,71 @@
+import json
+import unittest
+from app import create_app
+from app.models import db, Blog, User, Comment
+from utils.auth import generate_token, hash_password
+
+class TestExport(unittest.TestCase):
+  
+  def setUp(self):
+    self.app = create_app("TestingConfig")
+    self.app.config["EXPORT_BATCH_SIZE"] = 4
+    with self.app.app_context():
+      db.drop_all()
+      db.create_all()
+      db.session.add(User(name="test_user", username="testing", email="test@test.com", password=hash_password("test")))
+      db.session.add(User(name="other_user", username="other", email="other@test.com", password=hash_password("test")))
+      for i in range(10):
+        db.session.add(Blog(title=f"Title {i}", body="test test test", author_id=1))
+      db.session.flush()
+      for i in range(6):
+        db.session.add(Comment(content=f"comment {i}", post_id=i % 2 + 1, user_id=1, is_archived=i == 5))
+      db.session.commit()
+      self.token = generate_token(1)
+      self.other_token = generate_token(2)
+    self.client = self.app.test_client()
+    self.headers = {"Authorization": "Bearer " + self.token}
+  
+  
+  def test_export_json_array(self):
+    response = self.client.get("/blogs/export", headers=self.headers)
+    self.assertEqual(response.status_code, 200)
+    self.assertTrue(response.is_streamed)
+    self.assertEqual(response.mimetype, "application/json")
+    
+    blogs = json.loads(response.get_data())
+    self.assertEqual([blog["id"] for blog in blogs], list(range(1, 11)))
+    self.assertEqual(blogs[0]["author"], {"id": 1, "username": "testing", "name": "test_user"})
+    self.assertEqual(blogs[0], self.client.get("/blogs/1").json)
+  
+  
+  def test_export_ndjson_resume(self):
+    response = self.client.get("/blogs/comments/export?format=ndjson&after=2&include_archived=true", headers=self.headers)
+    self.assertEqual(response.mimetype, "application/x-ndjson")
+    
+    comments = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    self.assertEqual([comment["id"] for comment in comments], [3, 4, 5, 6])
+    self.assertTrue(comments[-1]["is_archived"])
+  
+  
+  def test_export_empty(self):
+    self.assertEqual(json.loads(self.client.get("/blogs/export?after=10", headers=self.headers).get_data()), [])
+    self.assertEqual(self.client.get("/blogs/export?format=ndjson&after=10", headers=self.headers).get_data(), b"")
+  
+  
+  def test_export_bad_args(self):
+    self.assertEqual(self.client.get("/blogs/export?format=csv", headers=self.headers).status_code, 400)
+    self.assertEqual(self.client.get("/blogs/export?after=abc", headers=self.headers).status_code, 400)
+  
+  
+  def test_export_requires_token(self):
+    self.assertEqual(self.client.get("/blogs/export").status_code, 401)
+    self.assertEqual(self.client.get("/blogs/comments/export").status_code, 401)
+  
+  
+  def test_archived_rows_only_for_their_owner(self):
+    ids = lambda path, headers: [row["id"] for row in json.loads(self.client.get(path, headers=headers).get_data())]
+    other = {"Authorization": "Bearer " + self.other_token}
+    
+    self.assertEqual(ids("/blogs/comments/export", self.headers), [1, 2, 3, 4, 5])
+    self.assertEqual(ids("/blogs/comments/export?include_archived=true", self.headers), [1, 2, 3, 4, 5, 6])
+    self.assertEqual(ids("/blogs/comments/export?include_archived=true", other), [1, 2, 3, 4, 5])
@@ -0,0 +1,176 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import event
+from app import create_app
+from app.models import db, Blog, User, Follow, TimelineEntry
+from utils.auth import generate_token, hash_password
+
+class TestFeed(unittest.TestCase):
+  
+  def setUp(self):
+    self.app = create_app("TestingConfig")
+    with self.app.app_context():
+      db.drop_all()
+      db.create_all()
+      for n in range(1, 4):
+        db.session.add(User(name=f"user{n}", username=f"user{n}", email=f"user{n}@test.com", password=hash_password("test")))
+      db.session.commit()
+      self.token = generate_token(1)
+      self.tokens = {user_id: generate_token(user_id) for user_id in (2, 3)}
+    self.client = self.app.test_client()
+    self.headers = {"Authorization": "Bearer " + self.token}
+  
+  
+  def post_as(self, user_id, title):
+    headers = {"Authorization": "Bearer " + self.tokens[user_id]}
+    response = self.client.post("/blogs/", json={"title": title, "body": "feed body text"}, headers=headers)
+    self.assertEqual(response.status_code, 201)
+    return response.json["id"]
+  
+  def feed(self, **params):
+    response = self.client.get("/users/me/feed", query_string=params, headers=self.headers)
+    self.assertEqual(response.status_code, 200)
+    return response.json
+  
+  def timeline(self, user_id=1):
+    with self.app.app_context():
+      return sorted(db.session.scalars(db.select(TimelineEntry.blog_id).where(TimelineEntry.user_id == user_id)).all())
+  
+  
+  def test_follow_is_idempotent_and_counted(self):
+    self.assertEqual(self.client.put("/users/2/follow", headers=self.headers).status_code, 201)
+    self.assertEqual(self.client.put("/users/2/follow", headers=self.headers).status_code, 200)
+    with self.app.app_context():
+      self.assertEqual(db.session.get(User, 2).follower_count, 1)
+    
+    self.assertEqual(self.client.delete("/users/2/follow", headers=self.headers).status_code, 200)
+    self.assertEqual(self.client.delete("/users/2/follow", headers=self.headers).status_code, 200)
+    with self.app.app_context():
+      self.assertEqual(db.session.get(User, 2).follower_count, 0)
+      self.assertEqual(db.session.scalar(db.select(db.func.count(Follow.id))), 0)
+  
+  
+  def test_follow_errors(self):
+    self.assertEqual(self.client.put("/users/1/follow", headers=self.headers).status_code, 400)
+    self.assertEqual(self.client.put("/users/99/follow", headers=self.headers).status_code, 404)
+    self.assertEqual(self.client.put("/users/2/follow").status_code, 401)
+  
+  
+  def test_new_posts_fan_out_to_followers(self):
+    self.client.put("/users/2/follow", headers=self.headers)
+    first = self.post_as(2, "first post")
+    second = self.post_as(2, "second post")
+    self.post_as(3, "not followed")
+    
+    self.assertEqual(self.timeline(), [first, second])
+    blogs = self.feed()["blogs"]
+    self.assertEqual([blog["id"] for blog in blogs], [second, first])
+    self.assertEqual(blogs[0]["author"]["username"], "user2")
+  
+  
+  def test_follow_backfills_and_unfollow_clears(self):
+    earlier = self.post_as(2, "written before the follow")
+    self.client.put("/users/2/follow", headers=self.headers)
+    self.assertEqual(self.timeline(), [earlier])
+    
+    self.client.delete("/users/2/follow", headers=self.headers)
+    self.assertEqual(self.timeline(), [])
+    self.assertEqual(self.feed()["blogs"], [])
+  
+  
+  def test_batch_create_fans_out(self):
+    self.client.put("/users/2/follow", headers=self.headers)
+    headers = {"Authorization": "Bearer " + self.tokens[2]}
+    response = self.client.post("/blogs/batch", json=[
+      {"title": "batch one", "body": "feed body text"},
+      {"title": "batch two", "body": "feed body text"},
+    ], headers=headers)
+    self.assertEqual(response.status_code, 201)
+    self.assertEqual(self.timeline(), [result["id"] for result in response.json["results"]])
+  
+  
+  def test_high_follower_authors_are_pulled(self):
+    self.app.config["FEED_FANOUT_MAX_FOLLOWERS"] = 0
+    self.client.put("/users/2/follow", headers=self.headers)
+    pulled = self.post_as(2, "celebrity post")
+    self.assertEqual(self.timeline(), [])
+    
+    self.app.config["FEED_FANOUT_MAX_FOLLOWERS"] = 10000
+    self.client.put("/users/3/follow", headers=self.headers)
+    pushed = self.post_as(3, "regular post")
+    self.app.config["FEED_FANOUT_MAX_FOLLOWERS"] = 0
+    
+    self.assertEqual([blog["id"] for blog in self.feed()["blogs"]], [pushed, pulled])
+  
+  
+  def test_posts_keep_their_branch_when_the_author_crosses_the_limit(self):
+    self.app.config["FEED_FANOUT_MAX_FOLLOWERS"] = 0
+    self.client.put("/users/2/follow", headers=self.headers)
+    pulled = self.post_as(2, "posted while over the limit")
+    
+    self.app.config["FEED_FANOUT_MAX_FOLLOWERS"] = 10000
+    pushed = self.post_as(2, "posted back under it")
+    self.assertEqual(self.timeline(), [pushed])
+    self.assertEqual([blog["id"] for blog in self.feed()["blogs"]], [pushed, pulled])
+  
+  
+  def test_feed_pages_with_cursor_and_fields(self):
+    self.client.put("/users/2/follow", headers=self.headers)
+    ids = [self.post_as(2, f"post number {n}") for n in range(5)]
+    
+    page = self.feed(limit=2, fields="id,title")
+    self.assertEqual([blog["id"] for blog in page["blogs"]], ids[:-3:-1])
+    self.assertEqual(set(page["blogs"][0]), {"id", "title"})
+    
+    seen = [blog["id"] for blog in page["blogs"]]
+    while page["next_cursor"]:
+      page = self.feed(limit=2, cursor=page["next_cursor"])
+      seen.extend(blog["id"] for blog in page["blogs"])
+    self.assertEqual(seen, ids[::-1])
+    
+    self.assertEqual(self.client.get("/users/me/feed?fields=nope", headers=self.headers).status_code, 400)
+  
+  
+  def test_feed_is_one_range_read_and_one_hydration(self):
+    self.client.put("/users/2/follow", headers=self.headers)
+    for n in range(5):
+      self.post_as(2, f"post number {n}")
+    
+    statements = []
+    with self.app.app_context():
+      engine = db.engine
+    def record(conn, cursor, statement, parameters, context, executemany):
+      statements.append(statement)
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+      self.feed()
+    finally:
+      event.remove(engine, "before_cursor_execute", record)
+    
+    feed_statements = [s for s in statements if "timelines" in s or "blogs.title" in s]
+    self.assertEqual(len(feed_statements), 2)
+  
+  
+  def test_archived_blogs_skipped(self):
+    self.client.put("/users/2/follow", headers=self.headers)
+    kept = self.post_as(2, "still visible")
+    archived = self.post_as(2, "archived later")
+    with self.app.app_context():
+      db.session.get(Blog, archived).is_archived = True
+      db.session.commit()
+    self.assertEqual([blog["id"] for blog in self.feed()["blogs"]], [kept])
+  
+  
+  def test_trim_timelines(self):
+    now = datetime.now(timezone.utc)
+    with self.app.app_context():
+      for n in range(1, 6):
+        db.session.add(Blog(id=n, title=f"post {n}", body="feed body text", author_id=2, created_at=now + timedelta(minutes=n)))
+      db.session.flush()
+      for n in range(1, 6):
+        db.session.add(TimelineEntry(user_id=1, blog_id=n, created_at=now + timedelta(minutes=n)))
+      db.session.commit()
+    
+    result = self.app.test_cli_runner().invoke(args=["trim-timelines", "--length", "2"])
+    self.assertIn("Removed 3 timeline entries", result.output)
+    self.assertEqual(self.timeline(), [4, 5])
@@ -0,0 +1,85 @@
+import unittest
+from sqlalchemy import event
+from app import create_app
+from app.models import db, Blog, User, Comment
+from utils.auth import generate_token, hash_password
+from utils.fieldsets import make_excerpt
+
+class TestFieldsets(unittest.TestCase):
+  
+  def setUp(self):
+    self.app = create_app("TestingConfig")
+    self.long_body = "word " * 100
+    with self.app.app_context():
+      db.drop_all()
+      db.create_all()
+      db.session.add(User(name="test_user", username="testing", email="test@test.com", password=hash_password("test")))
+      db.session.add(Blog(title="Short", body="a short body", author_id=1))
+      db.session.add(Blog(title="Long", body=self.long_body, author_id=1))
+      db.session.flush()
+      db.session.add(Comment(content="blah blah blah", post_id=1, user_id=1))
+      db.session.commit()
+      self.token = generate_token(1)
+    self.client = self.app.test_client()
+  
+  
+  def statements(self, url, **kwargs):
+    with self.app.app_context():
+      engine = db.engine
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+      response = self.client.get(url, **kwargs)
+    finally:
+      event.remove(engine, "before_cursor_execute", listener)
+    return response, statements
+  
+  
+  def test_blog_list_fields(self):
+    response, statements = self.statements("/blogs/?fields=id,title,excerpt")
+    self.assertEqual(response.status_code, 200)
+    self.assertEqual(response.json["blogs"], [
+      {"id": 2, "title": "Long", "excerpt": make_excerpt(self.long_body)},
+      {"id": 1, "title": "Short", "excerpt": "a short body"},
+    ])
+    
+    page_query = statements[-1]
+    self.assertNotRegex(page_query, r"(?<!substr\()blogs\.body")
+    self.assertIn("substr(blogs.body", page_query)
+    self.assertNotIn("users", page_query)
+  
+  
+  def test_excerpt(self):
+    excerpt = self.client.get("/blogs/2?fields=excerpt").json["excerpt"]
+    self.assertTrue(excerpt.endswith("…"))
+    self.assertLessEqual(len(excerpt), 201)
+    self.assertTrue(self.long_body.startswith(excerpt[:-1]))
+    self.assertEqual(make_excerpt("x" * 300, 10), "x" * 10 + "…")
+  
+  
+  def test_default_fields_unchanged(self):
+    blog = self.client.get("/blogs/1").json
+    self.assertNotIn("excerpt", blog)
+    self.assertEqual(blog["author"], {"id": 1, "username": "testing", "name": "test_user"})
+    self.assertEqual(blog, self.client.get("/blogs/").json["blogs"][1])
+  
+  
+  def test_comment_fields(self):
+    response = self.client.get("/blogs/1/comments?fields=content,user")
+    self.assertEqual(response.json["comments"], [
+      {"content": "blah blah blah", "user": {"id": 1, "username": "testing", "name": "test_user"}}
+    ])
+  
+  
+  def test_user_fields(self):
+    headers = {"Authorization": "Bearer " + self.token}
+    response, statements = self.statements("/users/me?fields=username", headers=headers)
+    self.assertEqual(response.json, {"username": "testing"})
+    self.assertNotIn("users.password", statements[-1])
+  
+  
+  def test_unknown_fields(self):
+    self.assertEqual(self.client.get("/blogs/?fields=title,password").status_code, 400)
+    self.assertEqual(self.client.get("/blogs/1?fields=").status_code, 400)
+    self.assertEqual(self.client.get("/blogs/export?fields=nope", headers={"Authorization": "Bearer " + self.token}).status_code, 400)
@@ -1,6 +1,7 @@
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from app import create_app
-from app.models import db, Blog, User, Comment
+from app.models import db, Blog, User, Comment, Like
 from utils.auth import generate_token, hash_password
 
 class TestLike(unittest.TestCase):
@@ -36,4 +37,78 @@ class TestLike(unittest.TestCase):
     
     response = self.client.post("/blogs/1/like", headers=headers)
     self.assertEqual(response.status_code, 201)
-    self.assertEqual(response.json["message"], "Liked")
\ No newline at end of file
+    self.assertEqual(response.json["message"], "Liked")
+  
+  
+  def test_like_count(self):
+    headers = {"Authorization": "Bearer " + self.get_token()}
+    
+    self.client.post("/blogs/1/like", headers=headers)
+    response = self.client.get("/blogs/1")
+    self.assertEqual(response.json["like_count"], 1)
+    
+    self.client.post("/blogs/1/like", headers=headers)
+    response = self.client.get("/blogs/1")
+    self.assertEqual(response.json["like_count"], 0)
+  
+  
+  def test_put_like_idempotent(self):
+    headers = {"Authorization": "Bearer " + self.token}
+    
+    self.assertEqual(self.client.put("/blogs/1/like", headers=headers).status_code, 201)
+    self.assertEqual(self.client.put("/blogs/1/like", headers=headers).status_code, 200)
+    self.assertEqual(self.client.get("/blogs/1").json["like_count"], 1)
+  
+  
+  def test_delete_like_idempotent(self):
+    headers = {"Authorization": "Bearer " + self.token}
+    self.client.put("/blogs/1/like", headers=headers)
+    
+    self.assertEqual(self.client.delete("/blogs/1/like", headers=headers).status_code, 200)
+    self.assertEqual(self.client.delete("/blogs/1/like", headers=headers).status_code, 200)
+    self.assertEqual(self.client.get("/blogs/1").json["like_count"], 0)
+  
+  
+  def test_like_missing_blog(self):
+    headers = {"Authorization": "Bearer " + self.token}
+    
+    self.assertEqual(self.client.post("/blogs/2/like", headers=headers).status_code, 404)
+    self.assertEqual(self.client.put("/blogs/2/like", headers=headers).status_code, 404)
+    self.assertEqual(self.client.delete("/blogs/2/like", headers=headers).status_code, 404)
+    with self.app.app_context():
+      self.assertEqual(db.session.query(Like).count(), 0)
+  
+  
+  def test_concurrent_likes(self):
+    with self.app.app_context():
+      for i in range(2, 9):
+        db.session.add(User(name=f"user{i}", username=f"user{i}", email=f"user{i}@test.com", password="x"))
+      db.session.commit()
+      tokens = [generate_token(user_id) for user_id in range(1, 9)]
+    
+    def hammer(token):
+      client = self.app.test_client()
+      headers = {"Authorization": "Bearer " + token}
+      statuses = [client.post("/blogs/1/like", headers=headers).status_code for _ in range(3)]
+      statuses.append(client.delete("/blogs/1/like", headers=headers).status_code)
+      statuses.append(client.put("/blogs/1/like", headers=headers).status_code)
+      return statuses
+    
+    # Two threads per user so the same (user, post) pair races as well
+    with ThreadPoolExecutor(max_workers=16) as executor:
+      statuses = [status for result in executor.map(hammer, tokens * 2) for status in result]
+    
+    self.assertNotIn(500, statuses)
+    with self.app.app_context():
+      self.assertEqual(db.session.get(Blog, 1).like_count, db.session.query(Like).count())
+    
+    def like(token):
+      return self.app.test_client().put("/blogs/1/like", headers={"Authorization": "Bearer " + token}).status_code
+    
+    with ThreadPoolExecutor(max_workers=16) as executor:
+      statuses = list(executor.map(like, tokens * 2))
+    
+    self.assertNotIn(500, statuses)
+    with self.app.app_context():
+      self.assertEqual(db.session.query(Like).count(), 8)
+      self.assertEqual(db.session.get(Blog, 1).like_count, 8)
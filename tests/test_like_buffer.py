@@ -0,0 +1,115 @@
+import time
+import unittest
+from unittest.mock import patch
+from sqlalchemy.exc import IntegrityError
+from app import create_app
+from app.models import db, Blog, User, Like
+from utils.auth import generate_token, hash_password
+from utils.like_buffer import LikeBuffer
+from utils.likes import insert_like
+
+class TestLikeBuffer(unittest.TestCase):
+  
+  def setUp(self):
+    self.app = create_app("TestingConfig")
+    self.user = User(name="test_user", username="testing", email="test@test.com", password=hash_password("test"))
+    self.blog = Blog(title="Test Title", body="test test test", author_id=1)
+    with self.app.app_context():
+      db.drop_all()
+      db.create_all()
+      db.session.add(self.user)
+      db.session.add(self.blog)
+      db.session.commit()
+      self.token = generate_token(1)
+    self.buffer = LikeBuffer(self.app, interval=60, max_events=1000)
+    self.app.extensions["like_buffer"] = self.buffer
+    self.client = self.app.test_client()
+    self.headers = {"Authorization": "Bearer " + self.token}
+  
+  
+  def stored(self):
+    with self.app.app_context():
+      return db.session.scalar(db.select(db.func.count(Like.id))), db.session.get(Blog, 1).like_count
+  
+  
+  def test_buffered_like_visible_before_flush(self):
+    response = self.client.post("/blogs/1/like", headers=self.headers)
+    self.assertEqual(response.status_code, 201)
+    self.assertEqual(self.stored(), (0, 0))
+    self.assertEqual(self.client.get("/blogs/1").json["like_count"], 1)
+    self.assertEqual(self.client.get("/blogs/").json["blogs"][0]["like_count"], 1)
+    
+    self.assertEqual(self.buffer.flush(), 1)
+    self.assertEqual(self.stored(), (1, 1))
+    self.assertEqual(self.client.get("/blogs/1").json["like_count"], 1)
+  
+  
+  def test_toggles_cancel_out(self):
+    self.assertEqual(self.client.post("/blogs/1/like", headers=self.headers).status_code, 201)
+    self.assertEqual(self.client.post("/blogs/1/like", headers=self.headers).status_code, 200)
+    self.assertEqual(self.buffer.flush(), 0)
+    self.assertEqual(self.stored(), (0, 0))
+  
+  
+  def test_put_delete_against_persisted_like(self):
+    self.assertEqual(self.client.put("/blogs/1/like", headers=self.headers).status_code, 201)
+    self.buffer.flush()
+    
+    self.assertEqual(self.client.put("/blogs/1/like", headers=self.headers).status_code, 200)
+    self.assertEqual(self.client.delete("/blogs/1/like", headers=self.headers).status_code, 200)
+    self.assertEqual(self.client.get("/blogs/1").json["like_count"], 0)
+    self.assertEqual(self.buffer.flush(), 1)
+    self.assertEqual(self.stored(), (0, 0))
+  
+  
+  def test_missing_blog(self):
+    self.assertEqual(self.client.post("/blogs/99/like", headers=self.headers).status_code, 404)
+    self.assertEqual(self.buffer.flush(), 0)
+  
+  
+  def test_flusher_thread(self):
+    self.buffer.max_events = 1
+    self.buffer.start()
+    self.client.put("/blogs/1/like", headers=self.headers)
+    
+    deadline = time.monotonic() + 5
+    while self.stored() != (1, 1) and time.monotonic() < deadline:
+      time.sleep(0.01)
+    self.buffer.stop()
+    self.assertEqual(self.stored(), (1, 1))
+  
+  
+  def test_in_flight_batch_still_counted(self):
+    self.client.post("/blogs/1/like", headers=self.headers)
+    seen = []
+    def insert_and_peek(*args):
+      seen.append((self.buffer.delta(1), self.buffer.pending(1, [1])))
+      return insert_like(*args)
+    
+    with patch("utils.like_buffer.insert_like", insert_and_peek):
+      self.assertEqual(self.buffer.flush(), 1)
+    self.assertEqual(seen, [(1, {1: True})])
+    self.assertEqual((self.buffer.delta(1), self.buffer.pending(1, [1])), (0, {}))
+    self.assertEqual(self.client.get("/blogs/1").json["like_count"], 1)
+  
+  
+  def test_purged_post_drops_only_its_likes(self):
+    with self.app.app_context():
+      db.session.add(Blog(title="Doomed", body="test test test", author_id=1))
+      db.session.commit()
+    self.client.post("/blogs/1/like", headers=self.headers)
+    self.client.post("/blogs/2/like", headers=self.headers)
+    with self.app.app_context():
+      db.session.delete(db.session.get(Blog, 2))
+      db.session.commit()
+    
+    def insert_or_fail(user_id, post_id, created_at=None):
+      # SQLite here doesn't enforce foreign keys; behave like a database that does
+      if db.session.get(Blog, post_id) is None:
+        raise IntegrityError("INSERT INTO likes", {}, Exception("FOREIGN KEY constraint failed"))
+      return insert_like(user_id, post_id, created_at)
+    
+    with patch("utils.like_buffer.insert_like", insert_or_fail):
+      self.assertEqual(self.buffer.flush(), 2)
+    self.assertEqual(self.stored(), (1, 1))
+    self.assertEqual(self.buffer.delta(2), 0)
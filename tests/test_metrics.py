@@ -0,0 +1,72 @@
+import re
+import unittest
+import config
+from app import create_app
+from app.models import db, Blog, User
+from utils.auth import hash_password
+from utils.metrics import Histogram
+
+class TestMetrics(unittest.TestCase):
+  
+  def setUp(self):
+    self.app = create_app("TestingConfig")
+    self.user = User(name="test_user", username="testing", email="test@test.com", password=hash_password("test"))
+    self.blog = Blog(title="Test Title", body="test test test", author_id=1)
+    with self.app.app_context():
+      db.drop_all()
+      db.create_all()
+      db.session.add(self.user)
+      db.session.add(self.blog)
+      db.session.commit()
+    self.client = self.app.test_client()
+  
+  
+  def sample(self, text, name, **labels):
+    label_text = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    match = re.search(rf"^{re.escape(name)}\{{{re.escape(label_text)}\}} (\S+)$", text, re.MULTILINE)
+    return float(match.group(1)) if match else None
+  
+  
+  def test_prometheus_exposition(self):
+    self.client.get("/blogs/")
+    self.client.get("/blogs/")
+    self.client.post("/users/login", json={"email": "test@test.com", "password": "test"})
+    
+    response = self.client.get("/metrics")
+    self.assertEqual(response.status_code, 200)
+    self.assertTrue(response.mimetype.startswith("text/plain"))
+    text = response.get_data(as_text=True)
+    
+    self.assertIn("# TYPE http_request_duration_seconds histogram", text)
+    self.assertEqual(self.sample(text, "http_requests_total", endpoint="blog_bp.get_all_blogs", method="GET", status="200"), 2)
+    self.assertEqual(self.sample(text, "http_request_duration_seconds_count", endpoint="blog_bp.get_all_blogs", method="GET"), 2)
+    self.assertEqual(self.sample(text, "http_request_duration_seconds_count", endpoint="user_bp.login", method="POST"), 1)
+    self.assertGreater(self.sample(text, "db_statements_per_request_sum", endpoint="blog_bp.get_all_blogs"), 0)
+    self.assertGreater(self.sample(text, "serialization_time_per_request_seconds_sum", endpoint="blog_bp.get_all_blogs"), 0)
+    self.assertGreater(self.sample(text, "http_response_size_bytes_sum", endpoint="blog_bp.get_all_blogs"), 0)
+  
+  
+  def test_server_timing_header(self):
+    self.assertNotIn("Server-Timing", self.client.get("/blogs/1").headers)
+    
+    original = config.TestingConfig.SERVER_TIMING_ENABLED
+    config.TestingConfig.SERVER_TIMING_ENABLED = True
+    try:
+      client = create_app("TestingConfig").test_client()
+    finally:
+      config.TestingConfig.SERVER_TIMING_ENABLED = original
+    
+    header = client.get("/blogs/1").headers["Server-Timing"]
+    self.assertRegex(header, r'^db;dur=[\d.]+;desc="\d+ queries", serialize;dur=[\d.]+, total;dur=[\d.]+$')
+  
+  
+  def test_histogram_buckets_are_cumulative(self):
+    histogram = Histogram("latency", "Latency.", ("endpoint",), (0.1, 1.0))
+    for value in (0.05, 0.5, 5):
+      histogram.observe("a", value=value)
+    
+    lines = histogram.expose()
+    self.assertIn('latency_bucket{endpoint="a",le="0.1"} 1', lines)
+    self.assertIn('latency_bucket{endpoint="a",le="1.0"} 2', lines)
+    self.assertIn('latency_bucket{endpoint="a",le="+Inf"} 3', lines)
+    self.assertIn('latency_count{endpoint="a"} 3', lines)
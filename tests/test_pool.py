@@ -0,0 +1,63 @@
+import sqlite3
+import unittest
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from app import create_app
+from app.models import db, Blog, User
+from utils.auth import hash_password
+from utils.pool import InstrumentedQueuePool
+
+class TestPool(unittest.TestCase):
+  
+  def setUp(self):
+    self.app = create_app("TestingConfig")
+    self.user = User(name="test_user", username="testing", email="test@test.com", password=hash_password("test"))
+    self.blog = Blog(title="Test Title", body="test test test", author_id=1)
+    with self.app.app_context():
+      db.drop_all()
+      db.create_all()
+      db.session.add(self.user)
+      db.session.add(self.blog)
+      db.session.commit()
+    self.client = self.app.test_client()
+  
+  
+  def test_engine_options_applied(self):
+    with self.app.app_context():
+      pool = db.engine.pool
+      self.assertIsInstance(pool, InstrumentedQueuePool)
+      self.assertEqual(pool.size(), 5)
+      self.assertEqual(pool._max_overflow, 10)
+  
+  
+  def test_pool_metrics(self):
+    self.client.get("/blogs/1")
+    
+    response = self.client.get("/metrics/pool")
+    self.assertEqual(response.status_code, 200)
+    self.assertGreater(response.json["checkouts"], 0)
+    self.assertEqual(response.json["checked_out"], 0)
+    self.assertEqual(response.json["timeouts"], 0)
+  
+  
+  def test_pool_timeout_counted(self):
+    pool = InstrumentedQueuePool(lambda: sqlite3.connect(":memory:"), pool_size=1, max_overflow=0, timeout=0.05)
+    connection = pool.connect()
+    
+    with self.assertRaises(PoolTimeoutError):
+      pool.connect()
+    connection.close()
+    
+    snapshot = pool.snapshot()
+    self.assertEqual(snapshot["checkouts"], 1)
+    self.assertEqual(snapshot["timeouts"], 1)
+    self.assertEqual(pool.recreate().snapshot()["timeouts"], 1)
+  
+  
+  def test_overflow_peak(self):
+    pool = InstrumentedQueuePool(lambda: sqlite3.connect(":memory:"), pool_size=1, max_overflow=2)
+    connections = [pool.connect() for _ in range(3)]
+    self.assertEqual(pool.snapshot()["overflow"], 2)
+    
+    for connection in connections:
+      connection.close()
+    self.assertEqual(pool.snapshot()["overflow_peak"], 2)
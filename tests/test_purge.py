@@ -0,0 +1,217 @@
+import time
+import unittest
+from unittest.mock import patch
+from datetime import datetime, timezone
+from app import create_app
+from app.models import db, Blog, Comment, User, Like, Follow, TimelineEntry, PurgeJob
+from utils.auth import generate_token, hash_password
+from utils.like_buffer import LikeBuffer
+from utils.purge import PurgeWorker, claim, run_job, run_pending
+
+class TestPurge(unittest.TestCase):
+  
+  def setUp(self):
+    self.app = create_app("TestingConfig")
+    with self.app.app_context():
+      db.drop_all()
+      db.create_all()
+      db.session.add(User(name="test_user", username="testing", email="test@test.com", password=hash_password("test")))
+      db.session.add(User(name="other_user", username="other", email="other@test.com", password=hash_password("test")))
+      db.session.add(Blog(id=1, title="Mine", body="test test test", author_id=1, comment_count=3, like_count=1))
+      db.session.add(Blog(id=2, title="Theirs", body="test test test", author_id=2, comment_count=2, like_count=1))
+      for n in range(3):
+        db.session.add(Comment(content=f"on mine {n}", user_id=2, post_id=1))
+      db.session.add(Comment(content="on theirs", user_id=1, post_id=2))
+      db.session.add(Comment(content="also on theirs", user_id=2, post_id=2))
+      db.session.add(Like(user_id=2, post_id=1))
+      db.session.add(Like(user_id=1, post_id=2))
+      db.session.add(Follow(follower_id=1, followee_id=2))
+      db.session.add(Follow(follower_id=2, followee_id=1))
+      db.session.add(TimelineEntry(user_id=2, blog_id=1, created_at=datetime.now(timezone.utc)))
+      db.session.execute(db.update(User).values(follower_count=1))
+      db.session.commit()
+      self.token = generate_token(1)
+      self.other_token = generate_token(2)
+    self.client = self.app.test_client()
+    self.headers = {"Authorization": "Bearer " + self.token}
+  
+  
+  def count(self, model):
+    with self.app.app_context():
+      return db.session.scalar(db.select(db.func.count()).select_from(model))
+  
+  
+  def test_deleted_blog_hidden_then_purged(self):
+    self.assertEqual(self.client.delete("/blogs/1", headers={"Authorization": "Bearer " + self.other_token}).status_code, 403)
+    
+    response = self.client.delete("/blogs/1", headers=self.headers)
+    self.assertEqual(response.status_code, 202)
+    self.assertIsNotNone(response.json["purge_job_id"])
+    
+    self.assertEqual(self.client.get("/blogs/1").status_code, 404)
+    self.assertEqual([blog["id"] for blog in self.client.get("/blogs/").json["blogs"]], [2])
+    self.assertEqual(self.client.post("/blogs/1/like", headers=self.headers).status_code, 404)
+    self.assertEqual(self.client.delete("/blogs/1", headers=self.headers).status_code, 404)
+    self.assertEqual(self.client.get("/blogs/1/comments").status_code, 404)
+    exported = self.client.get("/blogs/comments/export?format=ndjson", headers={"Authorization": "Bearer " + self.other_token}).get_data(as_text=True).splitlines()
+    self.assertEqual(len(exported), 2)
+    # Dependents are still there until the job runs
+    self.assertEqual(self.count(Comment), 5)
+    
+    with self.app.app_context():
+      self.assertEqual(run_pending(batch_size=2), 1)
+      job = db.session.get(PurgeJob, response.json["purge_job_id"])
+      self.assertEqual((job.status, job.purged), ("done", 6))
+      self.assertIsNone(db.session.get(Blog, 1))
+    self.assertEqual(self.count(Comment), 2)
+    self.assertEqual(self.count(Like), 1)
+    self.assertEqual(self.count(TimelineEntry), 0)
+  
+  
+  def test_deleted_user_purged_with_counters(self):
+    response = self.client.delete("/users/me", headers=self.headers)
+    self.assertEqual(response.status_code, 202)
+    
+    self.assertEqual(self.client.get("/users/me", headers=self.headers).status_code, 401)
+    self.assertEqual(self.client.get("/users/1/blogs").status_code, 404)
+    self.assertEqual(self.client.get("/blogs/1").status_code, 404)
+    self.assertEqual(self.client.post("/users/login", json={"email": "test@test.com", "password": "test"}).status_code, 401)
+    
+    result = self.app.test_cli_runner().invoke(args=["purge-deleted", "--batch-size", "2"])
+    self.assertIn("Finished 1 purge jobs", result.output)
+    self.assertIn("step user", result.output)
+    
+    with self.app.app_context():
+      self.assertIsNone(db.session.get(User, 1))
+      theirs = db.session.get(Blog, 2)
+      self.assertEqual((theirs.comment_count, theirs.like_count), (1, 0))
+      self.assertEqual(db.session.get(User, 2).follower_count, 0)
+    self.assertEqual(self.count(Blog), 1)
+    self.assertEqual(self.count(Comment), 1)
+    self.assertEqual(self.count(Follow), 0)
+  
+  
+  def test_deleted_users_token_rejected_on_writes(self):
+    self.client.delete("/users/me", headers=self.headers)
+    with self.app.app_context():
+      run_pending()
+    
+    writes = [
+      ("post", "/blogs/", {"title": "ghost", "body": "written after deletion"}),
+      ("post", "/blogs/batch", [{"title": "ghost", "body": "written after deletion"}]),
+      ("patch", "/blogs/2", {"title": "ghost"}),
+      ("delete", "/blogs/2", None),
+      ("post", "/blogs/2/comments", {"content": "ghost"}),
+      ("post", "/blogs/comments/batch", [{"post_id": 2, "content": "ghost"}]),
+      ("post", "/blogs/2/like", None),
+      ("put", "/blogs/2/like", None),
+      ("delete", "/blogs/2/like", None),
+      ("post", "/blogs/likes/batch", [{"post_id": 2}]),
+      ("put", "/users/2/follow", None),
+      ("delete", "/users/2/follow", None),
+      ("patch", "/users/me", {"name": "ghost"}),
+      ("delete", "/users/me", None),
+    ]
+    for method, path, body in writes:
+      response = getattr(self.client, method)(path, json=body, headers=self.headers)
+      self.assertIn(response.status_code, (401, 404), f"{method.upper()} {path}")
+    
+    with self.app.app_context():
+      theirs = db.session.get(Blog, 2)
+      self.assertEqual((theirs.like_count, theirs.comment_count), (0, 1))
+      self.assertEqual(db.session.get(User, 2).follower_count, 0)
+    self.assertEqual(self.count(Like), 0)
+    self.assertEqual(self.count(Comment), 1)
+    self.assertEqual(self.count(Follow), 0)
+  
+  
+  def test_writes_racing_a_blog_delete(self):
+    with self.app.app_context():
+      # The live check has already passed when the blog goes
+      racing = db.session.get(Blog, 2)
+    buffer = LikeBuffer(self.app, interval=60, max_events=1000)
+    self.app.extensions["like_buffer"] = buffer
+    self.client.post("/blogs/2/like", headers={"Authorization": "Bearer " + self.other_token})
+    self.client.delete("/blogs/2", headers={"Authorization": "Bearer " + self.other_token})
+    
+    with patch("app.blueprints.blog.routes.live_blog", return_value=racing):
+      self.assertEqual(self.client.post("/blogs/2/comments", json={"content": "too late"}, headers=self.headers).status_code, 404)
+    with patch("app.blueprints.blog.routes.existing_blog_ids", return_value={2}):
+      for path, body in (("/blogs/comments/batch", [{"post_id": 2, "content": "too late"}]), ("/blogs/likes/batch", [{"post_id": 2}])):
+        response = self.client.post(path, json=body, headers={"Authorization": "Bearer " + self.other_token})
+        self.assertEqual(response.json["results"][0]["status"], 404, path)
+    self.assertEqual(buffer.flush(), 1)
+    
+    self.assertEqual(self.count(Comment), 5)
+    self.assertEqual(self.count(Like), 2)
+  
+  
+  def test_last_step_sweeps_late_dependents(self):
+    job_id = self.client.delete("/blogs/1", headers=self.headers).json["purge_job_id"]
+    written = []
+    
+    def write_late(job):
+      # A write that got past the live check lands after its step already finished
+      if job.step == "blog" and not written:
+        written.append(job.step)
+        db.session.add(Like(user_id=1, post_id=1))
+        db.session.add(Comment(content="late", user_id=1, post_id=1))
+        db.session.commit()
+    
+    with self.app.app_context():
+      self.assertTrue(claim(job_id))
+      run_job(job_id, 500, write_late)
+      self.assertIsNone(db.session.get(Blog, 1))
+    self.assertEqual(self.count(Like), 1)
+    self.assertEqual(self.count(Comment), 2)
+  
+  
+  def test_interrupted_job_resumes(self):
+    job_id = self.client.delete("/users/me", headers=self.headers).json["purge_job_id"]
+    
+    with self.app.app_context():
+      self.assertTrue(claim(job_id))
+      # A second worker can't take a leased job
+      self.assertFalse(claim(job_id))
+      
+      steps = []
+      def crash_after_two(job):
+        steps.append(job.step)
+        if len(steps) == 2:
+          raise RuntimeError("worker died")
+      with self.assertRaises(RuntimeError):
+        run_job(job_id, 1, crash_after_two)
+      
+      # Both committed batches stuck: the one like on blog 1, then the empty batch that finished the step
+      job = db.session.get(PurgeJob, job_id)
+      self.assertEqual((job.status, job.step, job.purged), ("pending", "blog_comments", 1))
+      self.assertEqual(self.count(Like), 1)
+      
+      # Lease ran out: the next run continues from the recorded step
+      job.claimed_until = None
+      db.session.commit()
+      self.assertEqual(run_pending(batch_size=1), 1)
+      self.assertEqual(db.session.get(PurgeJob, job_id).status, "done")
+    self.assertEqual(self.count(Comment), 1)
+    self.assertEqual(self.count(User), 1)
+  
+  
+  def test_worker_woken_by_delete(self):
+    worker = PurgeWorker(self.app, interval=60, batch_size=500)
+    self.app.extensions["purge_worker"] = worker.start()
+    try:
+      job_id = self.client.delete("/blogs/1", headers=self.headers).json["purge_job_id"]
+      deadline = time.monotonic() + 5
+      while self.count(Blog) != 1 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    finally:
+      worker.stop()
+    with self.app.app_context():
+      self.assertEqual(db.session.get(PurgeJob, job_id).status, "done")
+  
+  
+  def test_purge_status(self):
+    self.client.delete("/blogs/1", headers=self.headers)
+    result = self.app.test_cli_runner().invoke(args=["purge-deleted", "--status"])
+    self.assertIn("blog 1, step likes, 0 rows purged", result.output)
+    self.assertIn("1 pending jobs", result.output)
@@ -0,0 +1,99 @@
+import os
+import random
+import tempfile
+import unittest
+from unittest.mock import patch
+import config
+from app import create_app
+from app.models import db, Base, Blog, User
+from utils.auth import generate_token, hash_password
+from utils.cache import NullCache, SimpleCache
+
+REPLICA_URI = "sqlite:///" + os.path.join(tempfile.gettempdir(), "blog_api_testing_replica.db")
+
+class TestReplica(unittest.TestCase):
+  
+  def setUp(self):
+    with patch.object(config.TestingConfig, "SQLALCHEMY_REPLICA_URIS", [REPLICA_URI]):
+      self.app = create_app("TestingConfig")
+    self.app.extensions["cache"] = NullCache()
+    
+    with self.app.app_context():
+      replica = self.app.extensions["replica_router"].engines["replica_0"]
+      Base.metadata.drop_all(replica)
+      Base.metadata.create_all(replica)
+      db.drop_all()
+      db.create_all()
+      
+      # Same rows in both databases, with titles that tell them apart
+      for engine, title in ((db.engine, "Primary"), (replica, "Replica")):
+        with engine.begin() as connection:
+          connection.execute(User.__table__.insert(), {
+            "name": "test_user", "username": "testing", "email": "test@test.com", "password": hash_password("test")
+          })
+          connection.execute(Blog.__table__.insert(), {"title": title, "body": "test test test", "author_id": 1})
+      self.token = generate_token(1)
+    self.client = self.app.test_client()
+    self.headers = {"Authorization": "Bearer " + self.token}
+  
+  
+  def test_reads_go_to_replica(self):
+    self.assertEqual(self.client.get("/blogs/1").json["title"], "Replica")
+    self.assertEqual(self.client.get("/blogs/").json["blogs"][0]["title"], "Replica")
+  
+  
+  def test_writes_go_to_primary(self):
+    response = self.client.patch("/blogs/1", json={"body": "updated body"}, headers=self.headers)
+    self.assertEqual(response.status_code, 200)
+    self.assertEqual(response.json["title"], "Primary")
+    
+    with self.app.app_context():
+      self.assertEqual(db.session.get(Blog, 1).body, "updated body")
+    self.assertEqual(self.client.get("/blogs/1").json["body"], "test test test")
+  
+  
+  def test_stale_replica_falls_back_to_primary(self):
+    self.app.extensions["replica_router"].max_lag = 1
+    
+    with patch.object(type(self.app.extensions["replica_router"]), "measure_lag", return_value=30):
+      self.assertEqual(self.client.get("/blogs/1").json["title"], "Primary")
+    
+    self.app.extensions["replica_router"]._lag.clear()
+    with patch.object(type(self.app.extensions["replica_router"]), "measure_lag", return_value=0.5):
+      self.assertEqual(self.client.get("/blogs/1").json["title"], "Replica")
+  
+  
+  def test_unreachable_replica_falls_back_to_primary(self):
+    self.app.extensions["replica_router"].max_lag = 1
+    
+    with patch.object(type(self.app.extensions["replica_router"]), "measure_lag", side_effect=OSError):
+      self.assertEqual(self.client.get("/blogs/1").json["title"], "Primary")
+  
+  
+  def test_read_after_write_in_request_uses_primary(self):
+    @self.app.route("/write-then-read")
+    def write_then_read():
+      db.session.add(Blog(title="New", body="test test test", author_id=1))
+      db.session.flush()
+      return {"count": len(db.session.scalars(db.select(Blog)).all())}
+    
+    self.assertEqual(self.client.get("/write-then-read").json["count"], 2)
+  
+  
+  def test_one_replica_per_request(self):
+    with patch("utils.replica.random.choice", wraps=random.choice) as choice:
+      self.assertEqual(self.client.get("/blogs/").status_code, 200)
+    self.assertEqual(choice.call_count, 1)
+  
+  
+  def test_primary_read_after_invalidation(self):
+    self.app.extensions["cache"] = SimpleCache()
+    self.app.config["REPLICA_INVALIDATION_WINDOW"] = 0
+    self.client.patch("/blogs/1", json={"body": "updated body"}, headers=self.headers)
+    self.assertEqual(self.client.get("/blogs/1").json["body"], "test test test")
+    
+    self.app.config["REPLICA_INVALIDATION_WINDOW"] = 5
+    self.client.patch("/blogs/1", json={"body": "updated again"}, headers=self.headers)
+    # The replica hasn't seen the write; caching its copy under the new version would pin stale data
+    self.assertEqual(self.client.get("/blogs/1").json["body"], "updated again")
+    self.assertEqual(self.client.get("/blogs/1").headers["X-Cache"], "HIT")
@@ -0,0 +1,75 @@
+import unittest
+from app import create_app
+from app.models import db, Blog, User
+from utils.auth import generate_token, hash_password
+
+class TestSearch(unittest.TestCase):
+  
+  def setUp(self):
+    self.app = create_app("TestingConfig")
+    self.user = User(name="test_user", username="testing", email="test@test.com", password=hash_password("test"))
+    with self.app.app_context():
+      db.drop_all()
+      db.create_all()
+      db.session.add(self.user)
+      db.session.add(Blog(title="Baking bread", body="Flour, water and salt make bread", author_id=1))
+      db.session.add(Blog(title="Gardening", body="Tomatoes need sun, not bread", author_id=1))
+      db.session.add(Blog(title="Running", body="Long distance training plans", author_id=1))
+      db.session.commit()
+      self.token = generate_token(1)
+    self.client = self.app.test_client()
+    self.headers = {"Authorization": "Bearer " + self.token}
+  
+  
+  def search(self, query):
+    return self.client.get(f"/blogs/search?{query}")
+  
+  
+  def test_search_ranked(self):
+    response = self.search("q=bread")
+    self.assertEqual(response.status_code, 200)
+    self.assertEqual([blog["id"] for blog in response.json["blogs"]], [1, 2])
+    self.assertEqual(response.json["blogs"][0]["author"]["username"], "testing")
+  
+  
+  def test_search_all_terms(self):
+    response = self.search("q=bread+tomatoes")
+    self.assertEqual([blog["id"] for blog in response.json["blogs"]], [2])
+  
+  
+  def test_search_paginated(self):
+    response = self.search("q=bread&limit=1")
+    self.assertEqual([blog["id"] for blog in response.json["blogs"]], [1])
+    self.assertEqual(response.json["next_page"], 2)
+    
+    response = self.search("q=bread&limit=1&page=2")
+    self.assertEqual([blog["id"] for blog in response.json["blogs"]], [2])
+    self.assertIsNone(response.json["next_page"])
+  
+  
+  def test_search_operators_escaped(self):
+    response = self.search('q="bread" OR NEAR(')
+    self.assertEqual(response.status_code, 200)
+  
+  
+  def test_invalid_search(self):
+    self.assertEqual(self.search("q=").status_code, 400)
+    self.assertEqual(self.search("q=bread&page=0").status_code, 400)
+  
+  
+  def test_index_follows_writes(self):
+    self.client.post("/blogs/", json={"title": "Sourdough", "body": "A starter is needed"}, headers=self.headers)
+    self.assertEqual([blog["id"] for blog in self.search("q=sourdough").json["blogs"]], [4])
+    
+    self.client.patch("/blogs/3", json={"title": "Marathon"}, headers=self.headers)
+    self.assertEqual([blog["id"] for blog in self.search("q=marathon").json["blogs"]], [3])
+    self.assertEqual(self.search("q=running").json["blogs"], [])
+    
+    self.client.patch("/blogs/1/archive", headers=self.headers)
+    self.assertEqual([blog["id"] for blog in self.search("q=bread").json["blogs"]], [2])
+  
+  
+  def test_rebuild_search_index(self):
+    result = self.app.test_cli_runner().invoke(args=["rebuild-search-index"])
+    self.assertIn("Search index rebuilt", result.output)
+    self.assertEqual([blog["id"] for blog in self.search("q=bread").json["blogs"]], [1, 2])
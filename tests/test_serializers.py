@@ -0,0 +1,46 @@
+import unittest
+from sqlalchemy import select
+from app import create_app
+from app.models import db, Blog, User, Comment
+from app.blueprints.blog.schemas import return_blogs_schema, return_comments_schema
+from app.blueprints.blog.serializers import blog_rows, comment_rows, serialize_blog_rows, serialize_comment_rows
+from utils.auth import hash_password
+
+class TestSerializers(unittest.TestCase):
+  
+  def setUp(self):
+    self.app = create_app("TestingConfig")
+    with self.app.app_context():
+      db.drop_all()
+      db.create_all()
+      db.session.add(User(name="Zoë \"Z\" O'Neil", username="zoe", email="zoe@test.com", password=hash_password("test")))
+      db.session.add(User(name="test_user", username="testing", email="test@test.com", password=hash_password("test")))
+      for i in range(5):
+        db.session.add(Blog(title=f"Title {i} ✓", body="body\nwith <html> & \"quotes\"", author_id=i % 2 + 1, is_archived=i == 3, like_count=i, comment_count=i * 2))
+      db.session.flush()
+      for i in range(5):
+        db.session.add(Comment(content=f"comment {i}", post_id=1, user_id=i % 2 + 1, is_updated=i == 2, is_archived=i == 4))
+      db.session.commit()
+  
+  
+  def assert_same_bytes(self, expected, actual):
+    self.assertEqual(expected, actual)
+    self.assertEqual(self.app.json.dumps(expected), self.app.json.dumps(actual))
+    with self.app.test_request_context():
+      self.assertEqual(self.app.json.response(expected).get_data(), self.app.json.response(actual).get_data())
+  
+  
+  def test_blog_rows_match_schema(self):
+    with self.app.test_request_context():
+      blogs = db.session.scalars(select(Blog).order_by(Blog.id)).all()
+      expected = return_blogs_schema.dump(blogs)
+      actual = serialize_blog_rows(db.session.execute(blog_rows().order_by(Blog.id)).all())
+    self.assert_same_bytes(expected, actual)
+  
+  
+  def test_comment_rows_match_schema(self):
+    with self.app.test_request_context():
+      comments = db.session.scalars(select(Comment).order_by(Comment.id)).all()
+      expected = return_comments_schema.dump(comments)
+      actual = serialize_comment_rows(db.session.execute(comment_rows().order_by(Comment.id)).all())
+    self.assert_same_bytes(expected, actual)
@@ -0,0 +1,181 @@
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import text
+from app import create_app
+from app.models import db, Blog, User, Like, TrendingEpoch
+from utils.auth import generate_token, hash_password
+from utils.like_buffer import LikeBuffer
+from utils.trending import TrendingDecayWorker, decay_scores, next_decay_in
+
+class TestTrending(unittest.TestCase):
+  
+  def setUp(self):
+    self.app = create_app("TestingConfig")
+    with self.app.app_context():
+      db.drop_all()
+      db.create_all()
+      db.session.add(User(name="test_user", username="testing", email="test@test.com", password=hash_password("test")))
+      for n in range(1, 4):
+        db.session.add(Blog(title=f"Blog {n}", body="test test test", author_id=1))
+      db.session.commit()
+      self.token = generate_token(1)
+    self.client = self.app.test_client()
+    self.headers = {"Authorization": "Bearer " + self.token}
+  
+  
+  def trending(self, **params):
+    response = self.client.get("/blogs/trending", query_string=params)
+    self.assertEqual(response.status_code, 200)
+    return [blog["id"] for blog in response.json["blogs"]]
+  
+  def scores(self):
+    with self.app.app_context():
+      return dict(db.session.execute(db.select(Blog.id, Blog.trending_score)).all())
+  
+  
+  def test_likes_and_comments_rank_blogs(self):
+    self.assertEqual(self.trending(), [])
+    
+    self.client.post("/blogs/2/like", headers=self.headers)
+    self.client.post("/blogs/3/comments", json={"content": "nice"}, headers=self.headers)
+    # A comment outweighs a like
+    self.assertEqual(self.trending(), [3, 2])
+    self.assertEqual(self.trending(limit=1), [3])
+  
+  
+  def test_unlike_takes_score_back(self):
+    self.client.post("/blogs/1/like", headers=self.headers)
+    self.assertGreater(self.scores()[1], 0)
+    self.client.post("/blogs/1/like", headers=self.headers)
+    self.assertAlmostEqual(self.scores()[1], 0)
+    self.assertEqual(self.trending(), [])
+  
+  
+  def test_older_activity_decays(self):
+    now = datetime.now(timezone.utc)
+    with self.app.app_context():
+      db.session.add(Like(user_id=1, post_id=1, created_at=now - timedelta(hours=48)))
+      db.session.add(Like(user_id=1, post_id=2, created_at=now))
+      db.session.commit()
+    
+    result = self.app.test_cli_runner().invoke(args=["decay-trending", "--rebuild"])
+    self.assertIn("Rebuilt trending scores for 2 blogs", result.output)
+    scores = self.scores()
+    # Two half-lives old
+    self.assertAlmostEqual(scores[1] / scores[2], 0.25, places=3)
+    self.assertEqual(self.trending(), [2, 1])
+  
+  
+  def test_decay_rescales_without_reordering(self):
+    self.client.post("/blogs/1/like", headers=self.headers)
+    self.client.post("/blogs/2/comments", json={"content": "nice"}, headers=self.headers)
+    before = self.scores()
+    
+    with self.app.app_context():
+      epoch = db.session.get(TrendingEpoch, 1).started_at.replace(tzinfo=timezone.utc)
+      self.assertEqual(decay_scores(epoch + timedelta(hours=24)), 2)
+      db.session.commit()
+    after = self.scores()
+    self.assertAlmostEqual(after[1], before[1] / 2)
+    self.assertAlmostEqual(after[2], before[2] / 2)
+    
+    # New events are scored against the moved epoch
+    self.client.post("/blogs/3/like", headers=self.headers)
+    self.assertAlmostEqual(self.scores()[3], after[1], places=3)
+    self.assertEqual(self.trending(), [2, 3, 1])
+  
+  
+  def test_interrupted_decay_keeps_ranking_and_resumes(self):
+    for blog_id in (1, 2, 3):
+      self.client.post(f"/blogs/{blog_id}/like", headers=self.headers)
+    self.client.post("/blogs/1/comments", json={"content": "nice"}, headers=self.headers)
+    before = self.scores()
+    
+    with self.app.app_context():
+      # As if a decay moved the epoch a half-life on and then stopped after rescaling blog 1
+      epoch = db.session.get(TrendingEpoch, 1).started_at.replace(tzinfo=timezone.utc)
+      db.session.execute(db.update(TrendingEpoch).values(
+        started_at=epoch + timedelta(hours=24), previous_started_at=epoch, rescaled_through=1
+      ))
+      db.session.execute(db.update(Blog).where(Blog.id == 1).values(trending_score=Blog.trending_score / 2))
+      db.session.commit()
+    
+    self.assertEqual(self.trending(), [1, 3, 2])
+    # Blog 2 hasn't been rescaled yet, so its new like is scored against the old epoch
+    self.client.post("/blogs/2/comments", json={"content": "nice"}, headers=self.headers)
+    self.assertEqual(self.trending(), [2, 1, 3])
+    
+    with self.app.app_context():
+      self.assertEqual(decay_scores(batch_size=1), 2)
+      self.assertIsNone(db.session.get(TrendingEpoch, 1).rescaled_through)
+    after = self.scores()
+    self.assertAlmostEqual(after[1], before[1] / 2)
+    self.assertAlmostEqual(after[3], before[3] / 2)
+    self.assertEqual(self.trending(), [2, 1, 3])
+  
+  
+  def test_decay_worker_runs_when_epoch_is_due(self):
+    self.client.post("/blogs/1/like", headers=self.headers)
+    before = self.scores()
+    with self.app.app_context():
+      self.assertGreater(next_decay_in(3600), 3500)
+      # An epoch two half-lives old is overdue
+      epoch = db.session.get(TrendingEpoch, 1).started_at.replace(tzinfo=timezone.utc)
+      db.session.execute(db.update(TrendingEpoch).values(started_at=epoch - timedelta(hours=48)))
+      db.session.commit()
+      self.assertEqual(next_decay_in(3600), 0)
+    
+    worker = TrendingDecayWorker(self.app, interval=3600).start()
+    try:
+      deadline = time.monotonic() + 5
+      while self.scores()[1] == before[1] and time.monotonic() < deadline:
+        time.sleep(0.02)
+    finally:
+      worker.stop()
+    self.assertAlmostEqual(self.scores()[1], before[1] / 4, places=3)
+    with self.app.app_context():
+      self.assertGreater(next_decay_in(3600), 3500)
+  
+  
+  def test_archived_comment_loses_its_score(self):
+    self.client.post("/blogs/1/comments", json={"content": "nice"}, headers=self.headers)
+    scored = self.scores()[1]
+    
+    self.client.patch("/blogs/1/comments/1/archive", headers=self.headers)
+    self.assertAlmostEqual(self.scores()[1], 0)
+    self.assertEqual(self.trending(), [])
+    
+    self.client.patch("/blogs/1/comments/1/archive", headers=self.headers)
+    self.assertAlmostEqual(self.scores()[1], scored)
+  
+  
+  def test_archived_blogs_excluded(self):
+    self.client.post("/blogs/1/like", headers=self.headers)
+    self.client.patch("/blogs/1/archive", headers=self.headers)
+    self.assertEqual(self.trending(), [])
+  
+  
+  def test_buffered_likes_scored_on_flush(self):
+    like_buffer = LikeBuffer(self.app, interval=60, max_events=1000)
+    self.app.extensions["like_buffer"] = like_buffer
+    self.client.post("/blogs/2/like", headers=self.headers)
+    self.assertEqual(self.trending(), [])
+    
+    like_buffer.flush()
+    self.assertEqual(self.trending(), [2])
+    
+    self.client.delete("/blogs/2/like", headers=self.headers)
+    like_buffer.flush()
+    self.assertAlmostEqual(self.scores()[2], 0)
+  
+  
+  def test_top_n_read_uses_score_index(self):
+    with self.app.app_context():
+      plan = db.session.execute(text(
+        "EXPLAIN QUERY PLAN SELECT id FROM blogs WHERE is_archived = 0 AND trending_score > 0 "
+        "ORDER BY trending_score DESC, id DESC LIMIT 20"
+      )).all()
+    details = " ".join(row[-1] for row in plan)
+    self.assertIn("ix_blogs_trending", details)
+    self.assertNotIn("TEMP B-TREE", details)
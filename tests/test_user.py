@@ -1,7 +1,7 @@
 import unittest
 from app import create_app
 from app.models import db, User
-from utils.auth import generate_token, hash_password
+from utils.auth import generate_token, hash_password, bcrypt, HashPool
 
 class TestUser(unittest.TestCase):
   
@@ -86,6 +86,34 @@ class TestUser(unittest.TestCase):
     self.assertEqual(response.status_code, 200)
     self.assertEqual(response.json["name"], "tesssst")
     self.assertEqual(response.json["email"], "test1@test.com")
+  
+  
+  def test_rehash_on_login(self):
+    with self.app.app_context():
+      user = db.session.get(User, 1)
+      user.password = bcrypt.generate_password_hash("test", 5).decode("utf-8")
+      db.session.commit()
     
-
-  
\ No newline at end of file
+    response = self.client.post("/users/login", json={"email": "test@test.com", "password": "test"})
+    self.assertEqual(response.status_code, 200)
+    
+    with self.app.app_context():
+      self.assertTrue(db.session.get(User, 1).password.startswith("$2b$04$"))
+  
+  
+  def test_login_without_queue(self):
+    self.app.extensions["hash_pool"] = HashPool(workers=1, max_pending=0)
+    
+    response = self.client.post("/users/login", json={"email": "test@test.com", "password": "test"})
+    self.assertEqual(response.status_code, 200)
+  
+  
+  def test_login_busy(self):
+    hash_pool = HashPool(workers=1, max_pending=0)
+    self.app.extensions["hash_pool"] = hash_pool
+    # The only worker is taken
+    hash_pool.slots.acquire()
+    
+    response = self.client.post("/users/login", json={"email": "test@test.com", "password": "test"})
+    self.assertEqual(response.status_code, 503)
+    self.assertEqual(response.headers["Retry-After"], "1")
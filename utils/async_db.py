@@ -0,0 +1,58 @@
+import asyncio
+from flask import current_app, g, has_request_context
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from app.models import db
+from utils.replica import reading_from_replica
+
+# Async driver for each backend the sync app supports
+ASYNC_DRIVERS = {
+  "sqlite": "sqlite+aiosqlite",
+  "mysql": "mysql+aiomysql",
+  "postgresql": "postgresql+asyncpg",
+}
+# Only sizing options carry over; the sync poolclass can't serve an async engine
+POOL_OPTIONS = ("pool_size", "max_overflow", "pool_timeout", "pool_recycle", "pool_pre_ping")
+
+
+def async_url(url):
+  backend = url.get_backend_name()
+  if backend not in ASYNC_DRIVERS:
+    raise RuntimeError(f"No async driver configured for {backend}")
+  return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+def init_async_db(app):
+  """Async engines on the same databases as db.engine (whose URL Flask-SQLAlchemy has already resolved) and
+  the read replicas. Returns the primary's engine."""
+  with app.app_context():
+    url = async_url(db.engine.url)
+
+  options = app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {})
+  pool_options = {name: options[name] for name in POOL_OPTIONS if name in options}
+  engine = create_async_engine(url, **pool_options)
+  app.extensions["async_db"] = async_sessionmaker(engine, expire_on_commit=False)
+
+  router = app.extensions.get("replica_router")
+  app.extensions["async_replicas"] = {
+    key: async_sessionmaker(create_async_engine(async_url(replica.url), **pool_options), expire_on_commit=False)
+    for key, replica in (router.engines.items() if router is not None else ())
+  }
+  return engine
+
+def async_engines(app):
+  return [app.extensions["async_db"].kw["bind"], *(replica.kw["bind"] for replica in app.extensions["async_replicas"].values())]
+
+async def pin_async_replica():
+  """Pick this request's replica once, as RoutingSession does for the sync app."""
+  if not reading_from_replica() or "db_replica_key" in g:
+    return
+  router = current_app.extensions["replica_router"]
+  # With a lag limit the choice may run a lag query on a sync engine, which must not block the event loop
+  g.db_replica_key = await asyncio.to_thread(router.choose_key) if router.max_lag is not None else router.choose_key()
+
+def async_session():
+  # Same routing as RoutingSession: the pinned replica for GETs, the primary once the request has been sent there
+  key = g.get("db_replica_key") if has_request_context() and reading_from_replica() else None
+  if key is not None:
+    return current_app.extensions["async_replicas"][key]()
+  return current_app.extensions["async_db"]()
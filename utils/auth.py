@@ -1,17 +1,89 @@
 from flask_bcrypt import Bcrypt
 from functools import wraps
+from inspect import iscoroutinefunction
 from jose import jwt
 from datetime import datetime, timedelta, timezone
-from flask import current_app, jsonify, request, g
+from flask import current_app, jsonify, request, g, has_app_context
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import inspect, select
+from sqlalchemy.orm import make_transient_to_detached
+from app.models import db, User
+from utils.cache import SimpleCache
+from utils.async_db import async_session
+import atexit
+import hashlib
+import threading
+import time
 import jose
 
 bcrypt = Bcrypt()
 
+# Functions called with the decoded claims on every authenticated request; returning True rejects the token
+revocation_hooks = []
+
+class HashingBusy(Exception):
+  pass
+
+
+class HashPool:
+  """Caps concurrent bcrypt work: `workers` hashes run at once and up to max_pending more wait for a worker;
+  anything beyond that is refused with HashingBusy. The calling request still waits for its own hash.
+
+  With max_pending=0 nothing queues, so the hash runs inline on the request thread whenever a worker slot is free.
+  """
+  
+  def __init__(self, workers=2, max_pending=8):
+    self.slots = threading.BoundedSemaphore(workers + max_pending)
+    self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt") if max_pending else None
+  
+  def run(self, fn, *args, **kwargs):
+    if not self.slots.acquire(blocking=False):
+      raise HashingBusy()
+    
+    try:
+      if self.executor is None:
+        return fn(*args, **kwargs)
+      return self.executor.submit(fn, *args, **kwargs).result()
+    finally:
+      self.slots.release()
+  
+  def shutdown(self):
+    if self.executor is not None:
+      self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def init_auth(app):
+  bcrypt.init_app(app)
+  hash_pool = HashPool(app.config.get("BCRYPT_WORKERS", 2), app.config.get("BCRYPT_MAX_PENDING", 8))
+  atexit.register(hash_pool.shutdown)
+  app.extensions["hash_pool"] = hash_pool
+  
+  token_cache_size = app.config.get("TOKEN_CACHE_SIZE", 1024)
+  app.extensions["token_cache"] = SimpleCache(token_cache_size) if token_cache_size else None
+  
+  principal_ttl = app.config.get("PRINCIPAL_CACHE_TTL", 0)
+  app.extensions["principal_cache"] = SimpleCache(app.config.get("PRINCIPAL_CACHE_SIZE", 1024), principal_ttl) if principal_ttl else None
+
+def revocation_hook(f):
+  revocation_hooks.append(f)
+  return f
+
+def run_hashing(fn, *args, **kwargs):
+  # Outside a request (scripts, test fixtures) there is no pool to queue on
+  if not has_app_context():
+    return fn(*args, **kwargs)
+  return current_app.extensions["hash_pool"].run(fn, *args, **kwargs)
+
 def hash_password(plain_password: str) -> str:
-  return bcrypt.generate_password_hash(plain_password).decode("utf-8")
+  rounds = current_app.config.get("BCRYPT_LOG_ROUNDS", 12) if has_app_context() else None
+  return run_hashing(bcrypt.generate_password_hash, plain_password, rounds).decode("utf-8")
 
 def check_password(plain_password: str, hashed_password: str) -> bool:
-  return bcrypt.check_password_hash(hashed_password, plain_password)
+  return run_hashing(bcrypt.check_password_hash, hashed_password, plain_password)
+
+def needs_rehash(hashed_password: str) -> bool:
+  # bcrypt hashes look like $2b$<cost>$<salt+hash>
+  return int(hashed_password.split("$")[2]) != current_app.config.get("BCRYPT_LOG_ROUNDS", 12)
 
 def generate_token(user_id):
   payload = {
@@ -22,30 +94,110 @@ def generate_token(user_id):
   token = jwt.encode(payload, current_app.config["SECRET_KEY"], algorithm="HS256")
   return token
 
+def decode_token(token):
+  token_cache = current_app.extensions.get("token_cache")
+  if token_cache is None:
+    return jwt.decode(token, current_app.config["SECRET_KEY"], algorithms=["HS256"])
+  
+  digest = hashlib.sha256(token.encode("utf-8")).hexdigest()
+  claims = token_cache.get(digest)
+  if claims is not None and claims["exp"] > time.time():
+    return claims
+  
+  claims = jwt.decode(token, current_app.config["SECRET_KEY"], algorithms=["HS256"])
+  # Entries live exactly until the token expires
+  token_cache.set(digest, claims, timeout=claims["exp"] - time.time())
+  return claims
+
+def load_user(user_id):
+  user = db.session.get(User, user_id)
+  # A soft-deleted user's tokens stay valid until they expire but no longer resolve to a user
+  return user if user is not None and user.deleted_at is None else None
+
+def get_current_user():
+  principal_cache = current_app.extensions.get("principal_cache")
+  if principal_cache is None:
+    return load_user(g.user_id)
+  
+  cached_user = principal_cache.get(g.user_id)
+  if cached_user is not None:
+    # Re-attach the detached snapshot without a SELECT
+    return db.session.merge(cached_user, load=False)
+  
+  user = load_user(g.user_id)
+  if user is not None:
+    snapshot = User(**{attr.key: attr.value for attr in inspect(user).attrs if attr.key in User.__table__.columns})
+    make_transient_to_detached(snapshot)
+    principal_cache.set(g.user_id, snapshot)
+  return user
+
+def forget_principal(user_id):
+  principal_cache = current_app.extensions.get("principal_cache")
+  if principal_cache is not None:
+    principal_cache.delete(user_id)
+
+def read_token():
+  """Decode the bearer token onto g.user_id. Returns an error response, or None if the token is good."""
+  token = None
+  
+  if "Authorization" in request.headers:
+    auth_header = request.headers["Authorization"]
+    parts = auth_header.split(" ")
+    if len(parts) == 2 and parts[0] == "Bearer":
+      token = parts[1]
+  
+  if not token:
+    return jsonify({"message": "Token is missing"}), 401
+  
+  try:
+    data = decode_token(token)
+    if any(hook(data) for hook in revocation_hooks):
+      return jsonify({"message": "Token has been revoked"}), 401
+    
+    g.user_id = int(data["sub"])
+  
+  except jose.exceptions.ExpiredSignatureError:
+    return jsonify({"message": "Token has expired"}), 401
+  
+  except jose.exceptions.JWTError:
+    return jsonify({"message": "Invalid token!"}), 401
+  return None
+
+def token_user_id():
+  """The user id of a valid bearer token, or None. For public routes that show the owner a little more."""
+  return g.user_id if read_token() is None else None
+
+def optional_user_id():
+  """token_user_id(), provided the user still exists."""
+  user_id = token_user_id()
+  return user_id if user_id is not None and get_current_user() is not None else None
+
+async def live_user_async(user_id):
+  principal_cache = current_app.extensions.get("principal_cache")
+  if principal_cache is not None and principal_cache.get(user_id) is not None:
+    return True
+  async with async_session() as session:
+    return await session.scalar(select(User.id).where(User.id == user_id, User.deleted_at.is_(None))) is not None
+
 def token_required(f):
+  # A deleted user's tokens are still signed until they expire, so every authenticated route also checks the user is live
+  if iscoroutinefunction(f):
+    @wraps(f)
+    async def decorated_async(*args, **kwargs):
+      error = read_token()
+      if error is None and not await live_user_async(g.user_id):
+        error = jsonify({"message": "User not found"}), 401
+      if error is not None:
+        return error
+      return await f(*args, **kwargs)
+    return decorated_async
+  
   @wraps(f)
   def decorated(*args, **kwargs):
-    token = None
-    
-    if "Authorization" in request.headers:
-      auth_header = request.headers["Authorization"]
-      parts = auth_header.split(" ")
-      if len(parts) == 2 and parts[0] == "Bearer":
-        token = parts[1]
-    
-    if not token:
-      return jsonify({"message": "Token is missing"}), 401
-    
-    try:
-      data = jwt.decode(token, current_app.config["SECRET_KEY"], algorithms=["HS256"])
-      user_id = int(data["sub"])
-      g.user_id = user_id
-    
-    except jose.exceptions.ExpiredSignatureError:
-      return jsonify({"message": "Token has expired"}), 401
-    
-    except jose.exceptions.JWTError:
-      return jsonify({"message": "Invalid token!"}), 401
-    
+    error = read_token()
+    if error is None and get_current_user() is None:
+      error = jsonify({"message": "User not found"}), 401
+    if error is not None:
+      return error
     return f(*args, **kwargs)
   return decorated
\ No newline at end of file
@@ -0,0 +1,72 @@
+from sqlalchemy import insert
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.exc import IntegrityError, DataError
+from app.models import db
+
+
+class RowRejected(Exception):
+  """Raised from on_inserted to roll back a row the database took but the caller can't keep."""
+
+  def __init__(self, message, status=400):
+    super().__init__(message)
+    self.status = status
+
+
+def chunked(items, size):
+  for start in range(0, len(items), size):
+    yield items[start:start + size]
+
+def insert_ignore(model, index_elements):
+  """INSERT that skips rows clashing with the unique key on index_elements instead of raising."""
+  dialect = db.session.get_bind().dialect.name
+  if dialect == "sqlite":
+    return sqlite.insert(model).on_conflict_do_nothing(index_elements=index_elements)
+  if dialect == "postgresql":
+    return postgresql.insert(model).on_conflict_do_nothing(index_elements=index_elements)
+  if dialect == "mysql":
+    return mysql.insert(model).prefix_with("IGNORE")
+  return insert(model)
+
+def bulk_insert(model, rows):
+  """Insert rows in a single executemany and return their new ids in input order."""
+  if db.session.get_bind().dialect.insert_executemany_returning_sort_by_parameter_order:
+    return db.session.scalars(insert(model).returning(model.id, sort_by_parameter_order=True), rows).all()
+
+  # MySQL can't return ids from an executemany; let the unit of work fetch them
+  objs = [model(**row) for row in rows]
+  db.session.add_all(objs)
+  db.session.flush()
+  return [obj.id for obj in objs]
+
+def insert_in_chunks(model, rows, chunk_size, on_inserted=None):
+  """Insert rows one transaction per chunk. on_inserted(rows, ids) runs inside each transaction.
+
+  A chunk that hits a bad row is retried row by row so one failure doesn't sink its neighbours.
+  Returns a (id, error) pair for every row; error is a message, or the RowRejected on_inserted raised.
+  """
+  results = []
+  for chunk in chunked(rows, chunk_size):
+    try:
+      ids = bulk_insert(model, chunk)
+      if on_inserted:
+        on_inserted(chunk, ids)
+      db.session.commit()
+      results.extend((row_id, None) for row_id in ids)
+      continue
+    except (IntegrityError, DataError, RowRejected):
+      db.session.rollback()
+
+    for row in chunk:
+      try:
+        ids = bulk_insert(model, [row])
+        if on_inserted:
+          on_inserted([row], ids)
+        db.session.commit()
+        results.append((ids[0], None))
+      except (IntegrityError, DataError) as e:
+        db.session.rollback()
+        results.append((None, str(e.orig)))
+      except RowRejected as e:
+        db.session.rollback()
+        results.append((None, e))
+  return results
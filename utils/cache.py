@@ -0,0 +1,240 @@
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import urlencode
+from flask import current_app, request
+from utils.replica import replicas_enabled, read_from_primary
+
+# Bumped by clear(); part of every key so one increment drops the whole cache
+GLOBAL_NAMESPACE = "*"
+# Validators are cached with the body so conditional GETs can be answered on a hit
+CACHED_HEADERS = ("ETag", "Last-Modified")
+
+
+def pack_response(response):
+  headers = {name: response.headers[name] for name in CACHED_HEADERS if name in response.headers}
+  return json.dumps(headers).encode("utf-8") + b"\n" + response.get_data()
+
+def unpack_response(value):
+  headers, _, body = value.partition(b"\n")
+  return json.loads(headers), body
+
+
+class NullCache:
+  def get(self, key):
+    return None
+
+  def set(self, key, value, timeout=None):
+    pass
+
+  def get_versions(self, namespaces):
+    return [0 for _ in namespaces]
+
+  def incr_versions(self, namespaces):
+    pass
+
+
+class SimpleCache:
+  """In-process LRU cache with a per-entry TTL. Versions are kept outside the LRU so they are never evicted."""
+
+  def __init__(self, threshold=500, default_timeout=300):
+    self.threshold = threshold
+    self.default_timeout = default_timeout
+    self._entries = OrderedDict()
+    self._versions = {}
+    self._lock = threading.Lock()
+
+  def get(self, key):
+    with self._lock:
+      item = self._entries.get(key)
+      if item is None:
+        return None
+
+      expires_at, value = item
+      if expires_at <= time.monotonic():
+        del self._entries[key]
+        return None
+
+      self._entries.move_to_end(key)
+      return value
+
+  def set(self, key, value, timeout=None):
+    timeout = self.default_timeout if timeout is None else timeout
+    with self._lock:
+      self._entries[key] = (time.monotonic() + timeout, value)
+      self._entries.move_to_end(key)
+      while len(self._entries) > self.threshold:
+        self._entries.popitem(last=False)
+
+  def delete(self, key):
+    with self._lock:
+      self._entries.pop(key, None)
+
+  def get_versions(self, namespaces):
+    with self._lock:
+      return [self._versions.get(namespace, 0) for namespace in namespaces]
+
+  def incr_versions(self, namespaces):
+    with self._lock:
+      for namespace in namespaces:
+        self._versions[namespace] = self._versions.get(namespace, 0) + 1
+
+
+class RedisCache:
+  """Works with any client exposing get/set(ex=)/mget/incr, e.g. redis.Redis."""
+
+  # Every call is a network round trip; async views make them off the event loop
+  blocking = True
+
+  def __init__(self, client, default_timeout=300, key_prefix="blog_api:"):
+    self.client = client
+    self.default_timeout = default_timeout
+    self.key_prefix = key_prefix
+
+  @classmethod
+  def from_url(cls, url, **kwargs):
+    try:
+      import redis
+    except ImportError:
+      raise RuntimeError("CACHE_TYPE = 'RedisCache' requires the redis package (pip install redis)")
+
+    return cls(redis.Redis.from_url(url), **kwargs)
+
+  def get(self, key):
+    return self.client.get(self.key_prefix + key)
+
+  def set(self, key, value, timeout=None):
+    timeout = self.default_timeout if timeout is None else timeout
+    self.client.set(self.key_prefix + key, value, ex=timeout)
+
+  def get_versions(self, namespaces):
+    values = self.client.mget([f"{self.key_prefix}version:{namespace}" for namespace in namespaces])
+    return [int(value) if value is not None else 0 for value in values]
+
+  def incr_versions(self, namespaces):
+    for namespace in namespaces:
+      self.client.incr(f"{self.key_prefix}version:{namespace}")
+
+
+class ResponseCache:
+  def __init__(self, app=None):
+    if app is not None:
+      self.init_app(app)
+
+  def init_app(self, app):
+    cache_type = app.config.get("CACHE_TYPE", "NullCache")
+    timeout = app.config.get("CACHE_DEFAULT_TIMEOUT", 300)
+
+    if cache_type == "SimpleCache":
+      if app.config.get("CACHE_WORKERS", 1) > 1:
+        # Each worker would invalidate only its own copy and keep serving stale pages from the others
+        raise ValueError("CACHE_TYPE = 'SimpleCache' is per process; use RedisCache when running more than one worker")
+      backend = SimpleCache(app.config.get("CACHE_THRESHOLD", 500), timeout)
+    elif cache_type == "RedisCache":
+      backend = RedisCache.from_url(
+        app.config["CACHE_REDIS_URL"],
+        default_timeout=timeout,
+        key_prefix=app.config.get("CACHE_KEY_PREFIX", "blog_api:")
+      )
+    elif cache_type == "NullCache":
+      backend = NullCache()
+    else:
+      raise ValueError(f"Unknown CACHE_TYPE: {cache_type}")
+
+    app.extensions["cache"] = backend
+
+  @property
+  def backend(self):
+    return current_app.extensions["cache"]
+
+  def cache_key(self, namespaces):
+    depends_on = [GLOBAL_NAMESPACE, *namespaces]
+    versions = self.backend.get_versions(depends_on)
+    query = urlencode(sorted(request.args.items(multi=True)))
+    return f"view:{request.path}?{query}:" + ".".join(str(version) for version in versions)
+
+  def lookup(self, key):
+    value = self.backend.get(key)
+    if value is None:
+      return None
+
+    headers, body = unpack_response(value)
+    response = current_app.response_class(body, status=200, headers=headers, mimetype="application/json")
+    response.headers["X-Cache"] = "HIT"
+    return response.make_conditional(request)
+
+  def store(self, key, response):
+    self.backend.set(key, pack_response(response))
+    response.headers["X-Cache"] = "MISS"
+
+  def cached(self, namespaces, unless=None):
+    """Cache 200 responses of a GET view. namespaces(**view_kwargs) lists the data the view depends on.
+    unless() returning True skips the cache for this request, e.g. when the answer depends on who asks."""
+    def decorator(f):
+      @wraps(f)
+      def decorated(*args, **kwargs):
+        if unless is not None and unless():
+          return f(*args, **kwargs)
+        depends_on = namespaces(**kwargs)
+        key = self.cache_key(depends_on)
+        response = self.lookup(key)
+        if response is not None:
+          return response
+
+        if self.recently_invalidated(depends_on):
+          read_from_primary()
+        response = current_app.make_response(f(*args, **kwargs))
+        if response.status_code == 200:
+          self.store(key, response)
+        return response
+      return decorated
+    return decorator
+
+  def cached_async(self, namespaces, unless=None):
+    """cached() for async views. Without a cheap validator query in front, the ETag is a hash of the body."""
+    def decorator(f):
+      @wraps(f)
+      async def decorated(*args, **kwargs):
+        if unless is not None and unless():
+          return await f(*args, **kwargs)
+        depends_on = namespaces(**kwargs)
+        key = await self.off_loop(self.cache_key, depends_on)
+        response = await self.off_loop(self.lookup, key)
+        if response is not None:
+          return response
+
+        if await self.off_loop(self.recently_invalidated, depends_on):
+          read_from_primary()
+        response = current_app.make_response(await f(*args, **kwargs))
+        if response.status_code == 200:
+          response.add_etag()
+          await self.off_loop(self.store, key, response)
+          response.make_conditional(request)
+        return response
+      return decorated
+    return decorator
+
+  async def off_loop(self, fn, *args):
+    # In-memory backends answer at once; a networked one would stall every request sharing the event loop
+    if getattr(self.backend, "blocking", False):
+      return await asyncio.to_thread(fn, *args)
+    return fn(*args)
+
+  def invalidate(self, *namespaces):
+    self.backend.incr_versions(namespaces)
+    window = current_app.config.get("REPLICA_INVALIDATION_WINDOW", 0)
+    if window and replicas_enabled():
+      # Replicas may not have the write yet: until they catch up, misses under the new version are filled from the primary
+      for namespace in namespaces:
+        self.backend.set(f"written:{namespace}", b"1", timeout=window)
+
+  def recently_invalidated(self, namespaces):
+    if not replicas_enabled():
+      return False
+    return any(self.backend.get(f"written:{namespace}") is not None for namespace in (GLOBAL_NAMESPACE, *namespaces))
+
+  def clear(self):
+    self.invalidate(GLOBAL_NAMESPACE)
@@ -0,0 +1,133 @@
+import time
+import zlib
+from flask import request
+from utils.metrics import current_stats
+
+COMPRESSIBLE_MIMETYPES = {
+  "application/json", "application/x-ndjson", "application/javascript", "application/x-yaml",
+  "text/html", "text/plain", "text/css", "text/javascript", "text/yaml",
+}
+
+
+class GzipCodec:
+  name = "gzip"
+
+  def compress(self, data, level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+  def stream(self, chunks, level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+      # Sync-flush each chunk so streamed rows reach the client as they are produced
+      yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+class BrotliCodec:
+  name = "br"
+
+  def __init__(self, brotli):
+    self.brotli = brotli
+
+  def compress(self, data, level):
+    return self.brotli.compress(data, quality=level)
+
+  def stream(self, chunks, level):
+    compressor = self.brotli.Compressor(quality=level)
+    for chunk in chunks:
+      yield compressor.process(chunk) + compressor.flush()
+    yield compressor.finish()
+
+
+class ZstdCodec:
+  name = "zstd"
+
+  def __init__(self, zstandard):
+    self.zstandard = zstandard
+
+  def compress(self, data, level):
+    return self.zstandard.ZstdCompressor(level=level).compress(data)
+
+  def stream(self, chunks, level):
+    compressor = self.zstandard.ZstdCompressor(level=level).compressobj()
+    for chunk in chunks:
+      yield compressor.compress(chunk) + compressor.flush(self.zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+    yield compressor.flush()
+
+
+def available_codecs():
+  """gzip always; br and zstd when the brotli / zstandard packages are installed."""
+  codecs = {"gzip": GzipCodec()}
+  try:
+    import brotli
+    codecs["br"] = BrotliCodec(brotli)
+  except ImportError:
+    pass
+  try:
+    import zstandard
+    codecs["zstd"] = ZstdCodec(zstandard)
+  except ImportError:
+    pass
+  return codecs
+
+
+class Compressor:
+  def __init__(self, algorithms, levels, min_size):
+    codecs = available_codecs()
+    # Server preference order, used to break ties between encodings the client rates equally
+    self.codecs = [codecs[name] for name in algorithms if name in codecs]
+    self.levels = levels
+    self.min_size = min_size
+
+  def negotiate(self):
+    best = request.accept_encodings.best_match([codec.name for codec in self.codecs])
+    return next((codec for codec in self.codecs if codec.name == best), None)
+
+  def compress_response(self, response):
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+      return response
+
+    response.vary.add("Accept-Encoding")
+    if (response.status_code < 200 or response.status_code in (204, 206, 304)
+        or "Content-Encoding" in response.headers or response.direct_passthrough):
+      return response
+
+    codec = self.negotiate()
+    if codec is None:
+      return response
+
+    level = self.levels.get(codec.name)
+    if response.is_streamed:
+      response.response = codec.stream(response.iter_encoded(), level)
+      response.headers.pop("Content-Length", None)
+    else:
+      data = response.get_data()
+      if len(data) < self.min_size:
+        return response
+
+      start = time.perf_counter()
+      compressed = codec.compress(data, level)
+      stats = current_stats()
+      if stats is not None:
+        stats.record_compression(codec.name, len(data) - len(compressed), time.perf_counter() - start)
+      response.set_data(compressed)
+
+    response.headers["Content-Encoding"] = codec.name
+    # The bytes differ from the identity variant, so only a weak validator still holds
+    etag, weak = response.get_etag()
+    if etag and not weak:
+      response.set_etag(etag, weak=True)
+    return response
+
+
+def init_compression(app):
+  if not app.config.get("COMPRESS_ENABLED", True):
+    return
+
+  compressor = app.extensions["compressor"] = Compressor(
+    app.config.get("COMPRESS_ALGORITHMS", ("zstd", "br", "gzip")),
+    app.config.get("COMPRESS_LEVELS", {"gzip": 6, "br": 4, "zstd": 3}),
+    app.config.get("COMPRESS_MIN_SIZE", 1024)
+  )
+  app.after_request(compressor.compress_response)
@@ -0,0 +1,36 @@
+import hashlib
+from functools import wraps
+from flask import current_app, request
+from werkzeug.http import is_resource_modified
+
+
+def make_etag(parts):
+  return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+
+def conditional(validator):
+  """Answer If-None-Match before the view runs. Only strong ETags are supported; If-Modified-Since is ignored.
+
+  validator(**view_kwargs) returns the etag parts from a cheap query,
+  or None to let the view handle the request (e.g. to return a 404).
+  """
+  def decorator(f):
+    @wraps(f)
+    def decorated(*args, **kwargs):
+      etag_parts = validator(**kwargs)
+      if etag_parts is None:
+        return f(*args, **kwargs)
+
+      # ?fields= picks a different representation of the same rows, so it is part of the validator
+      etag = make_etag((etag_parts, request.args.get("fields")))
+
+      if not is_resource_modified(request.environ, etag=etag):
+        response = current_app.response_class(status=304)
+      else:
+        response = current_app.make_response(f(*args, **kwargs))
+        if response.status_code != 200:
+          return response
+
+      response.set_etag(etag)
+      return response
+    return decorated
+  return decorator
@@ -0,0 +1,140 @@
+from flask import current_app
+from sqlalchemy import select, delete, update, union, literal, false, and_, or_, func
+from app.models import db, User, Blog, Follow, TimelineEntry
+from utils.bulk import insert_ignore
+from utils.pagination import keyset_query, split_page
+
+# Home feeds are fan-out on write: a new blog is copied into every follower's bounded timeline, so a feed page
+# is one (user_id, created_at, blog_id) index range. Authors with more than FEED_FANOUT_MAX_FOLLOWERS followers
+# would make every post a huge write, so theirs are pulled from ix_blogs_author_pulled at read time instead.
+# Push or pull is decided per post when it is created and recorded in Blog.fanned_out, so a post stays in its
+# branch when the author's follower count later crosses the limit in either direction.
+
+
+def fanout_limit():
+  return current_app.config.get("FEED_FANOUT_MAX_FOLLOWERS", 10000)
+
+
+def follow(follower_id, followee_id):
+  """True if a new follow was recorded. The caller commits."""
+  inserted = db.session.execute(
+    insert_ignore(Follow, ["follower_id", "followee_id"]).values(follower_id=follower_id, followee_id=followee_id)
+  ).rowcount == 1
+  if inserted:
+    bump_follower_count(followee_id, 1)
+    backfill(follower_id, followee_id)
+  return inserted
+
+def unfollow(follower_id, followee_id):
+  """True if a follow was removed. The caller commits."""
+  removed = db.session.execute(
+    delete(Follow)
+    .where(Follow.follower_id == follower_id, Follow.followee_id == followee_id)
+    .execution_options(synchronize_session=False)
+  ).rowcount == 1
+  if removed:
+    bump_follower_count(followee_id, -1)
+    db.session.execute(
+      delete(TimelineEntry)
+      .where(
+        TimelineEntry.user_id == follower_id,
+        TimelineEntry.blog_id.in_(select(Blog.id).where(Blog.author_id == followee_id))
+      )
+      .execution_options(synchronize_session=False)
+    )
+  return removed
+
+def bump_follower_count(user_id, amount):
+  db.session.execute(
+    update(User)
+    .where(User.id == user_id)
+    .values({User.follower_count: User.follower_count + amount})
+    .execution_options(synchronize_session=False)
+  )
+
+
+def pushes(author):
+  """Whether a post by author created now is pushed; stored on the blog as fanned_out."""
+  return author.follower_count <= fanout_limit()
+
+def fan_out(blog_ids):
+  """Push the new blogs marked fanned_out into their authors' followers' timelines with one INSERT ... SELECT."""
+  if not blog_ids:
+    return
+  db.session.execute(
+    insert_ignore(TimelineEntry, ["user_id", "blog_id"]).from_select(
+      ["user_id", "blog_id", "created_at"],
+      select(Follow.follower_id, Blog.id, Blog.created_at)
+      .join(Follow, Follow.followee_id == Blog.author_id)
+      .where(Blog.id.in_(blog_ids), Blog.fanned_out.is_(True))
+    )
+  )
+
+def backfill(follower_id, followee_id):
+  """Seed a new follow with the followee's latest posts so the feed isn't empty until they post again."""
+  posts = current_app.config.get("FEED_BACKFILL_POSTS", 20)
+  db.session.execute(
+    insert_ignore(TimelineEntry, ["user_id", "blog_id"]).from_select(
+      ["user_id", "blog_id", "created_at"],
+      select(literal(follower_id).label("user_id"), Blog.id, Blog.created_at)
+      .where(Blog.author_id == followee_id, Blog.fanned_out.is_(True), Blog.is_archived == false(), Blog.deleted_at.is_(None))
+      .order_by(Blog.created_at.desc(), Blog.id.desc())
+      .limit(posts)
+    )
+  )
+
+
+def feed_query(user_id, limit, cursor=None):
+  """(id, created_at) of the next feed page: the pushed timeline merged with posts pulled from high-follower authors."""
+  pushed = keyset_query(
+    select(TimelineEntry.blog_id.label("id"), TimelineEntry.created_at).where(TimelineEntry.user_id == user_id),
+    None, limit, cursor, keys=(TimelineEntry.created_at, TimelineEntry.blog_id)
+  )
+  pulled = keyset_query(
+    select(Blog.id, Blog.created_at)
+    .join(Follow, Follow.followee_id == Blog.author_id)
+    .where(Follow.follower_id == user_id, Blog.fanned_out.is_(False), Blog.is_archived == false(), Blog.deleted_at.is_(None)),
+    Blog, limit, cursor
+  )
+  # UNION rather than UNION ALL: the two branches are disjoint by fanned_out, but keep duplicates out regardless
+  merged = union(select(pushed.subquery()), select(pulled.subquery())).subquery()
+  return keyset_query(select(merged.c.id, merged.c.created_at), None, limit, keys=(merged.c.created_at, merged.c.id))
+
+def feed_page(user_id, limit, cursor, hydrate):
+  """Returns (rows, next_cursor). hydrate is a blog column SELECT run once for the whole page; archived blogs are dropped."""
+  ranked, next_cursor = split_page(db.session.execute(feed_query(user_id, limit, cursor)).all(), limit)
+  if not ranked:
+    return [], next_cursor
+
+  ids = [row.id for row in ranked]
+  rows = {row.id: row for row in db.session.execute(
+    hydrate.where(Blog.id.in_(ids), Blog.is_archived == false(), Blog.deleted_at.is_(None))
+  )}
+  return [rows[blog_id] for blog_id in ids if blog_id in rows], next_cursor
+
+
+def trim_timeline(user_id, length):
+  """Drop everything past the newest length entries of one user's timeline. Returns the number removed."""
+  boundary = db.session.execute(
+    select(TimelineEntry.created_at, TimelineEntry.blog_id)
+    .where(TimelineEntry.user_id == user_id)
+    .order_by(TimelineEntry.created_at.desc(), TimelineEntry.blog_id.desc())
+    .offset(length - 1)
+    .limit(1)
+  ).first()
+  if boundary is None:
+    return 0
+
+  return db.session.execute(
+    delete(TimelineEntry)
+    .where(TimelineEntry.user_id == user_id, or_(
+      TimelineEntry.created_at < boundary.created_at,
+      and_(TimelineEntry.created_at == boundary.created_at, TimelineEntry.blog_id < boundary.blog_id)
+    ))
+    .execution_options(synchronize_session=False)
+  ).rowcount
+
+def overlong_timelines(length):
+  return db.session.scalars(
+    select(TimelineEntry.user_id).group_by(TimelineEntry.user_id).having(func.count() > length)
+  ).all()
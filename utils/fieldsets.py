@@ -0,0 +1,95 @@
+from operator import itemgetter
+from flask import request
+from sqlalchemy import select
+
+EXCERPT_LENGTH = 200
+
+
+class FieldsError(ValueError):
+  pass
+
+
+def get_fields(allowed, default):
+  """Parse ?fields=a,b,c against the allowed field names. Fields come back in the order of allowed."""
+  raw = request.args.get("fields")
+  if raw is None:
+    return default
+
+  requested = {name.strip() for name in raw.split(",") if name.strip()}
+  if not requested:
+    raise FieldsError("fields must name at least one field")
+
+  unknown = requested.difference(allowed)
+  if unknown:
+    raise FieldsError(f"Unknown fields: {', '.join(sorted(unknown))}. Choose from: {', '.join(allowed)}")
+  return tuple(name for name in allowed if name in requested)
+
+
+def make_excerpt(text, length=EXCERPT_LENGTH):
+  """Cut text to at most length characters, at a word boundary when there is one, and mark the cut."""
+  if text is None or len(text) <= length:
+    return text
+
+  cut = text[:length]
+  space = cut.rfind(" ")
+  if space > length // 2:
+    cut = cut[:space]
+  return cut.rstrip() + "…"
+
+def isoformat(value):
+  return value.isoformat() if value is not None else None
+
+
+class RowSerializer:
+  """Builds response dicts straight from column rows, selecting only the columns the requested fields need.
+
+  fields maps each output field to (columns, convert); convert(*column_values) makes the output value, or is
+  None to pass a single column through. key_columns are always selected (e.g. for keyset cursors), and a
+  field listed in joined needs the join applied by join(stmt).
+  """
+
+  def __init__(self, key_columns, fields, default_fields, join=None, joined=()):
+    self.key_columns = key_columns
+    self.fields = fields
+    self.names = tuple(fields)
+    self.default_fields = default_fields
+    self.join = join
+    self.joined = set(joined)
+
+  def requested_fields(self):
+    return get_fields(self.names, self.default_fields)
+
+  def columns(self, fields):
+    columns = list(self.key_columns)
+    for name in fields:
+      for column in self.fields[name][0]:
+        if not any(column is selected for selected in columns):
+          columns.append(column)
+    return columns
+
+  def select(self, fields=None):
+    fields = fields or self.default_fields
+    stmt = select(*self.columns(fields))
+    if self.join is not None and self.joined.intersection(fields):
+      stmt = self.join(stmt)
+    return stmt
+
+  def serialize(self, rows, fields=None):
+    fields = fields or self.default_fields
+    columns = self.columns(fields)
+    plan = []
+    for name in fields:
+      field_columns, convert = self.fields[name]
+      indexes = [next(i for i, selected in enumerate(columns) if selected is column) for column in field_columns]
+      plan.append((name, getter(indexes, convert)))
+    return [{name: get(row) for name, get in plan} for row in rows]
+
+
+def getter(indexes, convert):
+  if convert is None:
+    return itemgetter(indexes[0])
+  if len(indexes) == 1:
+    index = indexes[0]
+    return lambda row: convert(row[index])
+  values = itemgetter(*indexes)
+  return lambda row: convert(*values(row))
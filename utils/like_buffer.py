@@ -0,0 +1,212 @@
+import atexit
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from flask import current_app, has_app_context
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from app.models import db, Blog, User
+from app.extenstions import cache
+from utils.likes import insert_like, delete_like
+from utils.trending import epoch_for, event_score, like_weight, read_epoch
+
+
+class OrphanedLikes(Exception):
+  """A buffered like's post was soft-deleted before the batch reached it."""
+
+
+class LikeBuffer:
+  """Coalesces like/unlike intents per (user_id, post_id) and writes them in one transaction per flush.
+
+  Only the net change is kept: liking then unliking before a flush leaves nothing to write.
+  """
+
+  def __init__(self, app, interval=0.5, max_events=500):
+    self.app = app
+    self.interval = interval
+    self.max_events = max_events
+    # (user_id, post_id) -> (liked after the pending intents, liked in the database)
+    self._pending = {}
+    # The batch being written; still counted by delta()/pending() until its transaction commits
+    self._inflight = {}
+    # post_id -> net like_count change of everything pending or in flight
+    self._deltas = Counter()
+    self._events = 0
+    self._lock = threading.Lock()
+    self._wake = threading.Event()
+    self._stopped = threading.Event()
+    self._thread = None
+
+  def start(self):
+    self._thread = threading.Thread(target=self._run, name="like-buffer-flusher", daemon=True)
+    self._thread.start()
+    atexit.register(self.stop)
+    return self
+
+  def stop(self):
+    if self._thread is not None and not self._stopped.is_set():
+      self._stopped.set()
+      self._wake.set()
+      self._thread.join()
+    self.flush()
+
+  def _run(self):
+    while not self._stopped.is_set():
+      self._wake.wait(self.interval)
+      self._wake.clear()
+      try:
+        self.flush()
+      except Exception:
+        self.app.logger.exception("Flushing buffered likes failed")
+
+  def apply(self, user_id, post_id, persisted_state, liked=None):
+    """Record an intent; liked=None toggles. persisted_state() reads the database only when the key
+    isn't already buffered. Returns (liked before, liked after)."""
+    key = (user_id, post_id)
+    with self._lock:
+      entry = self._entry(key)
+    persisted = entry[1] if entry else persisted_state()
+
+    with self._lock:
+      entry = self._entry(key)
+      current, persisted = entry if entry else (persisted, persisted)
+      new = (not current) if liked is None else liked
+
+      self._shift(post_id, -self._weight(self._pending.pop(key, None)))
+      if new != persisted:
+        self._pending[key] = (new, persisted)
+        self._shift(post_id, self._weight(self._pending[key]))
+
+      self._events += 1
+      if self._events >= self.max_events:
+        self._wake.set()
+    return current, new
+
+  def _entry(self, key):
+    # A key that is being flushed reads as already written, so intents made during a flush layer on top of it
+    if key in self._pending:
+      return self._pending[key]
+    if key in self._inflight:
+      liked = self._inflight[key][0]
+      return liked, liked
+    return None
+
+  def _shift(self, post_id, amount):
+    self._deltas[post_id] += amount
+    if not self._deltas[post_id]:
+      del self._deltas[post_id]
+
+  @staticmethod
+  def _weight(entry):
+    # Buffered entries always differ from what is persisted, so each one is a single like or unlike
+    return 0 if entry is None else (1 if entry[0] else -1)
+
+  def delta(self, post_id):
+    """Pending like_count change for a post, counting intents still being flushed."""
+    with self._lock:
+      return self._deltas.get(post_id, 0)
+
+  def pending(self, user_id, post_ids):
+    """Buffered, not yet committed like state of one user's posts: {post_id: liked}."""
+    with self._lock:
+      return {post_id: entry[0] for post_id in post_ids if (entry := self._entry((user_id, post_id)))}
+
+  def flush(self):
+    with self._lock:
+      if self._inflight:
+        # Another thread (the flusher, or stop()) is mid-flush
+        return 0
+      batch, self._pending, self._events = self._pending, {}, 0
+      self._inflight = batch
+    if not batch:
+      return 0
+
+    with self.app.app_context():
+      try:
+        try:
+          changes = self._write(batch)
+        except (IntegrityError, OrphanedLikes):
+          # A post or user was deleted while its likes were buffered; drop just those intents and write the rest
+          db.session.rollback()
+          dropped = self._orphaned(batch)
+          self.app.logger.warning("Dropping %d buffered likes of purged posts or users", len(dropped))
+          changes = self._write({key: value for key, value in batch.items() if key not in dropped})
+
+      except Exception:
+        db.session.rollback()
+        with self._lock:
+          self._settle(batch)
+          # Put the batch back under any newer intents for the same key
+          for key, value in batch.items():
+            newer = self._pending.pop(key, None)
+            self._shift(key[1], -self._weight(newer))
+            merged = (newer[0] if newer else value[0], value[1])
+            if merged[0] != merged[1]:
+              self._pending[key] = merged
+              self._shift(key[1], self._weight(merged))
+        raise
+
+      with self._lock:
+        self._settle(batch)
+      cache.invalidate("blogs", *(f"blog:{post_id}" for post_id in changes))
+    return len(batch)
+
+  def _settle(self, batch):
+    # The batch is no longer in flight: committed, or about to be merged back into _pending
+    for (_, post_id), entry in batch.items():
+      self._shift(post_id, -self._weight(entry))
+    self._inflight = {}
+
+  def _write(self, batch):
+    """Write one batch in a single transaction. Returns the like_count change per post."""
+    changes, scores = Counter(), Counter()
+    epoch, weight, now = read_epoch(), like_weight(), datetime.now(timezone.utc)
+    for (user_id, post_id), (liked, _) in batch.items():
+      if liked:
+        if insert_like(user_id, post_id, now):
+          changes[post_id] += 1
+          scores[post_id] += event_score(weight, now, epoch_for(epoch, post_id))
+      else:
+        created_at = delete_like(user_id, post_id)
+        if created_at is not None:
+          changes[post_id] -= 1
+          scores[post_id] -= event_score(weight, created_at, epoch_for(epoch, post_id))
+
+    for post_id, amount in changes.items():
+      updated = db.session.execute(
+        update(Blog)
+        .where(Blog.id == post_id, Blog.deleted_at.is_(None))
+        .values({
+          Blog.like_count: Blog.like_count + amount,
+          Blog.trending_score: Blog.trending_score + scores[post_id],
+          Blog.updated_at: Blog.updated_at
+        })
+      ).rowcount
+      # Its purge may already have swept the likes; anything written now would outlive the blog
+      if not updated:
+        raise OrphanedLikes(post_id)
+    db.session.commit()
+    return changes
+
+  def _orphaned(self, batch):
+    post_ids = {post_id for _, post_id in batch}
+    user_ids = {user_id for user_id, _ in batch}
+    live_posts = set(db.session.scalars(select(Blog.id).where(Blog.id.in_(post_ids), Blog.deleted_at.is_(None))))
+    live_users = set(db.session.scalars(select(User.id).where(User.id.in_(user_ids), User.deleted_at.is_(None))))
+    return {key for key in batch if key[0] not in live_users or key[1] not in live_posts}
+
+
+def init_like_buffer(app):
+  if not app.config.get("LIKE_BUFFER_ENABLED", False):
+    app.extensions["like_buffer"] = None
+    return
+
+  app.extensions["like_buffer"] = LikeBuffer(
+    app,
+    interval=app.config.get("LIKE_BUFFER_FLUSH_INTERVAL_MS", 500) / 1000,
+    max_events=app.config.get("LIKE_BUFFER_MAX_EVENTS", 500)
+  ).start()
+
+def pending_like_delta(post_id):
+  like_buffer = current_app.extensions.get("like_buffer") if has_app_context() else None
+  return like_buffer.delta(post_id) if like_buffer is not None else 0
@@ -0,0 +1,21 @@
+from sqlalchemy import delete, select
+from app.models import db, Like
+from utils.bulk import insert_ignore
+
+
+def insert_like(user_id, post_id, created_at=None):
+  """INSERT that skips an existing (user_id, post_id) row instead of raising. True if a row was added."""
+  values = {"user_id": user_id, "post_id": post_id}
+  if created_at is not None:
+    values["created_at"] = created_at
+  stmt = insert_ignore(Like, ["user_id", "post_id"]).values(**values)
+  return db.session.execute(stmt).rowcount == 1
+
+def delete_like(user_id, post_id):
+  """The removed like's created_at (its trending score has to be taken back out), or None if there was none."""
+  stmt = delete(Like).where(Like.user_id == user_id, Like.post_id == post_id).execution_options(synchronize_session=False)
+  if db.session.get_bind().dialect.delete_returning:
+    return db.session.scalar(stmt.returning(Like.created_at))
+
+  created_at = db.session.scalar(select(Like.created_at).where(Like.user_id == user_id, Like.post_id == post_id))
+  return created_at if created_at is not None and db.session.execute(stmt).rowcount == 1 else None
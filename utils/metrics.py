@@ -0,0 +1,244 @@
+import threading
+import time
+from bisect import bisect_left
+from flask import g, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def escape_label(value):
+  return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def format_labels(labels):
+  if not labels:
+    return ""
+  return "{" + ",".join(f'{name}="{escape_label(value)}"' for name, value in labels) + "}"
+
+def format_value(value):
+  return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+  def __init__(self, name, description, label_names):
+    self.name = name
+    self.description = description
+    self.label_names = label_names
+    self._values = {}
+    self._lock = threading.Lock()
+
+  def inc(self, *labels, amount=1):
+    with self._lock:
+      self._values[labels] = self._values.get(labels, 0) + amount
+
+  def expose(self):
+    lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} counter"]
+    with self._lock:
+      for labels, value in sorted(self._values.items()):
+        lines.append(f"{self.name}{format_labels(zip(self.label_names, labels))} {format_value(value)}")
+    return lines
+
+
+class Histogram:
+  def __init__(self, name, description, label_names, buckets):
+    self.name = name
+    self.description = description
+    self.label_names = label_names
+    self.buckets = tuple(buckets)
+    # labels -> [per-bucket counts (last one is +Inf), sum, count]
+    self._series = {}
+    self._lock = threading.Lock()
+
+  def observe(self, *labels, value):
+    with self._lock:
+      series = self._series.get(labels)
+      if series is None:
+        series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0, 0]
+      series[0][bisect_left(self.buckets, value)] += 1
+      series[1] += value
+      series[2] += 1
+
+  def expose(self):
+    lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+    with self._lock:
+      for labels, (counts, total, count) in sorted(self._series.items()):
+        label_pairs = list(zip(self.label_names, labels))
+        cumulative = 0
+        for bound, bucket_count in zip((*self.buckets, "+Inf"), counts):
+          cumulative += bucket_count
+          le = bound if bound == "+Inf" else format_value(bound)
+          lines.append(f"{self.name}_bucket{format_labels([*label_pairs, ('le', le)])} {cumulative}")
+        lines.append(f"{self.name}_sum{format_labels(label_pairs)} {format_value(total)}")
+        lines.append(f"{self.name}_count{format_labels(label_pairs)} {count}")
+    return lines
+
+
+class RequestMetrics:
+  """Per-process registry for request metrics, exposed in the Prometheus text format."""
+
+  def __init__(self):
+    self.requests = Counter("http_requests_total", "Requests served.", ("endpoint", "method", "status"))
+    self.latency = Histogram(
+      "http_request_duration_seconds", "Time spent in the view, including serialization.",
+      ("endpoint", "method"), LATENCY_BUCKETS
+    )
+    self.statements = Histogram(
+      "db_statements_per_request", "SQL statements executed per request.", ("endpoint",), STATEMENT_BUCKETS
+    )
+    self.sql_time = Histogram(
+      "db_time_per_request_seconds", "Time spent executing SQL per request.", ("endpoint",), LATENCY_BUCKETS
+    )
+    self.serialization_time = Histogram(
+      "serialization_time_per_request_seconds", "Time spent dumping schemas and encoding JSON per request.",
+      ("endpoint",), LATENCY_BUCKETS
+    )
+    self.response_size = Histogram(
+      "http_response_size_bytes", "Response body size as sent, after compression.", ("endpoint",), SIZE_BUCKETS
+    )
+    self.compression_time = Histogram(
+      "compression_time_per_request_seconds", "Time spent compressing the response body.",
+      ("endpoint", "encoding"), LATENCY_BUCKETS
+    )
+    self.bytes_saved = Counter(
+      "http_response_compression_saved_bytes_total", "Body bytes saved by compression.", ("endpoint", "encoding")
+    )
+
+  def record(self, endpoint, method, status, stats, size):
+    self.requests.inc(endpoint, method, str(status))
+    self.latency.observe(endpoint, method, value=stats.elapsed())
+    self.statements.observe(endpoint, value=stats.sql_count)
+    self.sql_time.observe(endpoint, value=stats.sql_time)
+    self.serialization_time.observe(endpoint, value=stats.serialization_time)
+    if size is not None:
+      self.response_size.observe(endpoint, value=size)
+    if stats.compression is not None:
+      encoding, saved, elapsed = stats.compression
+      self.compression_time.observe(endpoint, encoding, value=elapsed)
+      self.bytes_saved.inc(endpoint, encoding, amount=saved)
+
+  def expose(self):
+    lines = []
+    for metric in (
+      self.requests, self.latency, self.statements, self.sql_time, self.serialization_time, self.response_size,
+      self.compression_time, self.bytes_saved
+    ):
+      lines.extend(metric.expose())
+    return "\n".join(lines) + "\n"
+
+
+class RequestStats:
+  def __init__(self):
+    self.start = time.perf_counter()
+    self.sql_count = 0
+    self.sql_time = 0.0
+    self.serialization_time = 0.0
+    self.serializing = False
+    # (encoding, bytes saved, seconds) once the body has been compressed
+    self.compression = None
+
+  def record_compression(self, encoding, saved, elapsed):
+    self.compression = (encoding, saved, elapsed)
+
+  def elapsed(self):
+    return time.perf_counter() - self.start
+
+  def server_timing(self):
+    timings = [
+      f'db;dur={self.sql_time * 1000:.3f};desc="{self.sql_count} queries"',
+      f"serialize;dur={self.serialization_time * 1000:.3f}",
+    ]
+    if self.compression is not None:
+      encoding, _, elapsed = self.compression
+      timings.append(f'compress;dur={elapsed * 1000:.3f};desc="{encoding}"')
+    timings.append(f"total;dur={self.elapsed() * 1000:.3f}")
+    return ", ".join(timings)
+
+
+def current_stats():
+  return g.get("request_stats") if has_request_context() else None
+
+
+class timed_serialization:
+  """Adds the time spent inside the block to the request's serialization time. Nested blocks count once."""
+
+  def __enter__(self):
+    self.stats = current_stats()
+    if self.stats is None or self.stats.serializing:
+      self.stats = None
+      return self
+
+    self.stats.serializing = True
+    self.start = time.perf_counter()
+    return self
+
+  def __exit__(self, *exc_info):
+    if self.stats is not None:
+      self.stats.serialization_time += time.perf_counter() - self.start
+      self.stats.serializing = False
+
+
+class TimedDumpMixin:
+  """Schema mixin that counts dump() towards the request's serialization time."""
+
+  def dump(self, obj, *args, **kwargs):
+    with timed_serialization():
+      return super().dump(obj, *args, **kwargs)
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+  def dumps(self, obj, **kwargs):
+    with timed_serialization():
+      return super().dumps(obj, **kwargs)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def start_statement(conn, cursor, statement, parameters, context, executemany):
+  if current_stats() is not None:
+    conn.info.setdefault("statement_started", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def end_statement(conn, cursor, statement, parameters, context, executemany):
+  stats = current_stats()
+  started = conn.info.get("statement_started")
+  if stats is None or not started:
+    return
+
+  stats.sql_time += time.perf_counter() - started.pop()
+  stats.sql_count += 1
+
+@event.listens_for(Engine, "handle_error")
+def discard_statement(exception_context):
+  connection = exception_context.connection
+  if connection is not None and connection.info.get("statement_started"):
+    connection.info["statement_started"].pop()
+
+
+def init_metrics(app):
+  if not app.config.get("METRICS_ENABLED", True):
+    app.extensions["metrics"] = None
+    return
+
+  metrics = app.extensions["metrics"] = RequestMetrics()
+  server_timing = app.config.get("SERVER_TIMING_ENABLED", False)
+  app.json = TimedJSONProvider(app)
+
+  @app.before_request
+  def start_request_stats():
+    g.request_stats = RequestStats()
+
+  @app.after_request
+  def record_request_stats(response):
+    stats = g.pop("request_stats", None)
+    if stats is None:
+      return response
+
+    # Streamed bodies have no length up front
+    size = None if response.is_streamed else response.calculate_content_length()
+    metrics.record(request.endpoint or "unmatched", request.method, response.status_code, stats, size)
+    if server_timing:
+      response.headers["Server-Timing"] = stats.server_timing()
+    return response
@@ -0,0 +1,92 @@
+import base64
+import json
+from datetime import datetime
+from flask import current_app, request
+from sqlalchemy import and_, or_
+from app.models import db
+
+
+class PaginationError(ValueError):
+  pass
+
+
+def encode_cursor(created_at, row_id):
+  payload = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+  return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor):
+  try:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    return datetime.fromisoformat(created_at), int(row_id)
+  except (ValueError, TypeError, UnicodeError):
+    raise PaginationError("Invalid cursor")
+
+def get_page_args():
+  default = current_app.config.get("PAGE_SIZE_DEFAULT", 20)
+  maximum = current_app.config.get("PAGE_SIZE_MAX", 100)
+
+  try:
+    limit = int(request.args.get("limit", default))
+  except ValueError:
+    raise PaginationError("limit must be an integer")
+
+  if limit < 1:
+    raise PaginationError("limit must be greater than 0")
+
+  cursor = request.args.get("cursor")
+  return min(limit, maximum), decode_cursor(cursor) if cursor else None
+
+def get_page_number():
+  try:
+    page = int(request.args.get("page", 1))
+  except ValueError:
+    raise PaginationError("page must be an integer")
+
+  if page < 1:
+    raise PaginationError("page must be greater than 0")
+  return page
+
+def get_newest_first():
+  order = request.args.get("order", "newest")
+  if order not in ("newest", "oldest"):
+    raise PaginationError("order must be 'newest' or 'oldest'")
+  return order == "newest"
+
+def keyset_query(stmt, model, limit, cursor=None, newest_first=True, keys=None):
+  """keys overrides the (created_at, id) columns to page on, e.g. for tables keyed by a foreign id."""
+  created_at, row_id = keys or (model.created_at, model.id)
+
+  if cursor:
+    last_created_at, last_id = cursor
+    if newest_first:
+      stmt = stmt.where(or_(
+        created_at < last_created_at,
+        and_(created_at == last_created_at, row_id < last_id)
+      ))
+    else:
+      stmt = stmt.where(or_(
+        created_at > last_created_at,
+        and_(created_at == last_created_at, row_id > last_id)
+      ))
+
+  if newest_first:
+    stmt = stmt.order_by(created_at.desc(), row_id.desc())
+  else:
+    stmt = stmt.order_by(created_at.asc(), row_id.asc())
+
+  # One extra row tells us whether there is a next page
+  return stmt.limit(limit + 1)
+
+def split_page(rows, limit):
+  """Trim keyset_query's extra row and turn it into the next cursor."""
+  if len(rows) <= limit:
+    return rows, None
+
+  rows = rows[:limit]
+  return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
+
+def keyset_page(stmt, model, limit, cursor=None, newest_first=True, scalars=True):
+  """Pass scalars=False for column selects; rows then need id and created_at columns."""
+  result = db.session.execute(keyset_query(stmt, model, limit, cursor, newest_first))
+  return split_page((result.scalars() if scalars else result).all(), limit)
@@ -0,0 +1,65 @@
+import threading
+import time
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+class PoolMetrics:
+  def __init__(self):
+    self._lock = threading.Lock()
+    self.checkouts = 0
+    self.checkout_wait_total = 0.0
+    self.checkout_wait_max = 0.0
+    self.timeouts = 0
+    self.overflow_peak = 0
+
+  def record_checkout(self, waited, overflow):
+    with self._lock:
+      self.checkouts += 1
+      self.checkout_wait_total += waited
+      self.checkout_wait_max = max(self.checkout_wait_max, waited)
+      self.overflow_peak = max(self.overflow_peak, overflow)
+
+  def record_timeout(self):
+    with self._lock:
+      self.timeouts += 1
+
+
+class InstrumentedQueuePool(QueuePool):
+  """QueuePool that times every checkout, including the wait for a free connection."""
+
+  def __init__(self, *args, metrics=None, **kwargs):
+    super().__init__(*args, **kwargs)
+    self.metrics = metrics or PoolMetrics()
+
+  def connect(self):
+    start = time.perf_counter()
+    try:
+      connection = super().connect()
+    except PoolTimeoutError:
+      self.metrics.record_timeout()
+      raise
+
+    self.metrics.record_checkout(time.perf_counter() - start, max(self.overflow(), 0))
+    return connection
+
+  def recreate(self):
+    # engine.dispose() swaps in a fresh pool; keep counting into the same metrics
+    pool = super().recreate()
+    pool.metrics = self.metrics
+    return pool
+
+  def snapshot(self):
+    metrics = self.metrics
+    return {
+      "pool_size": self.size(),
+      "checked_out": self.checkedout(),
+      "checked_in": self.checkedin(),
+      "overflow": max(self.overflow(), 0),
+      "overflow_peak": metrics.overflow_peak,
+      "max_overflow": self._max_overflow,
+      "checkouts": metrics.checkouts,
+      "checkout_wait_avg_ms": round(metrics.checkout_wait_total / metrics.checkouts * 1000, 3) if metrics.checkouts else 0.0,
+      "checkout_wait_max_ms": round(metrics.checkout_wait_max * 1000, 3),
+      "timeouts": metrics.timeouts,
+    }
@@ -0,0 +1,284 @@
+import atexit
+import threading
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from sqlalchemy import select, delete, update, tuple_
+from app.models import db, User, Blog, Comment, Like, Follow, TimelineEntry, PurgeJob
+from app.extenstions import cache
+from utils.search import unindex_blogs
+
+# Deleting a user or blog only stamps deleted_at, which hides it from every read, and queues a PurgeJob.
+# The job then removes dependents a batch at a time: each batch is one short transaction of set-based
+# DELETEs by primary key, and commits the job's progress with it, so a crashed run picks up where it stopped.
+
+
+def queue_purge(kind, target_id):
+  job = PurgeJob(kind=kind, target_id=target_id, step=PURGE_STEPS[kind][0][0])
+  db.session.add(job)
+  db.session.flush()
+  return job
+
+def soft_delete_blog(blog_id):
+  """Hide a blog and queue its purge. Returns the job, or None if there was no live blog. The caller commits."""
+  hidden = db.session.execute(
+    update(Blog)
+    .where(Blog.id == blog_id, Blog.deleted_at.is_(None))
+    .values({Blog.deleted_at: datetime.now(timezone.utc), Blog.updated_at: Blog.updated_at})
+    .execution_options(synchronize_session=False)
+  ).rowcount
+  if not hidden:
+    return None
+  unindex_blogs(db.session.connection(), [blog_id])
+  return queue_purge("blog", blog_id)
+
+def soft_delete_user(user_id):
+  """Hide a user and all their blogs and queue the purge. Returns the job, or None if there was no live user."""
+  now = datetime.now(timezone.utc)
+  hidden = db.session.execute(
+    update(User)
+    .where(User.id == user_id, User.deleted_at.is_(None))
+    .values({User.deleted_at: now})
+    .execution_options(synchronize_session=False)
+  ).rowcount
+  if not hidden:
+    return None
+  db.session.execute(
+    update(Blog)
+    .where(Blog.author_id == user_id, Blog.deleted_at.is_(None))
+    .values({Blog.deleted_at: now, Blog.updated_at: Blog.updated_at})
+    .execution_options(synchronize_session=False)
+  )
+  unindex_blogs(db.session.connection(), authored_blogs(user_id))
+  return queue_purge("user", user_id)
+
+
+def authored_blogs(user_id):
+  return select(Blog.id).where(Blog.author_id == user_id)
+
+def delete_batch(model, condition, batch_size, *columns):
+  """Delete up to batch_size rows matching condition. Returns the (id, *columns) rows that were removed."""
+  rows = db.session.execute(select(model.id, *columns).where(condition).limit(batch_size)).all()
+  if rows:
+    db.session.execute(
+      delete(model).where(model.id.in_([row[0] for row in rows])).execution_options(synchronize_session=False)
+    )
+  return rows
+
+def delete_timeline_batch(condition, batch_size):
+  keys = db.session.execute(select(TimelineEntry.user_id, TimelineEntry.blog_id).where(condition).limit(batch_size)).all()
+  if keys:
+    db.session.execute(
+      delete(TimelineEntry)
+      .where(tuple_(TimelineEntry.user_id, TimelineEntry.blog_id).in_([tuple(key) for key in keys]))
+      .execution_options(synchronize_session=False)
+    )
+  return len(keys)
+
+def decrement(model, counter, amounts):
+  for row_id, amount in amounts.items():
+    values = {counter: counter - amount}
+    if model is Blog:
+      values[Blog.updated_at] = Blog.updated_at
+    db.session.execute(update(model).where(model.id == row_id).values(values))
+
+
+# Each step removes up to batch_size rows and returns how many; a short batch means the step is finished.
+# Dependents on rows that are going away anyway need no counter bookkeeping; the rest decrement live counters.
+
+def sweep_then(*steps):
+  """The last step of a job: run steps in one batch, stopping at the first that isn't finished.
+
+  Re-sweeps the dependents right before the row itself goes, so a like or comment written by a
+  request that checked the row just before it was hidden isn't left behind.
+  """
+  def step(target_id, batch_size):
+    removed = 0
+    for purge in steps:
+      count = purge(target_id, batch_size)
+      removed += count
+      if count >= batch_size:
+        break
+    return removed
+  return step
+
+def purge_likes_on(blog_ids):
+  return lambda target_id, batch_size: len(delete_batch(Like, Like.post_id.in_(blog_ids(target_id)), batch_size))
+
+def purge_comments_on(blog_ids):
+  return lambda target_id, batch_size: len(delete_batch(Comment, Comment.post_id.in_(blog_ids(target_id)), batch_size))
+
+def purge_timelines_of(blog_ids):
+  return lambda target_id, batch_size: delete_timeline_batch(TimelineEntry.blog_id.in_(blog_ids(target_id)), batch_size)
+
+def purge_blogs(target_id, batch_size):
+  return len(delete_batch(Blog, Blog.author_id == target_id, batch_size))
+
+def purge_blog(target_id, batch_size):
+  return len(delete_batch(Blog, Blog.id == target_id, batch_size))
+
+def purge_user_likes(target_id, batch_size):
+  rows = delete_batch(Like, Like.user_id == target_id, batch_size, Like.post_id)
+  decrement(Blog, Blog.like_count, Counter(row.post_id for row in rows))
+  return len(rows)
+
+def purge_user_comments(target_id, batch_size):
+  rows = delete_batch(Comment, Comment.user_id == target_id, batch_size, Comment.post_id, Comment.is_archived)
+  decrement(Blog, Blog.comment_count, Counter(row.post_id for row in rows if not row.is_archived))
+  return len(rows)
+
+def purge_follows(target_id, batch_size):
+  rows = delete_batch(Follow, Follow.follower_id == target_id, batch_size, Follow.followee_id)
+  decrement(User, User.follower_count, Counter(row.followee_id for row in rows))
+  return len(rows)
+
+def purge_followers(target_id, batch_size):
+  return len(delete_batch(Follow, Follow.followee_id == target_id, batch_size))
+
+def purge_timeline(target_id, batch_size):
+  return delete_timeline_batch(TimelineEntry.user_id == target_id, batch_size)
+
+def purge_user(target_id, batch_size):
+  return len(delete_batch(User, User.id == target_id, batch_size))
+
+
+BLOG_DEPENDENTS = (
+  ("likes", purge_likes_on(lambda blog_id: [blog_id])),
+  ("comments", purge_comments_on(lambda blog_id: [blog_id])),
+  ("timelines", purge_timelines_of(lambda blog_id: [blog_id])),
+)
+
+USER_DEPENDENTS = (
+  ("likes", purge_user_likes),
+  ("comments", purge_user_comments),
+  ("follows", purge_follows),
+  ("followers", purge_followers),
+  ("timeline", purge_timeline),
+)
+
+PURGE_STEPS = {
+  "blog": (
+    *BLOG_DEPENDENTS,
+    ("blog", sweep_then(*(purge for _, purge in BLOG_DEPENDENTS), purge_blog)),
+  ),
+  "user": (
+    ("blog_likes", purge_likes_on(authored_blogs)),
+    ("blog_comments", purge_comments_on(authored_blogs)),
+    ("blog_timelines", purge_timelines_of(authored_blogs)),
+    ("blogs", purge_blogs),
+    *USER_DEPENDENTS,
+    ("user", sweep_then(*(purge for _, purge in USER_DEPENDENTS), purge_user)),
+  ),
+}
+
+
+def lease():
+  return timedelta(seconds=current_app.config.get("PURGE_LEASE_SECONDS", 60))
+
+def claim(job_id):
+  """Take a pending job unless another worker holds an unexpired lease on it."""
+  now = datetime.now(timezone.utc)
+  claimed = db.session.execute(
+    update(PurgeJob)
+    .where(
+      PurgeJob.id == job_id,
+      PurgeJob.status == "pending",
+      (PurgeJob.claimed_until.is_(None)) | (PurgeJob.claimed_until < now)
+    )
+    .values(claimed_until=now + lease())
+    .execution_options(synchronize_session=False)
+  ).rowcount == 1
+  db.session.commit()
+  return claimed
+
+def run_job(job_id, batch_size, on_progress=None):
+  """Run a claimed job's remaining batches. on_progress(job) is called after every committed batch."""
+  job = db.session.get(PurgeJob, job_id)
+  steps = PURGE_STEPS[job.kind]
+  names = [name for name, _ in steps]
+
+  while job.status != "done":
+    position = names.index(job.step)
+    removed = steps[position][1](job.target_id, batch_size)
+    job.purged += removed
+    job.claimed_until = datetime.now(timezone.utc) + lease()
+    if removed < batch_size:
+      if position + 1 < len(steps):
+        job.step = names[position + 1]
+      else:
+        job.status, job.claimed_until = "done", None
+    db.session.commit()
+    if on_progress:
+      on_progress(job)
+
+  # The user's comments and counts may sit in any cached payload
+  if job.kind == "user":
+    cache.clear()
+  return job
+
+def run_pending(batch_size=None, on_progress=None):
+  """Run every pending job this worker can claim. Returns the number of jobs finished."""
+  batch_size = batch_size or current_app.config.get("PURGE_BATCH_SIZE", 500)
+  finished = 0
+  for job_id in db.session.scalars(select(PurgeJob.id).where(PurgeJob.status == "pending").order_by(PurgeJob.id)).all():
+    if claim(job_id):
+      run_job(job_id, batch_size, on_progress)
+      finished += 1
+  return finished
+
+
+class PurgeWorker:
+  """Runs pending purge jobs in a background thread every interval seconds, or as soon as wake() is called."""
+
+  def __init__(self, app, interval=5.0, batch_size=500):
+    self.app = app
+    self.interval = interval
+    self.batch_size = batch_size
+    self._wake = threading.Event()
+    self._stopped = threading.Event()
+    self._thread = None
+
+  def start(self):
+    self._thread = threading.Thread(target=self._run, name="purge-worker", daemon=True)
+    self._thread.start()
+    atexit.register(self.stop)
+    return self
+
+  def stop(self):
+    if self._thread is not None and not self._stopped.is_set():
+      self._stopped.set()
+      self._wake.set()
+      self._thread.join()
+
+  def wake(self):
+    self._wake.set()
+
+  def _run(self):
+    while not self._stopped.is_set():
+      self._wake.wait(self.interval)
+      self._wake.clear()
+      if self._stopped.is_set():
+        break
+      with self.app.app_context():
+        try:
+          run_pending(self.batch_size)
+        except Exception:
+          db.session.rollback()
+          self.app.logger.exception("Purging deleted rows failed")
+
+
+def init_purge_worker(app):
+  if not app.config.get("PURGE_WORKER_ENABLED", False):
+    app.extensions["purge_worker"] = None
+    return
+
+  app.extensions["purge_worker"] = PurgeWorker(
+    app,
+    interval=app.config.get("PURGE_INTERVAL_MS", 5000) / 1000,
+    batch_size=app.config.get("PURGE_BATCH_SIZE", 500)
+  ).start()
+
+def wake_purge_worker():
+  purge_worker = current_app.extensions.get("purge_worker")
+  if purge_worker is not None:
+    purge_worker.wake()
@@ -0,0 +1,104 @@
+import random
+import threading
+import time
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event, text
+
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Seconds the replica is behind its primary, per dialect
+LAG_QUERIES = {
+  "mysql": "SELECT COALESCE(MAX(TIMESTAMPDIFF(SECOND, LAST_APPLIED_TRANSACTION_ORIGINAL_COMMIT_TIMESTAMP, NOW(6))), 0) "
+           "FROM performance_schema.replication_applier_status_by_worker",
+  "postgresql": "SELECT COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)",
+}
+
+
+class ReplicaRouter:
+  def __init__(self, app, uris):
+    # Engines are kept out of SQLALCHEMY_BINDS so db.create_all() never targets a replica
+    options = app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {})
+    self.engines = {f"replica_{index}": create_engine(uri, **options) for index, uri in enumerate(uris)}
+    self.max_lag = app.config.get("REPLICA_MAX_LAG")
+    self.check_interval = app.config.get("REPLICA_LAG_CHECK_INTERVAL", 5)
+    self._lag = {}
+    self._lock = threading.Lock()
+
+  def measure_lag(self, engine):
+    query = LAG_QUERIES.get(engine.dialect.name)
+    if query is None:
+      return 0.0
+    with engine.connect() as connection:
+      return float(connection.execute(text(query)).scalar() or 0)
+
+  def lag(self, key, engine):
+    now = time.monotonic()
+    with self._lock:
+      checked_at, lag = self._lag.get(key, (None, None))
+    if checked_at is not None and now - checked_at < self.check_interval:
+      return lag
+
+    try:
+      lag = self.measure_lag(engine)
+    except Exception:
+      # An unreachable replica is treated as infinitely stale
+      lag = float("inf")
+
+    with self._lock:
+      self._lag[key] = (now, lag)
+    return lag
+
+  def choose_key(self):
+    candidates = list(self.engines)
+    if self.max_lag is not None:
+      candidates = [key for key in candidates if self.lag(key, self.engines[key]) <= self.max_lag]
+    return random.choice(candidates) if candidates else None
+
+  def choose(self):
+    key = self.choose_key()
+    return self.engines[key] if key is not None else None
+
+
+def init_replicas(app):
+  uris = app.config.get("SQLALCHEMY_REPLICA_URIS") or []
+  app.extensions["replica_router"] = ReplicaRouter(app, uris) if uris else None
+
+def replicas_enabled():
+  return current_app.extensions.get("replica_router") is not None
+
+def read_from_primary():
+  if has_request_context():
+    g.db_primary = True
+
+def reading_from_replica():
+  return (
+    has_request_context()
+    and request.method in READ_METHODS
+    and not g.get("db_primary", False)
+    and current_app.extensions.get("replica_router") is not None
+  )
+
+
+class RoutingSession(Session):
+  """Sends reads made while serving GET requests to a replica; everything else, and anything
+  after this request has flushed a write, goes to the primary.
+
+  The replica is picked once per request, so all of its queries see the same snapshot."""
+
+  def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+    if bind is None and not self._flushing and reading_from_replica():
+      if "db_replica" not in g:
+        g.db_replica = current_app.extensions["replica_router"].choose()
+      if g.db_replica is not None:
+        return g.db_replica
+      # Every replica is too stale; stick to the primary for the rest of the request
+      g.db_primary = True
+
+    return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def stick_to_primary(session, flush_context):
+  if has_request_context():
+    g.db_primary = True
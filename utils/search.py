@@ -0,0 +1,112 @@
+import re
+from sqlalchemy import DDL, event, select, text, func, delete, table, column
+from sqlalchemy.dialects.mysql import match
+from app.models import db, Blog
+
+# SQLite has no FULLTEXT index, so blogs are mirrored into an FTS5 table (rowid = blog id)
+event.listen(
+  Blog.__table__, "after_create",
+  DDL("CREATE VIRTUAL TABLE IF NOT EXISTS blogs_fts USING fts5(title, body)").execute_if(dialect="sqlite")
+)
+event.listen(
+  Blog.__table__, "before_drop",
+  DDL("DROP TABLE IF EXISTS blogs_fts").execute_if(dialect="sqlite")
+)
+event.listen(
+  Blog.__table__, "after_create",
+  DDL("CREATE FULLTEXT INDEX ix_blogs_fulltext ON blogs (title, body)").execute_if(dialect="mysql")
+)
+event.listen(
+  Blog.__table__, "after_create",
+  DDL("CREATE INDEX ix_blogs_search ON blogs USING GIN (to_tsvector('english', title || ' ' || body))").execute_if(dialect="postgresql")
+)
+
+
+blogs_fts = table("blogs_fts", column("rowid"))
+
+
+class SearchError(ValueError):
+  pass
+
+
+def search_terms(q):
+  terms = re.findall(r"\w+", q or "")
+  if not terms:
+    raise SearchError("q is required")
+  return terms
+
+def search_blog_ids(q, limit, offset=0):
+  """Ids of non-archived blogs matching every term in q, best match first."""
+  terms = search_terms(q)
+  dialect = db.session.get_bind().dialect.name
+
+  if dialect == "sqlite":
+    # Quoting each term keeps FTS5 operators in user input from being interpreted
+    return db.session.scalars(
+      text(
+        "SELECT rowid FROM blogs_fts WHERE blogs_fts MATCH :query "
+        "ORDER BY bm25(blogs_fts, 10.0, 1.0), rowid DESC LIMIT :limit OFFSET :offset"
+      ),
+      {"query": " ".join(f'"{term}"' for term in terms), "limit": limit, "offset": offset}
+    ).all()
+
+  if dialect == "mysql":
+    score = match(Blog.title, Blog.body, against=" ".join(terms)).in_natural_language_mode()
+    stmt = select(Blog.id).where(score > 0)
+  elif dialect == "postgresql":
+    document = func.to_tsvector("english", Blog.title + " " + Blog.body)
+    query = func.plainto_tsquery("english", " ".join(terms))
+    score = func.ts_rank(document, query)
+    stmt = select(Blog.id).where(document.op("@@")(query))
+  else:
+    raise SearchError(f"Search is not supported on {dialect}")
+
+  return db.session.scalars(
+    stmt.where(Blog.is_archived.is_(False), Blog.deleted_at.is_(None))
+    .order_by(score.desc(), Blog.id.desc())
+    .limit(limit)
+    .offset(offset)
+  ).all()
+
+def rebuild_search_index(connection):
+  if connection.dialect.name != "sqlite":
+    return
+  connection.execute(text("DELETE FROM blogs_fts"))
+  connection.execute(text(
+    "INSERT INTO blogs_fts (rowid, title, body) SELECT id, title, body FROM blogs WHERE NOT is_archived AND deleted_at IS NULL"
+  ))
+
+
+def index_blogs(connection, blogs):
+  """Refresh the FTS5 mirror for blogs given as dicts with id/title/body (and optionally is_archived/deleted_at)."""
+  if connection.dialect.name != "sqlite" or not blogs:
+    return
+  connection.execute(text("DELETE FROM blogs_fts WHERE rowid = :id"), [{"id": blog["id"]} for blog in blogs])
+  visible = [blog for blog in blogs if not blog.get("is_archived") and not blog.get("deleted_at")]
+  if visible:
+    connection.execute(
+      text("INSERT INTO blogs_fts (rowid, title, body) VALUES (:id, :title, :body)"),
+      [{"id": blog["id"], "title": blog["title"], "body": blog["body"]} for blog in visible]
+    )
+
+
+def unindex_blogs(connection, blog_ids):
+  """Drop blogs from the FTS5 mirror. blog_ids is a list or a SELECT of ids."""
+  if connection.dialect.name != "sqlite":
+    return
+  connection.execute(delete(blogs_fts).where(blogs_fts.c.rowid.in_(blog_ids)))
+
+
+# MySQL and Postgres maintain their indexes themselves; the FTS5 mirror is kept in step on every flush.
+# Bulk inserts skip mapper events and call index_blogs() directly.
+@event.listens_for(Blog, "after_insert")
+@event.listens_for(Blog, "after_update")
+def sync_blog(mapper, connection, blog):
+  index_blogs(connection, [{
+    "id": blog.id, "title": blog.title, "body": blog.body, "is_archived": blog.is_archived, "deleted_at": blog.deleted_at
+  }])
+
+@event.listens_for(Blog, "after_delete")
+def remove_blog(mapper, connection, blog):
+  if connection.dialect.name == "sqlite":
+    connection.execute(text("DELETE FROM blogs_fts WHERE rowid = :id"), {"id": blog.id})
@@ -0,0 +1,48 @@
+from flask import current_app, request, stream_with_context
+from app.models import db
+
+EXPORT_MIMETYPES = {"json": "application/json", "ndjson": "application/x-ndjson"}
+
+
+class ExportError(ValueError):
+  pass
+
+
+def get_export_args():
+  export_format = request.args.get("format", "json")
+  if export_format not in EXPORT_MIMETYPES:
+    raise ExportError("format must be 'json' or 'ndjson'")
+
+  after = request.args.get("after")
+  try:
+    return export_format, int(after) if after is not None else None
+  except ValueError:
+    raise ExportError("after must be an integer")
+
+def stream_export(stmt, serialize, export_format, batch_size):
+  """Stream stmt's rows as a JSON array or NDJSON, batch_size rows at a time from a server-side cursor.
+
+  serialize(rows) turns one batch of rows into dicts; nothing else is held in memory between batches.
+  """
+  dumps = current_app.json.dumps
+
+  def generate():
+    result = db.session.execute(stmt.execution_options(yield_per=batch_size))
+    try:
+      if export_format == "ndjson":
+        for rows in result.partitions():
+          yield "".join(dumps(item) + "\n" for item in serialize(rows))
+        return
+
+      separator = "["
+      for rows in result.partitions():
+        yield separator + ",".join(dumps(item) for item in serialize(rows))
+        separator = ","
+      yield "[]" if separator == "[" else "]"
+    finally:
+      result.close()
+
+  response = current_app.response_class(stream_with_context(generate()), mimetype=EXPORT_MIMETYPES[export_format])
+  # Keep reverse proxies from buffering the whole export
+  response.headers["X-Accel-Buffering"] = "no"
+  return response
@@ -0,0 +1,218 @@
+import atexit
+import threading
+from collections import defaultdict
+from datetime import datetime, timezone
+from flask import current_app
+from sqlalchemy import select, update, bindparam, case, false
+from app.models import db, Blog, Comment, Like, TrendingEpoch
+from app.extenstions import cache
+from utils.bulk import insert_ignore, chunked
+
+# A like or comment made at time t is worth weight * 2 ** ((t - epoch) / half_life). Adding that to
+# Blog.trending_score as events happen ranks blogs exactly as if every score were decayed to "now", because
+# the decay factor is the same for all blogs. Newer events are worth exponentially more, so the decay worker
+# (or decay-trending) periodically moves the epoch forward and rescales every score to keep the numbers small.
+# Scores are always written against the epoch of the blog being scored: epoch_for(read_epoch(), blog_id).
+
+
+MIN_SCORE = 1e-6
+
+
+def as_utc(value):
+  # SQLite hands back naive datetimes
+  return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+def half_life_seconds():
+  return current_app.config.get("TRENDING_HALF_LIFE_HOURS", 24) * 3600
+
+def like_weight():
+  return current_app.config.get("TRENDING_LIKE_WEIGHT", 1.0)
+
+def comment_weight():
+  return current_app.config.get("TRENDING_COMMENT_WEIGHT", 2.0)
+
+
+def read_epoch(for_update=False):
+  """The epoch row, created on first use. Share-locked so a decay batch waits for this transaction."""
+  query = (
+    select(TrendingEpoch.started_at, TrendingEpoch.previous_started_at, TrendingEpoch.rescaled_through)
+    .where(TrendingEpoch.id == 1)
+    .with_for_update(read=not for_update)
+  )
+  epoch = db.session.execute(query).first()
+  if epoch is None:
+    db.session.execute(insert_ignore(TrendingEpoch, ["id"]).values(id=1, started_at=datetime.now(timezone.utc)))
+    epoch = db.session.execute(query).first()
+  return epoch
+
+def epoch_for(epoch, blog_id=None):
+  # While a decay is running, blogs past rescaled_through are still expressed against the previous epoch
+  if epoch.rescaled_through is not None and blog_id is not None and blog_id > epoch.rescaled_through:
+    return as_utc(epoch.previous_started_at)
+  return as_utc(epoch.started_at)
+
+def current_epoch(blog_id=None, for_update=False):
+  return epoch_for(read_epoch(for_update), blog_id)
+
+def event_score(weight, at=None, epoch=None):
+  epoch = epoch or current_epoch()
+  at = as_utc(at) if at is not None else datetime.now(timezone.utc)
+  return weight * 2 ** ((at - epoch).total_seconds() / half_life_seconds())
+
+def decay_factor(since, until):
+  return 2 ** (-(as_utc(until) - as_utc(since)).total_seconds() / half_life_seconds())
+
+
+def trending_order():
+  # Unlocked: a ranking read never waits on a decay batch
+  epoch = db.session.execute(
+    select(TrendingEpoch.started_at, TrendingEpoch.previous_started_at, TrendingEpoch.rescaled_through).where(TrendingEpoch.id == 1)
+  ).first()
+  if epoch is None or epoch.rescaled_through is None:
+    return Blog.trending_score
+  # Mid-decay the two halves of the table are on different epochs; put them on the same scale (without the index) until it finishes
+  factor = decay_factor(epoch.previous_started_at, epoch.started_at)
+  return case((Blog.id <= epoch.rescaled_through, Blog.trending_score), else_=Blog.trending_score * factor)
+
+def trending_query(stmt, limit):
+  return (
+    stmt.where(Blog.is_archived == false(), Blog.trending_score > 0, Blog.deleted_at.is_(None))
+    .order_by(trending_order().desc(), Blog.id.desc())
+    .limit(limit)
+  )
+
+
+def decay_scores(now=None, batch_size=1000):
+  """Move the epoch to now and rescale every score to match. Ranking is unchanged. Returns the blogs rescaled.
+
+  The epoch moves first and blogs follow in id-range batches, one transaction each, so likes and comments only
+  ever wait for the batch in progress. An interrupted decay picks up where it stopped (now is then ignored).
+  """
+  epoch = read_epoch(for_update=True)
+  if epoch.rescaled_through is None:
+    previous, now = as_utc(epoch.started_at), now or datetime.now(timezone.utc)
+    set_epoch(started_at=now, previous_started_at=previous, rescaled_through=0)
+    db.session.commit()
+    rescaled_through = 0
+  else:
+    previous, now, rescaled_through = as_utc(epoch.previous_started_at), as_utc(epoch.started_at), epoch.rescaled_through
+
+  decayed = Blog.trending_score * decay_factor(previous, now)
+  rescaled = 0
+  while True:
+    # Progress is re-read under the lock: another process may be running the same decay
+    epoch = read_epoch(for_update=True)
+    if epoch.rescaled_through is None or as_utc(epoch.previous_started_at) != previous:
+      db.session.commit()
+      return rescaled
+    rescaled_through = epoch.rescaled_through
+    batch = db.session.scalars(select(Blog.id).where(Blog.id > rescaled_through).order_by(Blog.id).limit(batch_size)).all()
+    if not batch:
+      set_epoch(previous_started_at=None, rescaled_through=None)
+      db.session.commit()
+      return rescaled
+
+    rescaled += db.session.execute(
+      update(Blog)
+      .where(Blog.id > rescaled_through, Blog.id <= batch[-1], Blog.trending_score > 0)
+      # Long-cold blogs and unlike rounding residue drop out of the index range entirely
+      .values({Blog.trending_score: case((decayed < MIN_SCORE, 0), else_=decayed), Blog.updated_at: Blog.updated_at})
+      .execution_options(synchronize_session=False)
+    ).rowcount
+    rescaled_through = batch[-1]
+    set_epoch(rescaled_through=rescaled_through)
+    db.session.commit()
+
+def set_epoch(**values):
+  db.session.execute(update(TrendingEpoch).where(TrendingEpoch.id == 1).values(**values))
+
+def rebuild_scores(batch_size=1000):
+  """Recompute every score from the likes and comments tables, e.g. after adding the column to existing data."""
+  epoch = current_epoch(for_update=True)
+  scores = defaultdict(float)
+  events = (
+    (like_weight(), select(Like.post_id, Like.created_at)),
+    # Archived comments don't count; toggling the archive takes their score out and puts it back
+    (comment_weight(), select(Comment.post_id, Comment.created_at).where(Comment.is_archived.is_not(True))),
+  )
+  for weight, query in events:
+    for row in db.session.execute(query.execution_options(yield_per=batch_size)):
+      scores[row[0]] += event_score(weight, row[1], epoch)
+
+  db.session.execute(
+    update(Blog)
+    .values({Blog.trending_score: 0, Blog.updated_at: Blog.updated_at})
+    .execution_options(synchronize_session=False)
+  )
+  stmt = (
+    update(Blog.__table__)
+    .where(Blog.__table__.c.id == bindparam("blog_id"))
+    .values(trending_score=bindparam("score"), updated_at=Blog.__table__.c.updated_at)
+  )
+  for chunk in chunked(list(scores.items()), batch_size):
+    db.session.execute(stmt, [{"blog_id": blog_id, "score": score} for blog_id, score in chunk])
+  # Every score is now against started_at, which also settles a decay that was interrupted
+  set_epoch(previous_started_at=None, rescaled_through=None)
+  return len(scores)
+
+
+def next_decay_in(interval):
+  """Seconds until the epoch is interval seconds old; 0 if it already is or a decay was interrupted."""
+  epoch = read_epoch()
+  db.session.commit()
+  if epoch.rescaled_through is not None:
+    return 0
+  return max(0.0, interval - (datetime.now(timezone.utc) - as_utc(epoch.started_at)).total_seconds())
+
+
+class TrendingDecayWorker:
+  """Runs decay_scores in a background thread whenever the epoch is interval seconds old.
+
+  Due-ness is read from the epoch row rather than kept per process, so several processes running
+  the worker decay once per interval between them and a restart doesn't push the next decay back.
+  """
+
+  def __init__(self, app, interval=3600.0, batch_size=1000):
+    self.app = app
+    self.interval = interval
+    self.batch_size = batch_size
+    self._stopped = threading.Event()
+    self._thread = None
+
+  def start(self):
+    self._thread = threading.Thread(target=self._run, name="trending-decay-worker", daemon=True)
+    self._thread.start()
+    atexit.register(self.stop)
+    return self
+
+  def stop(self):
+    if self._thread is not None and not self._stopped.is_set():
+      self._stopped.set()
+      self._thread.join()
+
+  def _run(self):
+    while not self._stopped.is_set():
+      with self.app.app_context():
+        try:
+          wait = next_decay_in(self.interval)
+          if not wait:
+            decay_scores(batch_size=self.batch_size)
+            cache.invalidate("blogs")
+            wait = self.interval
+        except Exception:
+          db.session.rollback()
+          self.app.logger.exception("Decaying trending scores failed")
+          wait = self.interval
+      self._stopped.wait(wait)
+
+
+def init_trending_decay_worker(app):
+  if not app.config.get("TRENDING_DECAY_ENABLED", False):
+    app.extensions["trending_decay_worker"] = None
+    return
+
+  app.extensions["trending_decay_worker"] = TrendingDecayWorker(
+    app,
+    interval=app.config.get("TRENDING_DECAY_INTERVAL_MS", 3600000) / 1000,
+    batch_size=app.config.get("TRENDING_DECAY_BATCH_SIZE", 1000)
+  ).start()